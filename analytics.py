@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+MOVEMENT_BINS = [-float("inf"), -2, -0.5, 0.5, 2, float("inf")]
+MOVEMENT_LABELS = ["Strong Down", "Down", "Flat", "Up", "Strong Up"]
+
+RSI_ZONE_BINS = [0, 30, 50, 70, 100]
+RSI_ZONE_LABELS = ["Oversold (<30)", "Weak (30-50)", "Strong (50-70)", "Overbought (>70)"]
+
+STRENGTH_LABELS = ["Very Weak", "Weak", "Moderate", "Strong", "Very Strong"]
+
+
+def returns_pct(close):
+    return close.pct_change() * 100
+
+
+def sharpe_ratio(returns):
+    std = returns.std()
+    if isinstance(returns, pd.DataFrame):
+        # One ratio per column, e.g. for every setting of a backtest sweep
+        return ((returns.mean() / std) * np.sqrt(TRADING_DAYS)).where(std != 0, 0.0)
+    return (returns.mean() / std) * np.sqrt(TRADING_DAYS) if std != 0 else 0
+
+
+def max_drawdown(close):
+    return ((close / close.cummax()) - 1).min() * 100
+
+
+def analytics_summary(df):
+    """Everything the Analytics tab plots, computed in one pass over `df`."""
+    close, volume = df["Close"], df["Volume"]
+    returns = returns_pct(close)
+
+    bullish = close > df["Open"]
+    high_volume = volume > volume.quantile(0.75)
+    movement = pd.cut(returns.fillna(0), bins=MOVEMENT_BINS, labels=MOVEMENT_LABELS)
+
+    return {
+        "price_dist": pd.cut(close, bins=5).value_counts().sort_index(),
+        # Histogram only covers bars where every indicator is already defined
+        "returns_hist": df.assign(Returns=returns).dropna()["Returns"],
+        "volume_dist": pd.cut(volume, bins=5).value_counts().sort_index(),
+        "bullish_days": int(bullish.sum()),
+        "bearish_days": int((close < df["Open"]).sum()),
+        "neutral_days": int((close == df["Open"]).sum()),
+        "avg_bullish_gain": returns[bullish].mean(),
+        "movement_volume": volume.groupby(movement, observed=True).sum(),
+        "high_vol_days": int(high_volume.sum()),
+        "avg_return_high_vol": returns[high_volume].mean(),
+        "rsi_dist": pd.cut(df["RSI"].dropna(), bins=RSI_ZONE_BINS, labels=RSI_ZONE_LABELS).value_counts(),
+        "strength_dist": pd.cut(df["MACD_Hist"].abs().dropna(), bins=5, labels=STRENGTH_LABELS).value_counts().sort_index(),
+        "atr_trend": df["ATR"].rolling(window=5).mean(),
+        "total_return": ((close.iloc[-1] - close.iloc[0]) / close.iloc[0]) * 100,
+        "volatility": returns.std(),
+        "sharpe_ratio": sharpe_ratio(returns),
+        "max_drawdown": max_drawdown(close),
+        "correlation": df[["Close", "Volume", "RSI", "MACD", "ATR"]].corr(),
+    }
@@ -1,25 +1,33 @@
+import functools
+import importlib.util
+import os
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-import ta
+import plotly.io as pio
 from datetime import datetime, timedelta
 import numpy as np
-from fix import fix_ohlc
-
-# Try to import ML predictor (optional)
-ML_AVAILABLE = False
-try:
-    from ml_predictor import EnsemblePredictor, TrendPredictor, SupportResistancePredictor
-    ML_AVAILABLE = True
-except ImportError:
-    print("⚠️ ML Predictor not available. Download ml_predictor.py to enable AI predictions.")
-    EnsemblePredictor = None
-    TrendPredictor = None
-    SupportResistancePredictor = None
+from backtest import BROKERAGE_BPS, SLIPPAGE_BPS, backtest, parameter_grid, rank_results
+from candle_store import CandleStore, merge_candles
+from data_client import DataClient, HTTPProvider, UpstreamError, YFinanceProvider
+from disk_cache import DiskCandleCache
+from downsample import aggregate_ohlcv, bucket_size, lttb_series
+from model_registry import ModelRegistry
+from optimizer import ResultCache, optimize, random_params
+from pipeline import Pipeline, default_period, frame_version, last_change, rating_score
+from profiling import profiler, span
+from scanner import NIFTY_50, nse_symbols, parse_universe, scan_universe
+from shared_cache import SharedMarketData
+from theme import LEGEND_TOP, bar_figure, candlestick_figure, oscillator_figure, use_theme
+from tick_aggregator import TickFeed, open_source
+from watchlist import fetch_infos, watchlist_summary
+
+# plotly.express and the optional ML predictor (TensorFlow, Prophet) are imported
+# only where they are used, so they don't delay the first render
 
 # -------------------------------- PAGE CONFIG --------------------------------
+use_theme()
+
 st.set_page_config(
     page_title="StockPulse - Advanced Analytics",
     page_icon="📈",
@@ -340,20 +348,28 @@ with st.sidebar:
         index=2
     )
     
-    period_map = {
-        "1m": "1d", "5m": "5d", "15m": "1mo",
-        "30m": "1mo", "1h": "3mo", "1d": "1y"
-    }
-    period = period_map[timeframe]
+    period = default_period(timeframe)
     
     st.markdown("---")
     
     refresh_sec = st.slider("🔄 Auto-refresh (seconds)", 10, 300, 60)
+    live_mode = st.checkbox(
+        "⚡ Live in-place updates",
+        value=hasattr(st, "fragment"),
+        disabled=not hasattr(st, "fragment"),
+        help="Refresh only the price header and main chart instead of reloading the whole page"
+    )
     
     st.markdown("---")
     
     show_advanced = st.checkbox("📊 Advanced Indicators", value=True)
     show_volume = st.checkbox("📈 Volume Analysis", value=True)
+    lazy_tabs = st.checkbox("🗂️ Lazy Tabs", value=True, help="Build only the open tab instead of every tab on every rerun")
+    profile_reruns = st.checkbox(
+        "⏱️ Profile Reruns",
+        value=os.environ.get("STOCKPULSE_PROFILE") == "1",
+        help="Time fetch, indicators, signals, each tab and chart serialization, and show them in the sidebar"
+    )
     
     st.markdown("---")
     st.markdown("### 📌 Watchlist")
@@ -363,31 +379,123 @@ with st.sidebar:
         default=["RELIANCE.NS"]
     )
 
+# Optional streaming feed: a ticks CSV to replay or a tcp://host:port line feed
+TICK_FEED = os.environ.get("STOCKPULSE_TICK_FEED")
+TICK_REFRESH_SEC = 1
+
+@st.cache_resource
+def get_tick_feed():
+    # One reader per process; every session reads bars from the same aggregators
+    if not TICK_FEED:
+        return None
+    source = open_source(TICK_FEED)
+    retry = 5 if TICK_FEED.startswith("tcp://") else None
+    return TickFeed(source, retry_delay=retry).start()
+
+tick_feed = get_tick_feed()
+
+# Spans are only recorded while a run is active, so with profiling off they cost next to nothing
+if profile_reruns:
+    profiler.begin_run(f"{ticker} {timeframe}")
+else:
+    profiler.end_run()
+
 # Auto-refresh
-st.markdown(f"<meta http-equiv='refresh' content='{refresh_sec}'>", unsafe_allow_html=True)
+if live_mode:
+    def live_fragment(func):
+        # Reruns only `func` every tick; the rest of the page and session state stay put.
+        # With a tick feed the bars change sub-second, so the fragment polls faster
+        run_every = TICK_REFRESH_SEC if tick_feed is not None else refresh_sec
+
+        @functools.wraps(func)
+        def rerun_fragment(*args, **kwargs):
+            if not profile_reruns:
+                return func(*args, **kwargs)
+            # A fragment rerun on its own is profiled as a run of its own
+            with profiler.run(f"{ticker} {timeframe} {func.__name__}"):
+                return func(*args, **kwargs)
+
+        return st.fragment(run_every=run_every)(rerun_fragment)
+else:
+    st.markdown(f"<meta http-equiv='refresh' content='{refresh_sec}'>", unsafe_allow_html=True)
+
+    def live_fragment(func):
+        return func
 
 # -------------------------------- FETCH DATA --------------------------------
-@st.cache_data(ttl=60)
+CANDLE_CACHE_DIR = os.environ.get("STOCKPULSE_CACHE_DIR", os.path.join(".cache", "candles"))
+
+# Optional JSON data service (e.g. a local fake upstream) instead of yfinance
+DATA_URL = os.environ.get("STOCKPULSE_DATA_URL")
+
+@st.cache_resource
+def get_data_client():
+    # Rate-limited, timed-out, retried upstream calls shared by every session
+    provider = HTTPProvider(DATA_URL) if DATA_URL else YFinanceProvider()
+    return DataClient(provider)
+
+@st.cache_resource
+def get_candle_store():
+    # Shared across reruns so each refresh only downloads bars since the last one;
+    # the disk cache lets a restarted process start from local history
+    return CandleStore(fetcher=get_data_client().fetch_candles, disk=DiskCandleCache(CANDLE_CACHE_DIR))
+
+@st.cache_resource
+def get_shared_data():
+    # One per process: sessions watching the same ticker share its candles,
+    # indicators and signals instead of each computing (and cache_data pickling) a copy
+    return SharedMarketData(get_candle_store(), info_fetcher=get_data_client().fetch_info)
+
+@st.cache_resource
+def get_pipeline():
+    # The headless fetch -> indicators -> signals -> analytics core, on the shared data
+    return Pipeline(get_shared_data())
+
 def fetch_stock_data(ticker, period, interval):
     try:
-        df = yf.download(ticker, period=period, interval=interval, progress=False)
-        if df.empty:
-            return None
-        return fix_ohlc(df)
+        return get_pipeline().candles(ticker, interval, period)
     except Exception as e:
         st.error(f"Error fetching data: {e}")
         return None
 
-@st.cache_data(ttl=300)
 def fetch_stock_info(ticker):
+    # Shared like the candles: one `.info` request per ticker per TTL, however many sessions ask
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        return info
-    except:
+        return get_pipeline().info(ticker)
+    except UpstreamError as e:
+        st.warning(f"Company details unavailable: {e}")
         return {}
 
-df = fetch_stock_data(ticker, period, timeframe)
+@st.cache_data(ttl=60)
+def fetch_watchlist(tickers, period, interval):
+    # One batched download for every symbol through the data client, plus a
+    # bounded pool for `.info` on the shared info cache
+    try:
+        frames = get_data_client().fetch_batch(tickers, interval, period)
+    except UpstreamError as e:
+        st.error(f"Error fetching watchlist: {e}")
+        return pd.DataFrame()
+    infos = fetch_infos(frames.keys(), fetch_info=get_pipeline().info)
+    return watchlist_summary(frames, infos)
+
+@st.cache_data(ttl=120)
+def fetch_scan(universe, period, interval):
+    # Same batched download as the watchlist, then indicators and signals in one 2-D pass
+    try:
+        frames = get_data_client().fetch_batch(universe, interval, period)
+    except UpstreamError as e:
+        st.error(f"Error fetching scanner universe: {e}")
+        return pd.DataFrame()
+    return scan_universe(frames)
+
+def with_ticks(raw):
+    # Bars built from the tick feed replace the downloaded ones from their first bar on
+    if tick_feed is None or raw is None or raw.empty:
+        return raw
+    bars = tick_feed.frame(ticker, timeframe, since=raw.index[-1], tz=raw.index.tz)
+    return merge_candles(raw, bars)
+
+df = with_ticks(fetch_stock_data(ticker, period, timeframe))
 
 if df is None or df.empty:
     st.error("❌ Could not load data. Please check the ticker symbol and try again.")
@@ -396,72 +504,37 @@ if df is None or df.empty:
 stock_info = fetch_stock_info(ticker)
 
 # -------------------------------- CALCULATE INDICATORS --------------------------------
-# Moving Averages
-df["EMA20"] = ta.trend.ema_indicator(df["Close"], window=20)
-df["EMA50"] = ta.trend.ema_indicator(df["Close"], window=50)
-df["SMA200"] = ta.trend.sma_indicator(df["Close"], window=200)
-
-# Bollinger Bands
-bollinger = ta.volatility.BollingerBands(df["Close"], window=20, window_dev=2)
-df["BB_High"] = bollinger.bollinger_hband()
-df["BB_Low"] = bollinger.bollinger_lband()
-df["BB_Mid"] = bollinger.bollinger_mavg()
-
-# RSI
-df["RSI"] = ta.momentum.rsi(df["Close"], window=14)
-
-# MACD
-df["EMA12"] = df["Close"].ewm(span=12).mean()
-df["EMA26"] = df["Close"].ewm(span=26).mean()
-df["MACD"] = df["EMA12"] - df["EMA26"]
-df["MACD_Signal"] = df["MACD"].ewm(span=9).mean()
-df["MACD_Hist"] = df["MACD"] - df["MACD_Signal"]
-
-# Stochastic
-stoch = ta.momentum.StochasticOscillator(df["High"], df["Low"], df["Close"])
-df["Stoch_K"] = stoch.stoch()
-df["Stoch_D"] = stoch.stoch_signal()
-
-# ATR (Average True Range)
-df["ATR"] = ta.volatility.average_true_range(df["High"], df["Low"], df["Close"], window=14)
-
-# Volume indicators
-df["Volume_SMA"] = df["Volume"].rolling(window=20).mean()
-
-# -------------------------------- SIGNAL GENERATION --------------------------------
-df["Signal"] = 0
-df["Signal_Type"] = ""
-
-for i in range(50, len(df)):
-    signals = []
-    
-    # EMA Crossover
-    if df["EMA20"].iloc[i] > df["EMA50"].iloc[i] and df["EMA20"].iloc[i-1] <= df["EMA50"].iloc[i-1]:
-        signals.append("BUY")
-    elif df["EMA20"].iloc[i] < df["EMA50"].iloc[i] and df["EMA20"].iloc[i-1] >= df["EMA50"].iloc[i-1]:
-        signals.append("SELL")
-    
-    # RSI
-    if df["RSI"].iloc[i] < 30:
-        signals.append("BUY (Oversold)")
-    elif df["RSI"].iloc[i] > 70:
-        signals.append("SELL (Overbought)")
-    
-    # MACD
-    if df["MACD"].iloc[i] > df["MACD_Signal"].iloc[i] and df["MACD"].iloc[i-1] <= df["MACD_Signal"].iloc[i-1]:
-        signals.append("BUY (MACD)")
-    elif df["MACD"].iloc[i] < df["MACD_Signal"].iloc[i] and df["MACD"].iloc[i-1] >= df["MACD_Signal"].iloc[i-1]:
-        signals.append("SELL (MACD)")
-    
-    if signals:
-        df.at[df.index[i], "Signal"] = 1 if "BUY" in str(signals) else -1
-        df.at[df.index[i], "Signal_Type"] = " | ".join(signals)
+def compute_indicators(raw):
+    # Indicators and signals are computed once per (ticker, interval, last bar) for
+    # every session; only bars appended since the last computation are processed
+    return get_pipeline().analysis(ticker, timeframe, raw)
+
+df = compute_indicators(df)
+
+with st.sidebar:
+    with st.expander("🧮 Shared Data Cache"):
+        cache_stats = get_shared_data().metrics()
+        st.markdown(
+            f"**Candles:** {cache_stats['candle_hits']} hits / {cache_stats['candle_misses']} fetches "
+            f"({cache_stats['candle_hit_rate']:.0%}; {cache_stats['candle_stale_hits']} stale, "
+            f"{cache_stats['candle_coalesced']} coalesced)  \n"
+            f"**Company info:** {cache_stats['info_hits']} hits / {cache_stats['info_misses']} fetches "
+            f"({cache_stats['info_hit_rate']:.0%})  \n"
+            f"**Indicators:** {cache_stats['frame_hits']} hits / {cache_stats['frame_misses']} computed "
+            f"({cache_stats['frame_hit_rate']:.0%})  \n"
+            f"**Compute time:** {cache_stats['compute_seconds'] * 1e3:.0f} ms total  \n"
+            f"**Held:** {cache_stats['frames']} frames, {cache_stats['series']} series, "
+            f"{cache_stats['store_bytes'] / 1e6:.1f} MB"
+        )
+
+def load_live_frame():
+    raw = with_ticks(fetch_stock_data(ticker, period, timeframe))
+    if raw is None or raw.empty:
+        return df
+    return compute_indicators(raw)
 
 # -------------------------------- HEADER SECTION --------------------------------
-current_price = df["Close"].iloc[-1]
-prev_close = df["Close"].iloc[-2] if len(df) > 1 else current_price
-price_change = current_price - prev_close
-price_change_pct = (price_change / prev_close) * 100
+current_price, prev_close, price_change, price_change_pct = last_change(df)
 
 company_name = stock_info.get("longName", ticker.replace(".NS", ""))
 
@@ -480,16 +553,28 @@ with col1:
     </div>
     """, unsafe_allow_html=True)
 
-with col2:
-    change_class = "price-change-positive" if price_change >= 0 else "price-change-negative"
-    arrow = "▲" if price_change >= 0 else "▼"
+def render_price_card(frame):
+    last_price, _, change, change_pct = last_change(frame)
+    
+    change_class = "price-change-positive" if change >= 0 else "price-change-negative"
+    arrow = "▲" if change >= 0 else "▼"
     st.markdown(f"""
     <div class='metric-card'>
-        <div class='price-large'>₹{current_price:.2f}</div>
-        <div class='{change_class}'>{arrow} {price_change:.2f} ({price_change_pct:.2f}%)</div>
+        <div class='price-large'>₹{last_price:.2f}</div>
+        <div class='{change_class}'>{arrow} {change:.2f} ({change_pct:.2f}%)</div>
     </div>
     """, unsafe_allow_html=True)
 
+with col2:
+    if live_mode:
+        @live_fragment
+        def live_price_card():
+            render_price_card(load_live_frame())
+        
+        live_price_card()
+    else:
+        render_price_card(df)
+
 # -------------------------------- KEY METRICS --------------------------------
 st.markdown("<div class='section-header'>📊 Key Metrics</div>", unsafe_allow_html=True)
 
@@ -514,141 +599,158 @@ for col, (label, value, subtext) in zip([col1, col2, col3, col4, col5, col6], me
         </div>
         """, unsafe_allow_html=True)
 
+# -------------------------------- WATCHLIST --------------------------------
+if watchlist:
+    st.markdown("<div class='section-header'>📌 Watchlist</div>", unsafe_allow_html=True)
+    
+    watchlist_df = fetch_watchlist(tuple(watchlist), period, timeframe)
+    
+    if not watchlist_df.empty:
+        st.dataframe(
+            watchlist_df.style.format({
+                "Last (₹)": "{:.2f}", "Change %": "{:+.2f}%",
+                "High (₹)": "{:.2f}", "Low (₹)": "{:.2f}", "Volume": "{:,.0f}",
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("No watchlist data available right now.")
+
 # -------------------------------- TABS LAYOUT --------------------------------
-tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["📈 Price Chart", "📊 Technical Analysis", "🎯 Signals", "📰 Company Info", "⚖️ Comparison", "📊 Analytics", "🤖 AI Predictions"])
+def plotly_chart(fig, **kwargs):
+    # st.plotly_chart as a "chart" span; while profiling the figure's JSON size is
+    # measured beforehand so the extra serialization stays out of the timing
+    nbytes = len(pio.to_json(fig, validate=False)) if profiler.active else None
+    with span("chart") as s:
+        s.bytes = nbytes
+        return st.plotly_chart(fig, **kwargs)
+
+def tab_span(render_tab):
+    return span(f"tab.{render_tab.__name__.removeprefix('render_').removesuffix('_tab')}")
 
-with tab1:
+def render_price_tab():
     st.markdown("### 🕯️ Price Action & Indicators")
     
-    # Main candlestick chart
-    fig = go.Figure()
-    
-    fig.add_trace(go.Candlestick(
-        x=df.index,
-        open=df["Open"],
-        high=df["High"],
-        low=df["Low"],
-        close=df["Close"],
-        name="OHLC",
-        increasing_line_color="#10b981",
-        decreasing_line_color="#ef4444",
-    ))
-    
-    # Add EMAs
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df["EMA20"],
-        name="EMA 20",
-        line=dict(color="#2dd4bf", width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df["EMA50"],
-        name="EMA 50",
-        line=dict(color="#fbbf24", width=2)
-    ))
-    
-    if show_advanced:
-        # Bollinger Bands
+    def render_price_chart(frame):
+        # Long histories are aggregated into fewer candles, sized from the whole
+        # frame: st.plotly_chart doesn't report zoom back to the script, so a
+        # zoomed-in view keeps the same buckets. Overlays are sampled at each
+        # candle's last bar, so a unified hover shows one bar's values
+        bucket = bucket_size(len(frame))
+        candles = aggregate_ohlcv(frame, bucket)
+        ema20, ema50 = frame["EMA20"].reindex(candles.index), frame["EMA50"].reindex(candles.index)
+        
+        # Main candlestick chart
+        fig = candlestick_figure(candles, height=600)
+        if bucket > 1:
+            # Hovered OHLC values are bucket aggregates, not single bars
+            fig.update_traces(name=f"OHLC ({bucket} bars)", selector=dict(type="candlestick"))
+        
+        # Add EMAs
         fig.add_trace(go.Scatter(
-            x=df.index, y=df["BB_High"],
-            name="BB Upper",
-            line=dict(color="#8b5cf6", width=1, dash="dash"),
-            opacity=0.5
+            x=ema20.index, y=ema20,
+            name="EMA 20",
+            line=dict(color="#2dd4bf", width=2)
         ))
         
         fig.add_trace(go.Scatter(
-            x=df.index, y=df["BB_Low"],
-            name="BB Lower",
-            line=dict(color="#8b5cf6", width=1, dash="dash"),
-            fill='tonexty',
-            opacity=0.2
+            x=ema50.index, y=ema50,
+            name="EMA 50",
+            line=dict(color="#fbbf24", width=2)
         ))
+        
+        if show_advanced:
+            # Bollinger Bands
+            bb_high, bb_low = frame["BB_High"].reindex(candles.index), frame["BB_Low"].reindex(candles.index)
+            
+            fig.add_trace(go.Scatter(
+                x=bb_high.index, y=bb_high,
+                name="BB Upper",
+                line=dict(color="#8b5cf6", width=1, dash="dash"),
+                opacity=0.5
+            ))
+            
+            fig.add_trace(go.Scatter(
+                x=bb_low.index, y=bb_low,
+                name="BB Lower",
+                line=dict(color="#8b5cf6", width=1, dash="dash"),
+                fill='tonexty',
+                opacity=0.2
+            ))
+        
+        # Buy/Sell Signals
+        buy_signals = frame[frame["Signal"] == 1]
+        sell_signals = frame[frame["Signal"] == -1]
+        
+        fig.add_trace(go.Scatter(
+            x=buy_signals.index, y=buy_signals["Low"] * 0.998,
+            mode="markers",
+            marker=dict(symbol="triangle-up", size=12, color="#10b981", line=dict(width=1, color="#ffffff")),
+            name="BUY",
+            text=buy_signals["Signal_Type"],
+            hovertemplate="<b>BUY Signal</b><br>%{text}<extra></extra>"
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=sell_signals.index, y=sell_signals["High"] * 1.002,
+            mode="markers",
+            marker=dict(symbol="triangle-down", size=12, color="#ef4444", line=dict(width=1, color="#ffffff")),
+            name="SELL",
+            text=sell_signals["Signal_Type"],
+            hovertemplate="<b>SELL Signal</b><br>%{text}<extra></extra>"
+        ))
+        
+        # Keeps zoom and pan when live updates redraw the chart
+        fig.update_layout(uirevision=f"{ticker}:{timeframe}")
+        
+        plotly_chart(fig, use_container_width=True, theme=None, key="price_chart")
     
-    # Buy/Sell Signals
-    buy_signals = df[df["Signal"] == 1]
-    sell_signals = df[df["Signal"] == -1]
-    
-    fig.add_trace(go.Scatter(
-        x=buy_signals.index, y=buy_signals["Low"] * 0.998,
-        mode="markers",
-        marker=dict(symbol="triangle-up", size=12, color="#10b981", line=dict(width=1, color="#ffffff")),
-        name="BUY",
-        text=buy_signals["Signal_Type"],
-        hovertemplate="<b>BUY Signal</b><br>%{text}<extra></extra>"
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=sell_signals.index, y=sell_signals["High"] * 1.002,
-        mode="markers",
-        marker=dict(symbol="triangle-down", size=12, color="#ef4444", line=dict(width=1, color="#ffffff")),
-        name="SELL",
-        text=sell_signals["Signal_Type"],
-        hovertemplate="<b>SELL Signal</b><br>%{text}<extra></extra>"
-    ))
-    
-    fig.update_layout(
-        height=600,
-        plot_bgcolor="#0a0e1a",
-        paper_bgcolor="#0a0e1a",
-        font=dict(color="#e4e7eb", family="Inter"),
-        xaxis=dict(
-            gridcolor="#1e293b",
-            showgrid=True,
-        ),
-        yaxis=dict(
-            gridcolor="#1e293b",
-            showgrid=True,
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        hovermode="x unified"
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    if live_mode:
+        @live_fragment
+        def live_price_chart():
+            render_price_chart(load_live_frame())
+        
+        live_price_chart()
+    else:
+        render_price_chart(df)
     
     # Volume chart
     if show_volume:
         st.markdown("### 📊 Volume Analysis")
         
-        colors = ['#10b981' if df["Close"].iloc[i] >= df["Open"].iloc[i] else '#ef4444' 
-                  for i in range(len(df))]
+        volume_bucket = bucket_size(len(df))
+        volume_bars = aggregate_ohlcv(df, volume_bucket)
+        volume_sma = df["Volume_SMA"].reindex(volume_bars.index)
+        colors = np.where(volume_bars["Close"] >= volume_bars["Open"], '#10b981', '#ef4444')
         
         fig_volume = go.Figure()
         
         fig_volume.add_trace(go.Bar(
-            x=df.index,
-            y=df["Volume"],
+            x=volume_bars.index,
+            y=volume_bars["Volume"],
             marker_color=colors,
-            name="Volume",
+            name=f"Volume ({volume_bucket} bars)" if volume_bucket > 1 else "Volume",
             opacity=0.7
         ))
         
         fig_volume.add_trace(go.Scatter(
-            x=df.index,
-            y=df["Volume_SMA"],
+            x=volume_sma.index,
+            y=volume_sma,
             name="Volume SMA",
             line=dict(color="#2dd4bf", width=2)
         ))
         
         fig_volume.update_layout(
             height=200,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b", title="Volume"),
+            yaxis=dict(title="Volume"),
             showlegend=False,
             margin=dict(l=0, r=0, t=0, b=0)
         )
         
-        st.plotly_chart(fig_volume, use_container_width=True)
+        plotly_chart(fig_volume, use_container_width=True, theme=None)
 
-with tab2:
+def render_technical_tab():
     st.markdown("### 📈 Technical Indicators")
     
     col1, col2 = st.columns(2)
@@ -656,7 +758,11 @@ with tab2:
     with col1:
         # RSI
         st.markdown("#### RSI (14)")
-        fig_rsi = go.Figure()
+        fig_rsi = oscillator_figure(
+            height=300,
+            y_range=[0, 100],
+            levels=[(70, "#ef4444", "Overbought"), (30, "#10b981", "Oversold")]
+        )
         
         fig_rsi.add_trace(go.Scatter(
             x=df.index, y=df["RSI"],
@@ -665,20 +771,7 @@ with tab2:
             name="RSI"
         ))
         
-        fig_rsi.add_hline(y=70, line_dash="dash", line_color="#ef4444", annotation_text="Overbought")
-        fig_rsi.add_hline(y=30, line_dash="dash", line_color="#10b981", annotation_text="Oversold")
-        
-        fig_rsi.update_layout(
-            height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b", range=[0, 100]),
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig_rsi, use_container_width=True)
+        plotly_chart(fig_rsi, use_container_width=True, theme=None)
         
         # Current RSI value
         current_rsi = df["RSI"].iloc[-1]
@@ -688,7 +781,7 @@ with tab2:
     with col2:
         # MACD
         st.markdown("#### MACD")
-        fig_macd = go.Figure()
+        fig_macd = oscillator_figure(height=300, showlegend=True, legend=LEGEND_TOP)
         
         fig_macd.add_trace(go.Scatter(
             x=df.index, y=df["MACD"],
@@ -702,7 +795,7 @@ with tab2:
             name="Signal"
         ))
         
-        colors = ['#10b981' if val >= 0 else '#ef4444' for val in df["MACD_Hist"]]
+        colors = np.where(df["MACD_Hist"] >= 0, '#10b981', '#ef4444')
         fig_macd.add_trace(go.Bar(
             x=df.index, y=df["MACD_Hist"],
             marker_color=colors,
@@ -710,18 +803,7 @@ with tab2:
             opacity=0.5
         ))
         
-        fig_macd.update_layout(
-            height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b"),
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        
-        st.plotly_chart(fig_macd, use_container_width=True)
+        plotly_chart(fig_macd, use_container_width=True, theme=None)
         
         # MACD status
         macd_status = "Bullish 🟢" if df["MACD"].iloc[-1] > df["MACD_Signal"].iloc[-1] else "Bearish 🔴"
@@ -734,7 +816,12 @@ with tab2:
         with col3:
             # Stochastic Oscillator
             st.markdown("#### Stochastic Oscillator")
-            fig_stoch = go.Figure()
+            fig_stoch = oscillator_figure(
+                height=250,
+                y_range=[0, 100],
+                levels=[(80, "#ef4444", None), (20, "#10b981", None)],
+                showlegend=True
+            )
             
             fig_stoch.add_trace(go.Scatter(
                 x=df.index, y=df["Stoch_K"],
@@ -748,25 +835,12 @@ with tab2:
                 name="%D"
             ))
             
-            fig_stoch.add_hline(y=80, line_dash="dash", line_color="#ef4444")
-            fig_stoch.add_hline(y=20, line_dash="dash", line_color="#10b981")
-            
-            fig_stoch.update_layout(
-                height=250,
-                plot_bgcolor="#0a0e1a",
-                paper_bgcolor="#0a0e1a",
-                font=dict(color="#e4e7eb"),
-                xaxis=dict(gridcolor="#1e293b"),
-                yaxis=dict(gridcolor="#1e293b", range=[0, 100]),
-                showlegend=True
-            )
-            
-            st.plotly_chart(fig_stoch, use_container_width=True)
+            plotly_chart(fig_stoch, use_container_width=True, theme=None)
         
         with col4:
             # ATR (Volatility)
             st.markdown("#### Average True Range (Volatility)")
-            fig_atr = go.Figure()
+            fig_atr = oscillator_figure(height=250)
             
             fig_atr.add_trace(go.Scatter(
                 x=df.index, y=df["ATR"],
@@ -775,21 +849,11 @@ with tab2:
                 name="ATR"
             ))
             
-            fig_atr.update_layout(
-                height=250,
-                plot_bgcolor="#0a0e1a",
-                paper_bgcolor="#0a0e1a",
-                font=dict(color="#e4e7eb"),
-                xaxis=dict(gridcolor="#1e293b"),
-                yaxis=dict(gridcolor="#1e293b"),
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig_atr, use_container_width=True)
+            plotly_chart(fig_atr, use_container_width=True, theme=None)
             
             st.markdown(f"**Current ATR:** ₹{df['ATR'].iloc[-1]:.2f}")
 
-with tab3:
+def render_signals_tab():
     st.markdown("### 🎯 Trading Signals & Analysis")
     
     # Stock Scorecard
@@ -830,11 +894,7 @@ with tab3:
         st.markdown("#### 🎯 Analyst Ratings")
         
         # Calculate simple score
-        score = 0
-        if price_change_pct > 0: score += 1
-        if df["RSI"].iloc[-1] > 30 and df["RSI"].iloc[-1] < 70: score += 1
-        if df["MACD"].iloc[-1] > df["MACD_Signal"].iloc[-1]: score += 1
-        if df["EMA20"].iloc[-1] > df["EMA50"].iloc[-1]: score += 1
+        score = rating_score(df)
         
         # Simulate ratings (in real app, use actual analyst data)
         buy_count = max(20, int(score * 6.5))
@@ -880,8 +940,180 @@ with tab3:
         st.dataframe(recent_signals, use_container_width=True, height=400)
     else:
         st.info("No recent signals generated. Continue monitoring...")
+    
+    st.markdown("---")
+    
+    # Backtest of the same signals
+    st.markdown("#### 🧪 Signal Backtest")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        slippage_bps = st.number_input("Slippage (bps per side)", 0.0, 100.0, SLIPPAGE_BPS, 0.5, key="bt_slippage")
+    with col2:
+        brokerage_bps = st.number_input("Brokerage (bps per side)", 0.0, 100.0, BROKERAGE_BPS, 0.5, key="bt_brokerage")
+    with col3:
+        allow_short = st.checkbox("Allow short positions", value=False, key="bt_short",
+                                  help="SELL signals open a short instead of just closing the long")
+    
+    result = backtest(df, slippage_bps, brokerage_bps, allow_short=allow_short)
+    bt = result["metrics"]
+    
+    metrics_display = [
+        ("Total Return", f"{bt['Total Return %']:+.2f}%", "After costs"),
+        ("Sharpe Ratio", f"{bt['Sharpe']:.2f}", "Risk-Adjusted Return"),
+        ("Max Drawdown", f"{bt['Max Drawdown %']:.2f}%", "Largest Drop"),
+        ("Win Rate", f"{bt['Win Rate %']:.1f}%" if bt["Trades"] else "—", f"{bt['Trades']} trades"),
+        ("Exposure", f"{bt['Exposure %']:.1f}%", "Bars in the market"),
+    ]
+    
+    for col, (label, value, desc) in zip(st.columns(5), metrics_display):
+        with col:
+            color = "#10b981" if "+" in value else "#ef4444" if label == "Max Drawdown" or value.startswith("-") else "#2dd4bf"
+            st.markdown(f"""
+            <div class='metric-card' style='text-align: center;'>
+                <div class='metric-label'>{label}</div>
+                <div class='metric-value' style='color: {color};'>{value}</div>
+                <div class='metric-subtext'>{desc}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    equity = lttb_series(result["equity"])
+    drawdown = lttb_series(result["drawdown"])
+    
+    fig_equity = oscillator_figure(height=300, yaxis=dict(title="Equity (₹)"))
+    fig_equity.add_trace(go.Scatter(
+        x=equity.index, y=equity,
+        name="Equity", line=dict(color='#2dd4bf', width=2)
+    ))
+    plotly_chart(fig_equity, use_container_width=True, theme=None)
+    
+    fig_drawdown = oscillator_figure(height=200, yaxis=dict(title="Drawdown (%)"))
+    fig_drawdown.add_trace(go.Scatter(
+        x=drawdown.index, y=drawdown,
+        name="Drawdown", fill='tozeroy', line=dict(color='#ef4444', width=1)
+    ))
+    plotly_chart(fig_drawdown, use_container_width=True, theme=None)
+    
+    trades = result["trades"]
+    if not trades.empty:
+        st.dataframe(
+            trades.tail(20).iloc[::-1].style.format({
+                "Entry (₹)": "{:.2f}", "Exit (₹)": "{:.2f}", "Return %": "{:+.2f}%",
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("No trades were opened over this period.")
+    
+    with st.expander("🔬 Parameter Optimizer (EMA, RSI and MACD settings)"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            search = st.radio("Search", ["Grid", "Random"], horizontal=True, key="opt_search")
+        with col2:
+            samples = st.number_input("Random samples", 100, 20000, 2000, 100, key="opt_samples",
+                                      disabled=search == "Grid")
+        with col3:
+            workers = st.number_input("Worker processes", 1, os.cpu_count() or 1, 1, key="opt_workers")
+        
+        if st.button("▶️ Run Optimizer", key="run_sweep"):
+            params = parameter_grid() if search == "Grid" else random_params(int(samples), seed=0)
+            context = (ticker, timeframe, frame_version(df), slippage_bps, brokerage_bps, allow_short)
+            progress = st.progress(0.0, text="Backtesting parameter sets...")
+            live_table = st.empty()
+            parts, done = [], 0
+            # Chunks stream back as workers finish; show the running leaderboard
+            for part in optimize(df["Close"].to_numpy(), params, context, get_optimizer_cache(),
+                                 workers=int(workers), slippage_bps=slippage_bps,
+                                 brokerage_bps=brokerage_bps, allow_short=allow_short):
+                parts.append(part)
+                done += len(part)
+                progress.progress(min(done / max(len(params), 1), 1.0), text=f"{done}/{len(params)} parameter sets")
+                live_table.dataframe(rank_results(pd.concat(parts, ignore_index=True)).head(10),
+                                     use_container_width=True, hide_index=True)
+            progress.empty()
+            live_table.empty()
+            st.session_state["sweep_result"] = rank_results(pd.concat(parts, ignore_index=True))
+        
+        sweep_df = st.session_state.get("sweep_result")
+        if sweep_df is not None:
+            st.caption(f"{len(sweep_df)} parameter sets, best Sharpe first")
+            st.dataframe(
+                sweep_df.head(25).rename(columns={
+                    "ema_fast": "EMA Fast", "ema_slow": "EMA Slow", "rsi_window": "RSI Window",
+                    "rsi_low": "RSI Buy <", "rsi_high": "RSI Sell >",
+                    "macd_fast": "MACD Fast", "macd_slow": "MACD Slow", "macd_signal": "MACD Signal",
+                }).style.format({
+                    "Total Return %": "{:+.2f}%", "Sharpe": "{:.2f}", "Max Drawdown %": "{:.2f}%",
+                    "Win Rate %": "{:.1f}%", "Exposure %": "{:.1f}%",
+                }, na_rep="—"),
+                use_container_width=True,
+                hide_index=True
+            )
+
+@st.cache_resource
+def get_optimizer_cache():
+    # Per (ticker, interval, last bar, costs, parameter set); shared by every session
+    return ResultCache()
 
-with tab4:
+def render_scanner_tab():
+    st.markdown("### 🛰️ Market Scanner")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        universe_name = st.selectbox("Universe", ["NIFTY 50", "Custom"], key="scan_universe")
+    with col2:
+        uploaded = None
+        custom = ""
+        if universe_name == "Custom":
+            custom = st.text_area("Symbols", "RELIANCE, TCS, INFY, HDFCBANK, ITC, SBIN", height=68,
+                                  help="Comma or line separated NSE symbols")
+            uploaded = st.file_uploader("...or an NSE index constituents CSV (e.g. NIFTY 500)", type="csv")
+    
+    if universe_name == "NIFTY 50":
+        universe = nse_symbols(NIFTY_50)
+    elif uploaded is not None:
+        universe = parse_universe(uploaded.getvalue().decode("utf-8"))
+    else:
+        universe = parse_universe(custom)
+    
+    st.caption(f"{len(universe)} symbols · {timeframe} bars over {period}")
+    
+    if st.button("▶️ Run Scan", key="run_scan"):
+        st.session_state["scan_request"] = (tuple(universe), period, timeframe)
+    
+    request = st.session_state.get("scan_request")
+    if request is None:
+        st.info("Pick a universe and run the scan to rank current BUY/SELL signals.")
+        return
+    
+    with st.spinner(f"Scanning {len(request[0])} symbols..."):
+        scan_df = fetch_scan(*request)
+    
+    if scan_df.empty:
+        st.info("No scan results available right now.")
+        return
+    
+    buys = int((scan_df["Signal"] == "BUY").sum())
+    sells = int((scan_df["Signal"] == "SELL").sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Scanned", len(scan_df))
+    col2.metric("🟢 Fresh BUY", buys)
+    col3.metric("🔴 Fresh SELL", sells)
+    
+    st.dataframe(
+        scan_df.style.format({
+            "Bars Ago": "{:.0f}", "Last (₹)": "{:.2f}", "Change %": "{:+.2f}%",
+            "RSI": "{:.1f}", "MACD Hist": "{:+.2f}", "Stoch %K": "{:.1f}", "ATR %": "{:.2f}%",
+        }, na_rep=""),
+        use_container_width=True,
+        hide_index=True,
+        height=500
+    )
+
+def render_company_tab():
+    import plotly.express as px
+    
     st.markdown("### 🏢 Company Information")
     
     col1, col2, col3 = st.columns(3)
@@ -955,15 +1187,12 @@ with tab4:
         fig_margins.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
         fig_margins.update_layout(
             height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b", title=""),
-            yaxis=dict(gridcolor="#1e293b", title="Percentage (%)"),
+            xaxis=dict(title=""),
+            yaxis=dict(title="Percentage (%)"),
             showlegend=False
         )
         
-        st.plotly_chart(fig_margins, use_container_width=True)
+        plotly_chart(fig_margins, use_container_width=True, theme=None)
     
     with col2:
         st.markdown("#### 💰 Revenue Distribution (Simulated)")
@@ -990,14 +1219,11 @@ with tab4:
         
         fig_revenue.update_layout(
             height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
             showlegend=True,
             legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
         )
         
-        st.plotly_chart(fig_revenue, use_container_width=True)
+        plotly_chart(fig_revenue, use_container_width=True, theme=None)
     
     st.markdown("---")
     
@@ -1043,14 +1269,10 @@ with tab4:
     
     fig_trends.update_layout(
         height=400,
-        plot_bgcolor="#0a0e1a",
-        paper_bgcolor="#0a0e1a",
-        font=dict(color="#e4e7eb"),
-        xaxis=dict(gridcolor="#1e293b", title="Quarter"),
+        xaxis=dict(title="Quarter"),
         yaxis=dict(
             title=dict(text="Revenue (₹Cr)", font=dict(color="#2dd4bf")),
-            tickfont=dict(color="#2dd4bf"),
-            gridcolor="#1e293b"
+            tickfont=dict(color="#2dd4bf")
         ),
         yaxis2=dict(
             title=dict(text="Profit (₹Cr)", font=dict(color="#10b981")),
@@ -1067,10 +1289,10 @@ with tab4:
             overlaying="y",
             side="right"
         ),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        legend=LEGEND_TOP
     )
     
-    st.plotly_chart(fig_trends, use_container_width=True)
+    plotly_chart(fig_trends, use_container_width=True, theme=None)
     
     st.markdown("---")
     
@@ -1078,7 +1300,9 @@ with tab4:
     summary = stock_info.get('longBusinessSummary', 'No description available.')
     st.markdown(f"<div style='background: #0f172a; padding: 1.5rem; border-radius: 12px; border: 1px solid #1e293b;'>{summary}</div>", unsafe_allow_html=True)
 
-with tab5:
+def render_comparison_tab():
+    import plotly.express as px
+    
     st.markdown("### ⚖️ Peer Comparison")
     
     # Simulated peer data (in production, fetch real data)
@@ -1115,47 +1339,25 @@ with tab5:
     with col1:
         st.markdown("#### 📊 P/E Ratio Comparison")
         colors = ['#2dd4bf' if i == 0 else '#64748b' for i in range(len(peer_df))]
-        fig_pe = px.bar(
-            peer_df, 
-            x="Company", 
-            y="P/E",
-            color="Company",
-            color_discrete_sequence=colors,
-            text="P/E"
+        fig_pe = bar_figure(
+            peer_df["Company"],
+            peer_df["P/E"],
+            colors,
+            texttemplate='%{text:.1f}',
+            yaxis=dict(title="P/E Ratio")
         )
-        fig_pe.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig_pe.update_layout(
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            showlegend=False,
-            height=300,
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b", title="P/E Ratio")
-        )
-        st.plotly_chart(fig_pe, use_container_width=True)
+        plotly_chart(fig_pe, use_container_width=True, theme=None)
     
     with col2:
         st.markdown("#### 💰 ROE % Comparison")
-        fig_roe = px.bar(
-            peer_df, 
-            x="Company", 
-            y="ROE %",
-            color="Company",
-            color_discrete_sequence=colors,
-            text="ROE %"
-        )
-        fig_roe.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig_roe.update_layout(
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            showlegend=False,
-            height=300,
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b", title="Return on Equity (%)")
+        fig_roe = bar_figure(
+            peer_df["Company"],
+            peer_df["ROE %"],
+            colors,
+            texttemplate='%{text:.1f}%',
+            yaxis=dict(title="Return on Equity (%)")
         )
-        st.plotly_chart(fig_roe, use_container_width=True)
+        plotly_chart(fig_roe, use_container_width=True, theme=None)
     
     st.markdown("---")
     
@@ -1177,39 +1379,24 @@ with tab5:
         )
         fig_mcap.update_layout(
             height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
             showlegend=False
         )
-        st.plotly_chart(fig_mcap, use_container_width=True)
+        plotly_chart(fig_mcap, use_container_width=True, theme=None)
     
     with col4:
         st.markdown("#### 📊 52-Week Performance")
         # Create performance comparison
-        perf_colors = ['#10b981' if x > 0 else '#ef4444' for x in peer_df['52W Change %']]
-        fig_perf = go.Figure()
-        
-        fig_perf.add_trace(go.Bar(
-            x=peer_df['Company'],
-            y=peer_df['52W Change %'],
-            marker_color=perf_colors,
-            text=peer_df['52W Change %'],
+        perf_colors = np.where(peer_df['52W Change %'] > 0, '#10b981', '#ef4444')
+        fig_perf = bar_figure(
+            peer_df['Company'],
+            peer_df['52W Change %'],
+            perf_colors,
             texttemplate='%{text:.1f}%',
-            textposition='outside'
-        ))
-        
-        fig_perf.update_layout(
-            height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b", title=""),
-            yaxis=dict(gridcolor="#1e293b", title="Change (%)"),
-            showlegend=False
+            xaxis=dict(title=""),
+            yaxis=dict(title="Change (%)")
         )
         
-        st.plotly_chart(fig_perf, use_container_width=True)
+        plotly_chart(fig_perf, use_container_width=True, theme=None)
     
     st.markdown("---")
     
@@ -1257,24 +1444,24 @@ with tab5:
         polar=dict(
             radialaxis=dict(
                 visible=True,
-                range=[0, 100],
-                gridcolor='#1e293b'
-            ),
-            bgcolor='#0a0e1a'
+                range=[0, 100]
+            )
         ),
         showlegend=True,
         height=400,
-        plot_bgcolor="#0a0e1a",
-        paper_bgcolor="#0a0e1a",
-        font=dict(color="#e4e7eb"),
         legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
     )
     
-    st.plotly_chart(fig_radar, use_container_width=True)
+    plotly_chart(fig_radar, use_container_width=True, theme=None)
 
-with tab6:
+def render_analytics_tab():
+    import plotly.express as px
+    
     st.markdown("### 📊 Advanced Analytics & Insights")
     
+    # Shared by every session per frame version, without cache_data's pickle round trip
+    stats = get_pipeline().summary(ticker, timeframe, df)
+    
     # Price Distribution Analysis
     st.markdown("#### 📈 Price Distribution & Statistics")
     
@@ -1284,10 +1471,7 @@ with tab6:
         st.markdown("##### 📊 Price Range Distribution")
         
         # Create price bins
-        price_range = df['Close'].max() - df['Close'].min()
-        bins = 5
-        df['Price_Bin'] = pd.cut(df['Close'], bins=bins)
-        price_dist = df['Price_Bin'].value_counts().sort_index()
+        price_dist = stats["price_dist"]
         
         fig_price_dist = px.bar(
             x=[f"₹{interval.left:.0f}-{interval.right:.0f}" for interval in price_dist.index],
@@ -1299,46 +1483,35 @@ with tab6:
         
         fig_price_dist.update_layout(
             height=250,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b", title="Price Range (₹)"),
-            yaxis=dict(gridcolor="#1e293b", title="Count"),
+            xaxis=dict(title="Price Range (₹)"),
+            yaxis=dict(title="Count"),
             showlegend=False
         )
         
-        st.plotly_chart(fig_price_dist, use_container_width=True)
+        plotly_chart(fig_price_dist, use_container_width=True, theme=None)
     
     with col2:
         st.markdown("##### 📊 Returns Distribution")
         
-        # Calculate returns
-        df['Returns'] = df['Close'].pct_change() * 100
-        
         fig_returns = px.histogram(
-            df.dropna(),
-            x='Returns',
+            x=stats["returns_hist"],
             nbins=30,
             color_discrete_sequence=['#2dd4bf']
         )
         
         fig_returns.update_layout(
             height=250,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b", title="Returns (%)"),
-            yaxis=dict(gridcolor="#1e293b", title="Frequency"),
+            xaxis=dict(title="Returns (%)"),
+            yaxis=dict(title="Frequency"),
             showlegend=False
         )
         
-        st.plotly_chart(fig_returns, use_container_width=True)
+        plotly_chart(fig_returns, use_container_width=True, theme=None)
     
     with col3:
         st.markdown("##### 📊 Volume Distribution")
         
-        volume_bins = pd.cut(df['Volume'], bins=5)
-        volume_dist = volume_bins.value_counts().sort_index()
+        volume_dist = stats["volume_dist"]
         
         labels = [f"{int(interval.left/1000000)}M-{int(interval.right/1000000)}M" for interval in volume_dist.index]
         
@@ -1357,14 +1530,11 @@ with tab6:
         
         fig_vol_pie.update_layout(
             height=250,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
             showlegend=True,
             legend=dict(orientation="h", yanchor="top", y=-0.1, xanchor="center", x=0.5)
         )
         
-        st.plotly_chart(fig_vol_pie, use_container_width=True)
+        plotly_chart(fig_vol_pie, use_container_width=True, theme=None)
     
     st.markdown("---")
     
@@ -1376,9 +1546,9 @@ with tab6:
     with col1:
         st.markdown("##### 🟢🔴 Bullish vs Bearish Days")
         
-        bullish_days = (df['Close'] > df['Open']).sum()
-        bearish_days = (df['Close'] < df['Open']).sum()
-        neutral_days = (df['Close'] == df['Open']).sum()
+        bullish_days = stats["bullish_days"]
+        bearish_days = stats["bearish_days"]
+        neutral_days = stats["neutral_days"]
         
         sentiment_data = pd.DataFrame({
             'Sentiment': ['Bullish', 'Bearish', 'Neutral'],
@@ -1403,14 +1573,12 @@ with tab6:
         
         fig_sentiment.update_layout(
             height=350,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb", size=12),
+            font=dict(size=12),
             showlegend=False,
             annotations=[dict(text=f'Total<br>{len(df)} Days', x=0.5, y=0.5, font_size=16, showarrow=False)]
         )
         
-        st.plotly_chart(fig_sentiment, use_container_width=True)
+        plotly_chart(fig_sentiment, use_container_width=True, theme=None)
         
         # Stats
         bull_pct = (bullish_days / len(df)) * 100
@@ -1418,7 +1586,7 @@ with tab6:
         <div style='background: #0f172a; padding: 1rem; border-radius: 10px; border: 1px solid #1e293b; margin-top: 1rem;'>
             <div style='color: #10b981; font-size: 1.2rem; font-weight: 600;'>Bullish Trend: {bull_pct:.1f}%</div>
             <div style='color: #64748b; font-size: 0.875rem; margin-top: 0.5rem;'>
-                Average Bullish Gain: +{df[df['Close'] > df['Open']]['Returns'].mean():.2f}%
+                Average Bullish Gain: +{stats["avg_bullish_gain"]:.2f}%
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -1427,11 +1595,7 @@ with tab6:
         st.markdown("##### 📊 Volume by Price Movement")
         
         # Categorize by price movement
-        df['Movement'] = pd.cut(df['Returns'].fillna(0), 
-                                bins=[-float('inf'), -2, -0.5, 0.5, 2, float('inf')],
-                                labels=['Strong Down', 'Down', 'Flat', 'Up', 'Strong Up'])
-        
-        movement_volume = df.groupby('Movement', observed=True)['Volume'].sum()
+        movement_volume = stats["movement_volume"]
         
         colors_map = {
             'Strong Down': '#7f1d1d',
@@ -1443,36 +1607,26 @@ with tab6:
         
         colors = [colors_map[m] for m in movement_volume.index]
         
-        fig_vol_movement = go.Figure()
-        
-        fig_vol_movement.add_trace(go.Bar(
-            x=movement_volume.index,
-            y=movement_volume.values,
-            marker_color=colors,
-            text=[f"{v/1000000:.1f}M" for v in movement_volume.values],
-            textposition='outside'
-        ))
-        
-        fig_vol_movement.update_layout(
+        fig_vol_movement = bar_figure(
+            movement_volume.index,
+            movement_volume.values,
+            colors,
             height=350,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b", title="Price Movement"),
-            yaxis=dict(gridcolor="#1e293b", title="Total Volume"),
-            showlegend=False
+            text=[f"{v/1000000:.1f}M" for v in movement_volume.values],
+            xaxis=dict(title="Price Movement"),
+            yaxis=dict(title="Total Volume")
         )
         
-        st.plotly_chart(fig_vol_movement, use_container_width=True)
+        plotly_chart(fig_vol_movement, use_container_width=True, theme=None)
         
         # High volume insight
-        high_vol_days = df[df['Volume'] > df['Volume'].quantile(0.75)]
-        avg_return_high_vol = high_vol_days['Returns'].mean()
+        high_vol_days = stats["high_vol_days"]
+        avg_return_high_vol = stats["avg_return_high_vol"]
         vol_color = '#10b981' if avg_return_high_vol > 0 else '#ef4444'
         
         st.markdown(f"""
         <div style='background: #0f172a; padding: 1rem; border-radius: 10px; border: 1px solid #1e293b; margin-top: 1rem;'>
-            <div style='color: {vol_color}; font-size: 1.2rem; font-weight: 600;'>High Volume Days: {len(high_vol_days)}</div>
+            <div style='color: {vol_color}; font-size: 1.2rem; font-weight: 600;'>High Volume Days: {high_vol_days}</div>
             <div style='color: #64748b; font-size: 0.875rem; margin-top: 0.5rem;'>
                 Average Return on High Volume: {avg_return_high_vol:+.2f}%
             </div>
@@ -1490,11 +1644,7 @@ with tab6:
         st.markdown("##### RSI Zones Distribution")
         
         # RSI zones
-        rsi_zones = pd.cut(df['RSI'].dropna(), 
-                          bins=[0, 30, 50, 70, 100],
-                          labels=['Oversold (<30)', 'Weak (30-50)', 'Strong (50-70)', 'Overbought (>70)'])
-        
-        rsi_dist = rsi_zones.value_counts()
+        rsi_dist = stats["rsi_dist"]
         
         colors_rsi = ['#10b981', '#fbbf24', '#2dd4bf', '#ef4444']
         
@@ -1509,25 +1659,17 @@ with tab6:
         fig_rsi_zones.update_traces(textposition='outside')
         fig_rsi_zones.update_layout(
             height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b", title=""),
-            yaxis=dict(gridcolor="#1e293b", title="Days"),
+            xaxis=dict(title=""),
+            yaxis=dict(title="Days"),
             showlegend=False
         )
         
-        st.plotly_chart(fig_rsi_zones, use_container_width=True)
+        plotly_chart(fig_rsi_zones, use_container_width=True, theme=None)
     
     with col2:
         st.markdown("##### MACD Signal Strength")
         
-        df['MACD_Strength'] = abs(df['MACD_Hist'])
-        strength_bins = pd.cut(df['MACD_Strength'].dropna(),
-                              bins=5,
-                              labels=['Very Weak', 'Weak', 'Moderate', 'Strong', 'Very Strong'])
-        
-        strength_dist = strength_bins.value_counts().sort_index()
+        strength_dist = stats["strength_dist"]
         
         fig_macd_strength = px.pie(
             values=strength_dist.values,
@@ -1544,19 +1686,14 @@ with tab6:
         
         fig_macd_strength.update_layout(
             height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
             showlegend=False
         )
         
-        st.plotly_chart(fig_macd_strength, use_container_width=True)
+        plotly_chart(fig_macd_strength, use_container_width=True, theme=None)
     
     with col3:
         st.markdown("##### Volatility (ATR) Trend")
         
-        df['ATR_Trend'] = df['ATR'].rolling(window=5).mean()
-        
         fig_atr_trend = go.Figure()
         
         fig_atr_trend.add_trace(go.Scatter(
@@ -1569,23 +1706,19 @@ with tab6:
         
         fig_atr_trend.add_trace(go.Scatter(
             x=df.index,
-            y=df['ATR_Trend'],
+            y=stats["atr_trend"],
             name='ATR Trend',
             line=dict(color='#2dd4bf', width=3)
         ))
         
         fig_atr_trend.update_layout(
             height=300,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b", title="ATR Value"),
+            yaxis=dict(title="ATR Value"),
             showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            legend=LEGEND_TOP
         )
         
-        st.plotly_chart(fig_atr_trend, use_container_width=True)
+        plotly_chart(fig_atr_trend, use_container_width=True, theme=None)
     
     st.markdown("---")
     
@@ -1594,11 +1727,11 @@ with tab6:
     
     col1, col2, col3, col4 = st.columns(4)
     
-    # Calculate key metrics
-    total_return = ((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0]) * 100
-    volatility = df['Returns'].std()
-    sharpe_ratio = (df['Returns'].mean() / df['Returns'].std()) * np.sqrt(252) if df['Returns'].std() != 0 else 0
-    max_drawdown = ((df['Close'] / df['Close'].cummax()) - 1).min() * 100
+    # Key metrics
+    total_return = stats["total_return"]
+    volatility = stats["volatility"]
+    sharpe_ratio = stats["sharpe_ratio"]
+    max_drawdown = stats["max_drawdown"]
     
     metrics_display = [
         ("Total Return", f"{total_return:+.2f}%", "Period Performance"),
@@ -1623,7 +1756,7 @@ with tab6:
     # Correlation Matrix (if multiple indicators)
     st.markdown("#### 🔗 Indicator Correlation Heatmap")
     
-    correlation_data = df[['Close', 'Volume', 'RSI', 'MACD', 'ATR']].corr()
+    correlation_data = stats["correlation"]
     
     fig_corr = px.imshow(
         correlation_data,
@@ -1637,17 +1770,43 @@ with tab6:
     
     fig_corr.update_layout(
         height=400,
-        plot_bgcolor="#0a0e1a",
-        paper_bgcolor="#0a0e1a",
-        font=dict(color="#e4e7eb"),
         xaxis=dict(side='bottom')
     )
     
-    st.plotly_chart(fig_corr, use_container_width=True)
+    plotly_chart(fig_corr, use_container_width=True, theme=None)
+
+MODEL_DIR = os.environ.get("STOCKPULSE_MODEL_DIR", os.path.join(".cache", "models"))
+JOB_POLL_SEC = 2
+
+@st.cache_resource
+def get_model_registry():
+    # Trained models on disk and training jobs shared by every session, so a model is trained once for everyone
+    return ModelRegistry(MODEL_DIR)
 
-with tab7:
+def training_status(registry):
+    # As a fragment this polls the background job, and once it finishes the whole tab
+    # reruns to show its predictions; without fragments the user checks back by hand
+    job = registry.job(ticker, timeframe)
+    if job is None or not job.pending:
+        st.rerun()
+    status = job.status()
+    st.info(f"🧠 Training {ticker} {timeframe} models in the background ({status['state']}, "
+            f"{status['seconds']:.0f}s). Predictions appear here when it finishes.")
+    if not hasattr(st, "fragment"):
+        st.button("🔄 Check training status")
+
+if hasattr(st, "fragment"):
+    training_status = st.fragment(run_every=JOB_POLL_SEC)(training_status)
+
+def render_predictions_tab():
     st.markdown("### 🤖 AI-Powered Market Predictions")
     
+    # The ML stack itself is only imported by the training worker and when a model is loaded
+    if importlib.util.find_spec("ml_predictor") is None:
+        st.warning("⚠️ ML Predictor not available. Download ml_predictor.py to enable AI predictions.")
+        st.info("💡 Tip: Install required packages: pip install tensorflow prophet scikit-learn")
+        return
+    
     st.markdown("""
     <div style='background: #0f172a; padding: 1rem; border-radius: 10px; border: 1px solid #2dd4bf; margin-bottom: 2rem;'>
         <p style='color: #2dd4bf; font-weight: 600; margin: 0;'>⚡ Hybrid ML System Active</p>
@@ -1657,6 +1816,8 @@ with tab7:
     </div>
     """, unsafe_allow_html=True)
     
+    registry = get_model_registry()
+    
     # Prediction controls
     col1, col2, col3 = st.columns([2, 2, 1])
     
@@ -1665,48 +1826,42 @@ with tab7:
     
     with col2:
         st.markdown("<div style='margin-top: 1.5rem;'></div>", unsafe_allow_html=True)
-        train_new_model = st.checkbox("🔄 Train Fresh Model (takes 30-60s)", value=False)
+        train_new_model = st.checkbox("🔄 Train Fresh Model (runs in the background)", value=False)
     
     with col3:
         st.markdown("<div style='margin-top: 1.5rem;'></div>", unsafe_allow_html=True)
-        if st.button("🚀 Generate Predictions", type="primary"):
-            st.session_state.run_predictions = True
-    
-    # Initialize predictors
-    if 'run_predictions' not in st.session_state:
-        st.session_state.run_predictions = False
-    
-    if st.session_state.run_predictions or 'ml_results' not in st.session_state:
-        with st.spinner("🧠 AI Models analyzing market data..."):
-            try:
-                ensemble = EnsemblePredictor()
-                trend_predictor = TrendPredictor()
-                sr_predictor = SupportResistancePredictor()
-                
-                # Get predictions
-                ml_results = ensemble.predict_all(df, days_ahead=prediction_days, train_models=train_new_model)
-                
-                # Store in session
-                st.session_state.ml_results = ml_results
-                st.session_state.prediction_timestamp = datetime.now()
-                
-                st.success("✅ Predictions generated successfully!")
-                
-            except Exception as e:
-                st.error(f"❌ Prediction error: {str(e)}")
-                st.info("💡 Tip: Install required packages: pip install tensorflow prophet scikit-learn")
-                ml_results = {}
+        generate = st.button("🚀 Generate Predictions", type="primary")
     
-    else:
-        ml_results = st.session_state.get('ml_results', {})
+    # Training never blocks the page: it is queued, and the last trained model keeps serving meanwhile
+    if generate and (train_new_model or registry.latest(ticker, timeframe) is None):
+        registry.train(ticker, timeframe, df, days_ahead=prediction_days, force=train_new_model)
+    
+    job = registry.job(ticker, timeframe)
+    if job is not None and job.pending:
+        training_status(registry)
+    elif job is not None and job.error is not None:
+        st.error(f"❌ Training failed: {job.error}")
+        st.info("💡 Tip: Install required packages: pip install tensorflow prophet scikit-learn")
+    elif job is not None and job.saved is False:
+        st.warning("⚠️ The trained model could not be saved, so other horizons need another training run.")
+    
+    try:
+        prediction = registry.predict(ticker, timeframe, df, prediction_days)
+    except Exception as e:
+        st.error(f"❌ Prediction error: {str(e)}")
+        prediction = None
     
-    if not ml_results:
-        st.info("👆 Click 'Generate Predictions' to see AI forecasts")
-        st.stop()
+    if prediction is None or not prediction.results:
+        if job is None or not job.pending:
+            st.info("👆 Click 'Generate Predictions' to train a model and see AI forecasts")
+        return
+    
+    ml_results = prediction.results
     
     # Display timestamp
-    if 'prediction_timestamp' in st.session_state:
-        st.markdown(f"<div style='text-align: right; color: #64748b; font-size: 0.875rem;'>Generated: {st.session_state.prediction_timestamp.strftime('%Y-%m-%d %H:%M:%S')}</div>", unsafe_allow_html=True)
+    trained = datetime.fromtimestamp(prediction.trained_at).strftime('%Y-%m-%d %H:%M:%S') if prediction.trained_at else "—"
+    note = " · newer bars since; tick 'Train Fresh Model' to update" if prediction.stale else ""
+    st.markdown(f"<div style='text-align: right; color: #64748b; font-size: 0.875rem;'>Model trained: {trained}{note}</div>", unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -1849,16 +2004,13 @@ with tab7:
             
             fig_forecast.update_layout(
                 height=400,
-                plot_bgcolor="#0a0e1a",
-                paper_bgcolor="#0a0e1a",
-                font=dict(color="#e4e7eb"),
-                xaxis=dict(gridcolor="#1e293b", title="Date"),
-                yaxis=dict(gridcolor="#1e293b", title="Price (₹)"),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                xaxis=dict(title="Date"),
+                yaxis=dict(title="Price (₹)"),
+                legend=LEGEND_TOP,
                 hovermode='x unified'
             )
             
-            st.plotly_chart(fig_forecast, use_container_width=True)
+            plotly_chart(fig_forecast, use_container_width=True, theme=None)
             
             # Price targets
             current_price = df['Close'].iloc[-1]
@@ -2019,15 +2171,11 @@ with tab7:
         
         fig_sr.update_layout(
             height=400,
-            plot_bgcolor="#0a0e1a",
-            paper_bgcolor="#0a0e1a",
-            font=dict(color="#e4e7eb"),
-            xaxis=dict(gridcolor="#1e293b"),
-            yaxis=dict(gridcolor="#1e293b", title="Price (₹)"),
+            yaxis=dict(title="Price (₹)"),
             showlegend=True
         )
         
-        st.plotly_chart(fig_sr, use_container_width=True)
+        plotly_chart(fig_sr, use_container_width=True, theme=None)
     
     # SECTION 4: BREAKOUT PREDICTION
     if 'breakout_prediction' in ml_results:
@@ -2083,6 +2231,27 @@ with tab7:
     </div>
     """, unsafe_allow_html=True)
 
+TABS = {
+    "📈 Price Chart": render_price_tab,
+    "📊 Technical Analysis": render_technical_tab,
+    "🎯 Signals": render_signals_tab,
+    "🛰️ Scanner": render_scanner_tab,
+    "📰 Company Info": render_company_tab,
+    "⚖️ Comparison": render_comparison_tab,
+    "📊 Analytics": render_analytics_tab,
+    "🤖 AI Predictions": render_predictions_tab,
+}
+
+if lazy_tabs:
+    # Only the open view runs its data prep and builds its figures
+    active_tab = st.radio("View", list(TABS), horizontal=True, key="active_tab", label_visibility="collapsed")
+    with tab_span(TABS[active_tab]):
+        TABS[active_tab]()
+else:
+    for tab, render_tab in zip(st.tabs(list(TABS)), TABS.values()):
+        with tab, tab_span(render_tab):
+            render_tab()
+
 # -------------------------------- FOOTER --------------------------------
 st.markdown("---")
 col1, col2, col3 = st.columns(3)
@@ -2091,9 +2260,42 @@ with col1:
     st.markdown(f"**Last Updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 with col2:
-    st.markdown(f"**Data Source:** Yahoo Finance")
+    st.markdown(f"**Data Source:** Yahoo Finance{' + tick feed' if tick_feed is not None else ''}")
 
 with col3:
-    st.markdown(f"**Refresh Rate:** {refresh_sec}s")
+    st.markdown(f"**Refresh Rate:** {TICK_REFRESH_SEC if live_mode and tick_feed is not None else refresh_sec}s")
 
 st.markdown("<div style='text-align: center; color: #64748b; font-size: 0.875rem; margin-top: 2rem;'>⚠️ This is for educational purposes only. Not financial advice.</div>", unsafe_allow_html=True)
+
+# -------------------------------- PROFILING --------------------------------
+if profile_reruns:
+    profile_run = profiler.end_run()
+    with st.sidebar:
+        with st.expander("⏱️ Rerun Timing", expanded=True):
+            st.markdown(f"**This rerun:** {profile_run.seconds * 1e3:.0f} ms")
+            st.dataframe(
+                pd.DataFrame(
+                    [{
+                        "Stage": "\u2003" * s["depth"] + s["name"],
+                        "ms": s["seconds"] * 1e3,
+                        "Rows": s["rows"],
+                        "KB": s["bytes"] / 1e3 if s["bytes"] is not None else None,
+                    } for s in profile_run.table()],
+                    columns=["Stage", "ms", "Rows", "KB"],
+                ).style.format({"ms": "{:.1f}", "Rows": "{:,.0f}", "KB": "{:,.1f}"}, na_rep=""),
+                use_container_width=True,
+                hide_index=True
+            )
+            totals = profiler.totals()
+            st.caption(
+                f"{len(profiler.runs)} profiled runs kept; slowest stages on average: "
+                + ", ".join(
+                    f"{name} {t['seconds'] / t['calls'] * 1e3:.1f} ms"
+                    for name, t in sorted(totals.items(), key=lambda kv: -kv[1]["seconds"] / kv[1]["calls"])[:3]
+                )
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("Prometheus", profiler.prometheus(), file_name="stockpulse_metrics.prom", mime="text/plain")
+            with col2:
+                st.download_button("JSONL", profiler.jsonl(), file_name="stockpulse_spans.jsonl", mime="application/json")
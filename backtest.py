@@ -0,0 +1,246 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import kernels
+from analytics import max_drawdown, sharpe_ratio
+from signals import SIGNAL_START, combine_codes, crossover_codes, threshold_codes
+
+INITIAL_CAPITAL = 100_000.0
+
+# Per side, in basis points of traded value
+SLIPPAGE_BPS = 5.0
+BROKERAGE_BPS = 3.0
+
+# Rule settings evaluated per sweep pass; bounds the (bars x combinations) working set
+SWEEP_BATCH = 512
+
+SWEEP_GRID = {
+    "ema_fast": (5, 10, 15, 20, 25, 30),
+    "ema_slow": (40, 50, 75, 100, 150, 200),
+    "rsi_window": (7, 14, 21),
+    "rsi_low": (20, 25, 30, 35),
+    "rsi_high": (65, 70, 75, 80),
+    "macd_fast": (12,),
+    "macd_slow": (26,),
+    "macd_signal": (9,),
+}
+
+# Settings the dashboard itself uses; fills in any column a parameter frame leaves out
+DEFAULT_PARAMS = {
+    "ema_fast": 20, "ema_slow": 50, "rsi_window": 14, "rsi_low": 30, "rsi_high": 70,
+    "macd_fast": 12, "macd_slow": 26, "macd_signal": 9,
+}
+
+
+def target_positions(signal, allow_short=False):
+    """Position held after each bar's close: the last BUY/SELL carried forward.
+
+    SELL goes flat unless `allow_short`. Works column-wise on (bars x n) arrays.
+    """
+    # Narrow dtypes keep the (bars x combinations) passes memory-light
+    signal = np.asarray(signal).astype(np.int8)
+    rows = np.arange(len(signal), dtype=np.int32).reshape((-1,) + (1,) * (signal.ndim - 1))
+    last = np.maximum.accumulate(np.where(signal != 0, rows, -1), axis=0)
+    held = np.take_along_axis(signal, np.maximum(last, 0), axis=0)
+    held[last < 0] = 0
+    return held if allow_short else np.maximum(held, 0)
+
+
+def strategy_returns(close, target, cost_bps):
+    """Per-bar strategy returns for positions filled at the signal bar's close.
+
+    A position entered at bar t earns from bar t + 1 on; every change of
+    position pays `cost_bps` per unit traded on the bar it happens.
+    """
+    close = np.asarray(close, dtype=float)
+    if target.ndim == 2:
+        close = close[:, None]
+    bar_returns = np.zeros_like(target, dtype=float)
+    bar_returns[1:] = close[1:] / close[:-1] - 1
+
+    previous = np.zeros_like(target)
+    previous[1:] = target[:-1]
+    turnover = np.abs(target - previous, dtype=float)
+    # Costs come out of the bar's closing equity, so they compound with the move
+    return (1 + previous * bar_returns) * (1 - turnover * cost_bps / 1e4) - 1
+
+
+def _trade_bounds(target):
+    """(column, entry row, exit row, open) for every run of non-zero position.
+
+    A trade still open on the last bar is marked to market there.
+    """
+    target = np.atleast_2d(target.T).T
+    previous = np.zeros_like(target)
+    previous[1:] = target[:-1]
+    changed = target != previous
+
+    entry_col, entry_row = np.nonzero((changed & (target != 0)).T)
+    exit_col, exit_row = np.nonzero((changed & (previous != 0)).T)
+
+    still_open = np.flatnonzero(target[-1] != 0)
+    exit_col = np.concatenate([exit_col, still_open])
+    exit_row = np.concatenate([exit_row, np.full(len(still_open), len(target) - 1)])
+    order = np.lexsort((exit_row, exit_col))
+    exit_col, exit_row = exit_col[order], exit_row[order]
+
+    is_open = np.zeros(len(entry_row), dtype=bool)
+    if len(still_open):
+        # The last trade of every still-open column is the open one
+        last_of_col = np.flatnonzero(np.diff(np.append(entry_col, -1)) != 0)
+        is_open[last_of_col] = np.isin(entry_col[last_of_col], still_open)
+    return entry_col, entry_row, exit_row, is_open
+
+
+def _trade_returns(returns, entry_row, exit_row, entry_col):
+    # Compounded strategy return from the entry bar (its cost) through the exit bar
+    log_equity = np.vstack([np.zeros((1, returns.shape[1])), np.cumsum(np.log1p(returns), axis=0)])
+    return np.expm1(log_equity[exit_row + 1, entry_col] - log_equity[entry_row, entry_col])
+
+
+def summarize(returns, target, capital=INITIAL_CAPITAL):
+    """Headline metrics for every column of (bars x n) strategy returns."""
+    equity = pd.DataFrame(capital * np.cumprod(1 + returns, axis=0))
+    entry_col, entry_row, exit_row, _ = _trade_bounds(target)
+    trade_returns = _trade_returns(returns, entry_row, exit_row, entry_col)
+
+    n = returns.shape[1]
+    trades = np.bincount(entry_col, minlength=n)
+    wins = np.bincount(entry_col, weights=trade_returns > 0, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(trades > 0, wins / trades * 100, np.nan)
+
+    return pd.DataFrame({
+        "Total Return %": (equity.iloc[-1].to_numpy() / capital - 1) * 100,
+        "Sharpe": np.asarray(sharpe_ratio(pd.DataFrame(returns) * 100), dtype=float),
+        "Max Drawdown %": max_drawdown(equity).to_numpy(),
+        "Trades": trades,
+        "Win Rate %": win_rate,
+        "Exposure %": (target != 0).mean(axis=0) * 100,
+    })
+
+
+def backtest(df, slippage_bps=SLIPPAGE_BPS, brokerage_bps=BROKERAGE_BPS,
+             capital=INITIAL_CAPITAL, allow_short=False):
+    """Trade the `Signal` column of `df` and report equity, drawdown, trades and metrics."""
+    close = df["Close"].to_numpy(dtype=float)
+    target = target_positions(df["Signal"].to_numpy(), allow_short=allow_short)
+    returns = strategy_returns(close, target, slippage_bps + brokerage_bps)
+
+    equity = pd.Series(capital * np.cumprod(1 + returns), index=df.index, name="Equity")
+    drawdown = (equity / equity.cummax() - 1) * 100
+
+    entry_col, entry_row, exit_row, is_open = _trade_bounds(target)
+    trade_returns = _trade_returns(returns[:, None], entry_row, exit_row, entry_col)
+    side = target[entry_row]
+    slip = slippage_bps / 1e4
+    trades = pd.DataFrame({
+        "Entry Time": df.index[entry_row],
+        "Exit Time": df.index[exit_row],
+        "Side": np.where(side > 0, "LONG", "SHORT"),
+        "Entry (₹)": close[entry_row] * (1 + side * slip),
+        "Exit (₹)": close[exit_row] * (1 - side * slip),
+        "Bars": exit_row - entry_row,
+        "Return %": trade_returns * 100,
+        "Status": np.where(is_open, "Open", "Closed"),
+    })
+
+    # Same numbers as summarize(), from the series built above instead of one-column frames
+    metrics = {
+        "Total Return %": (equity.iat[-1] / capital - 1) * 100,
+        "Sharpe": float(sharpe_ratio(pd.Series(returns * 100))),
+        "Max Drawdown %": drawdown.min(),
+        "Trades": len(trades),
+        "Win Rate %": (trade_returns > 0).mean() * 100 if len(trades) else np.nan,
+        "Exposure %": (target != 0).mean() * 100,
+    }
+    return {"equity": equity, "drawdown": drawdown, "returns": returns, "trades": trades, "metrics": metrics}
+
+
+def parameter_grid(**grid):
+    """Every combination of the given settings (defaults from SWEEP_GRID), skipping fast >= slow."""
+    grid = {**SWEEP_GRID, **grid}
+    combos = pd.DataFrame(list(itertools.product(*grid.values())), columns=list(grid))
+    return valid_params(combos)
+
+
+def valid_params(params):
+    params = params.assign(**{k: v for k, v in DEFAULT_PARAMS.items() if k not in params})
+    keep = (params["ema_fast"] < params["ema_slow"]) & (params["macd_fast"] < params["macd_slow"])
+    return params[keep].reset_index(drop=True)
+
+
+def _cached(cache, key, compute):
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _gather_codes(cache, keys, compute):
+    # Codes are computed once per distinct setting, then fanned out per combination
+    unique = list(dict.fromkeys(keys))
+    codes = np.column_stack([_cached(cache, key, lambda: compute(*key[1:])) for key in unique])
+    position = {key: i for i, key in enumerate(unique)}
+    return codes[:, [position[key] for key in keys]]
+
+
+def sweep_signals(close, params, cache=None):
+    """(bars x len(params)) signal matrix for a frame of rule settings."""
+    cache = {} if cache is None else cache
+
+    def ema(window):
+        return _cached(cache, ("ema", window), lambda: kernels.ema(close, window))
+
+    def rsi(window):
+        return _cached(cache, ("rsi", window), lambda: kernels.rsi(close, window))
+
+    def macd(fast, slow):
+        return _cached(cache, ("macd", fast, slow),
+                       lambda: kernels.ewm_span(close, fast) - kernels.ewm_span(close, slow))
+
+    ema_codes = _gather_codes(
+        cache,
+        [("cross", fast, slow) for fast, slow in zip(params["ema_fast"], params["ema_slow"])],
+        lambda fast, slow: crossover_codes(ema(fast), ema(slow)),
+    )
+    rsi_codes = _gather_codes(
+        cache,
+        [("rsi_codes", *key) for key in zip(params["rsi_window"], params["rsi_low"], params["rsi_high"])],
+        lambda window, low, high: threshold_codes(rsi(window), low, high),
+    )
+    macd_codes = _gather_codes(
+        cache,
+        [("macd_codes", *key) for key in zip(params["macd_fast"], params["macd_slow"], params["macd_signal"])],
+        lambda fast, slow, signal: crossover_codes(macd(fast, slow), kernels.ewm_span(macd(fast, slow), signal)),
+    )
+    signal, _ = combine_codes(ema_codes, rsi_codes, macd_codes, start=SIGNAL_START)
+    return signal
+
+
+def evaluate(close, params, cache=None, slippage_bps=SLIPPAGE_BPS, brokerage_bps=BROKERAGE_BPS,
+             capital=INITIAL_CAPITAL, allow_short=False):
+    """Metrics for every row of `params` (a frame of rule settings), in batches."""
+    cache = {} if cache is None else cache
+    results = []
+    for start in range(0, len(params), SWEEP_BATCH):
+        batch = params.iloc[start:start + SWEEP_BATCH]
+        signal = sweep_signals(close, batch, cache)
+        target = target_positions(signal, allow_short=allow_short)
+        returns = strategy_returns(close, target, slippage_bps + brokerage_bps)
+        results.append(summarize(returns, target, capital))
+    return pd.concat(results, ignore_index=True)
+
+
+def rank_results(table):
+    return table.sort_values("Sharpe", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def sweep(df, params=None, slippage_bps=SLIPPAGE_BPS, brokerage_bps=BROKERAGE_BPS,
+          capital=INITIAL_CAPITAL, allow_short=False):
+    """Backtest every rule setting in `params` (default: full SWEEP_GRID), best Sharpe first."""
+    params = parameter_grid() if params is None else valid_params(params)
+    close = df["Close"].to_numpy(dtype=float)
+    metrics = evaluate(close, params, None, slippage_bps, brokerage_bps, capital, allow_short)
+    return rank_results(pd.concat([params, metrics], axis=1))
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Bars kept per store unless told otherwise
+DEFAULT_CAPACITY = 2_000
+
+
+def index_ns(index):
+    """Epoch nanoseconds of a DatetimeIndex (UTC for tz-aware ones) whatever its resolution."""
+    return index.as_unit("ns").asi8
+
+
+def _ns(stamp):
+    # UTC epoch nanoseconds; naive stamps are taken as UTC, like a naive index
+    stamp = pd.Timestamp(stamp)
+    return stamp.value if stamp.tz is not None else stamp.tz_localize("UTC").value
+
+
+class BarStore:
+    """Fixed-capacity columnar bar history backed by preallocated arrays.
+
+    Values live in one (columns x slots) float64 block, bar start times in an
+    int64 array, and rows are written at a head pointer. There are `headroom`
+    spare slots past `capacity`; when they are used up, the newest `capacity`
+    bars move to a fresh block, so a store never holds more than
+    ``(capacity + headroom) x (columns + 1) x 8`` bytes however long it runs.
+
+    `column`, `values` and `frame` return read-only views of the stored rows
+    rather than copies. The rows a view covers only change when those bars are
+    replaced (the still-open bar being revised, or a correction); views taken
+    before a move keep the block they were cut from. With `copy_on_write`,
+    replacing stored rows first moves them to a fresh block too, so no view
+    ever changes under a reader on another thread.
+    """
+
+    def __init__(self, columns=BAR_COLUMNS, capacity=DEFAULT_CAPACITY, headroom=None, tz=None,
+                 copy_on_write=False):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.headroom = max(1, capacity // 4 if headroom is None else headroom)
+        self.tz = tz
+        self.copy_on_write = copy_on_write
+        self._positions = {name: i for i, name in enumerate(self.columns)}
+        self._column_index = pd.Index(self.columns)
+        self._allocate()
+
+    def _allocate(self):
+        slots = self.capacity + self.headroom
+        self._times = np.zeros(slots, dtype=np.int64)
+        self._values = np.full((len(self.columns), slots), np.nan)
+        self._start = self._head = 0
+
+    def __len__(self):
+        return self._head - self._start
+
+    @property
+    def nbytes(self):
+        return self._times.nbytes + self._values.nbytes
+
+    def clear(self):
+        if self.copy_on_write:
+            self._allocate()
+        else:
+            self._start = self._head = 0
+
+    @staticmethod
+    def _read_only(view):
+        view.flags.writeable = False
+        return view
+
+    @property
+    def times(self):
+        """Bar start times as UTC epoch nanoseconds."""
+        return self._read_only(self._times[self._start:self._head])
+
+    @property
+    def values(self):
+        """(columns x bars) view of every stored column."""
+        return self._read_only(self._values[:, self._start:self._head])
+
+    def column(self, name):
+        return self._read_only(self._values[self._positions[name], self._start:self._head])
+
+    def index(self, start=0):
+        index = pd.DatetimeIndex(self.times[start:].view("M8[ns]"), copy=False, name="Datetime")
+        return index.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else index
+
+    def frame(self, since=None):
+        """The stored bars (from `since` on) as a DataFrame over the store's own memory.
+
+        Only the index is built fresh; every column is a read-only view, so
+        callers add their own columns instead of writing into these.
+        """
+        start = 0 if since is None else int(np.searchsorted(self.times, _ns(since)))
+        values = self.values[:, start:]
+        return pd.DataFrame(values.T, index=self.index(start), columns=self._column_index, copy=False)
+
+    def find(self, time):
+        """Row position of the bar starting at `time` (UTC ns), or None."""
+        times = self.times
+        pos = int(np.searchsorted(times, time))
+        return pos if pos < len(times) and times[pos] == time else None
+
+    def row(self, position):
+        return self._values[:, self._start + position].copy()
+
+    def set_row(self, position, row):
+        self._overwriting()
+        self._values[:, self._start + position] = row
+
+    def _move(self, keep):
+        # The newest `keep` rows go to a fresh block; the old one stays with its views
+        times = self._times[self._head - keep:self._head]
+        values = self._values[:, self._head - keep:self._head]
+        self._allocate()
+        self._times[:keep] = times
+        self._values[:, :keep] = values
+        self._head = keep
+
+    def _overwriting(self):
+        if self.copy_on_write:
+            self._move(len(self))
+
+    def _reserve(self, n):
+        # Make room for `n` more rows at the head, moving the survivors if needed
+        if self._head + n > len(self._times):
+            self._move(max(0, min(len(self), self.capacity - n)))
+
+    def append(self, times, rows):
+        """Add bars after the last stored one; `rows` is (bars x columns)."""
+        times = np.asarray(times, dtype=np.int64)[-self.capacity:]
+        rows = np.asarray(rows, dtype=np.float64)[-self.capacity:]
+        n = len(times)
+        if n == 0:
+            return
+        if len(self) and times[0] <= self._times[self._head - 1]:
+            raise ValueError("bars must come after the last stored bar; use replace() to revise")
+        self._reserve(n)
+        self._times[self._head:self._head + n] = times
+        self._values[:, self._head:self._head + n] = rows.T
+        self._head += n
+        self._start = max(self._start, self._head - self.capacity)
+
+    def put(self, time, row):
+        """Write one bar, overwriting the last one if it starts at the same time."""
+        if len(self) and self._times[self._head - 1] == time:
+            self._overwriting()
+            self._values[:, self._head - 1] = row
+        else:
+            self.append([time], [row])
+
+    def replace(self, times, rows):
+        """Drop every stored bar from `times[0]` on, then append the given bars."""
+        if len(times):
+            position = int(np.searchsorted(self.times, times[0]))
+            if position < len(self):
+                self._overwriting()
+            self._head = self._start + position
+        self.append(times, rows)
+
+    def replace_frame(self, frame):
+        """`replace` with the matching columns of an OHLCV/indicator frame."""
+        if not len(self) and self.tz is None:
+            self.tz = frame.index.tz
+        rows = frame.reindex(columns=self.columns).to_numpy(dtype=np.float64)
+        self.replace(index_ns(frame.index), rows)
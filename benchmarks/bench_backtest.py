@@ -0,0 +1,77 @@
+import numpy as np
+import ta
+
+from common import best_of, synthetic_ohlcv
+from backtest import (
+    BROKERAGE_BPS, SLIPPAGE_BPS, backtest, parameter_grid, strategy_returns, sweep, target_positions,
+)
+from indicators import add_indicators
+from signals import generate_signals, signal_arrays
+
+COST = (SLIPPAGE_BPS + BROKERAGE_BPS) / 1e4
+
+
+def loop_backtest(close, signal, capital=100_000.0):
+    # Straightforward bar-by-bar long-only simulation used as the reference
+    equity, position, curve, trades = capital, 0, [], []
+    entry_equity = None
+    for i in range(len(close)):
+        if i > 0 and position:
+            equity *= close[i] / close[i - 1]
+        target = 1 if signal[i] == 1 else 0 if signal[i] == -1 else position
+        if target != position:
+            if position:
+                equity *= 1 - COST
+                trades.append(equity / entry_equity - 1)
+            else:
+                entry_equity = equity
+                equity *= 1 - COST
+            position = target
+        curve.append(equity)
+    if position:
+        trades.append(equity / entry_equity - 1)
+    return np.array(curve), np.array(trades)
+
+
+def main():
+    df = generate_signals(add_indicators(synthetic_ohlcv(5_000, interval="15m", seed=7)))
+    close, signal = df["Close"].to_numpy(), df["Signal"].to_numpy()
+
+    result = backtest(df)
+    curve, trade_returns = loop_backtest(close, signal)
+    np.testing.assert_allclose(result["equity"].to_numpy(), curve, rtol=1e-9)
+    np.testing.assert_allclose(result["trades"]["Return %"].to_numpy() / 100, trade_returns, rtol=1e-9, atol=1e-12)
+
+    # The loop only produces the equity curve and trade returns; backtest() also
+    # builds the drawdown, trade list and metrics the dashboard shows
+    print(f"{'bars':>8} {'loop ms':>8} {'core ms':>8} {'backtest() ms':>14}")
+    for bars in (len(df), 50_000):
+        frame = df if bars == len(df) else generate_signals(add_indicators(synthetic_ohlcv(bars, interval="15m", seed=7)))
+        c, s = frame["Close"].to_numpy(), frame["Signal"].to_numpy()
+        t_loop = best_of(lambda: loop_backtest(c, s))
+        t_core = best_of(lambda: strategy_returns(c, target_positions(s), SLIPPAGE_BPS + BROKERAGE_BPS))
+        t_full = best_of(lambda: backtest(frame))
+        print(f"{bars:>8} {t_loop * 1e3:>8.1f} {t_core * 1e3:>8.2f} {t_full * 1e3:>14.1f}")
+
+    def one_combo():
+        # What evaluating a single setting costs with the per-series ta pipeline
+        fast = ta.trend.ema_indicator(df["Close"], window=10).to_numpy()
+        slow = ta.trend.ema_indicator(df["Close"], window=100).to_numpy()
+        rsi = ta.momentum.rsi(df["Close"], window=21).to_numpy()
+        combo_signal, _ = signal_arrays(fast, slow, rsi, df["MACD"].to_numpy(), df["MACD_Signal"].to_numpy())
+        return loop_backtest(close, combo_signal)
+
+    t_combo = best_of(one_combo)
+    print(f"{'combos':>8} {'sweep s':>8} {'combos/s':>9} {'per-combo est. s':>17}")
+    grids = [
+        {},
+        {"ema_fast": tuple(range(5, 35, 2)), "ema_slow": tuple(range(40, 210, 10))},
+    ]
+    for grid in grids:
+        params = parameter_grid(**grid)
+        seconds = best_of(lambda: sweep(df, params), repeat=1)
+        print(f"{len(params):>8} {seconds:>8.2f} {len(params) / seconds:>9.0f} {t_combo * len(params):>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from common import best_of, synthetic_ohlcv
+from bar_store import BAR_COLUMNS, BarStore, index_ns
+from indicators import INDICATOR_COLUMNS, IndicatorState
+
+CAPACITY = 2_000
+SYMBOLS = 300
+STREAMED = 20_000
+
+
+def main():
+    history = synthetic_ohlcv(CAPACITY + STREAMED, interval="1m")
+    times = index_ns(history.index)
+    rows = history[BAR_COLUMNS].to_numpy()
+
+    # Appending bar by bar: a growing DataFrame versus the preallocated store
+    def grow_frame(n=2_000):
+        frame = history.iloc[:1]
+        for i in range(1, n):
+            frame = pd.concat([frame, history.iloc[i:i + 1]])
+        return frame
+
+    def fill_store(n=2_000):
+        store = BarStore(BAR_COLUMNS, CAPACITY)
+        for i in range(n):
+            store.put(times[i], rows[i])
+        return store
+
+    store = fill_store()
+    pd.testing.assert_frame_equal(store.frame(), grow_frame().rename_axis("Datetime"),
+                                  check_index_type=False, check_freq=False)
+    t_frame = best_of(grow_frame, repeat=1) / 2_000
+    t_store = best_of(fill_store) / 2_000
+    print(f"append one bar: DataFrame concat {t_frame * 1e6:.0f} us, BarStore {t_store * 1e6:.1f} us "
+          f"({t_frame / t_store:.0f}x)")
+
+    # Reading: the store hands out views, a DataFrame copy moves every column
+    for n in (CAPACITY, 100_000):
+        wide = synthetic_ohlcv(n, interval="1m")
+        state = IndicatorState(capacity=n)
+        full = state.update(wide)
+        assert np.shares_memory(full["Close"].to_numpy(), state.store.values)
+        t_view = best_of(state.store.frame, repeat=20)
+        t_copy = best_of(full.copy, repeat=20)
+        print(f"read {n:>7,} bars x {full.shape[1]} columns: frame() {t_view * 1e6:>5.0f} us, "
+              f"DataFrame.copy() {t_copy * 1e6:>6.0f} us")
+
+    # Memory stays at the preallocated size however long a symbol streams, as long as the
+    # input is a fixed window (the CandleStore trims to the requested period)
+    state = IndicatorState(capacity=CAPACITY)
+    tracemalloc.start()
+    state.update(history.iloc[:CAPACITY])
+    baseline = tracemalloc.get_traced_memory()[0]
+    for end in range(CAPACITY + 1, CAPACITY + STREAMED, 50):
+        state.update(history.iloc[end - CAPACITY:end])
+    grown = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    per_symbol = state.store.nbytes
+    print(f"per (symbol, interval): {len(BAR_COLUMNS) + len(INDICATOR_COLUMNS)} columns x {CAPACITY} bars "
+          f"= {per_symbol / 1e6:.2f} MB fixed; {SYMBOLS} symbols = {SYMBOLS * per_symbol / 1e6:.0f} MB")
+    print(f"after streaming {STREAMED:,} more bars through a {CAPACITY}-bar window the store holds {len(state.store)} "
+          f"and traced memory moved by {grown / 1e6:+.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
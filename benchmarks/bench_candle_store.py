@@ -0,0 +1,97 @@
+import io
+import tempfile
+import time
+
+import pandas as pd
+
+from common import nse_ohlcv, synthetic_ohlcv
+from candle_store import CandleStore, trim_to_period
+from disk_cache import DiskCandleCache
+
+class LocalSource:
+    """Stand-in for yf.download: serves a growing synthetic history as CSV text."""
+
+    def __init__(self, history, visible):
+        self.history = history
+        self.visible = visible
+        self.bytes_sent = 0
+
+    def __call__(self, ticker, interval, period=None, start=None):
+        available = self.history.iloc[: self.visible]
+        if start is not None:
+            available = available[available.index >= start]
+        payload = available.to_csv()
+        self.bytes_sent += len(payload)
+        return pd.read_csv(io.StringIO(payload), index_col=0, parse_dates=True)
+
+
+class PeriodSource(LocalSource):
+    """Session-hours bars, trimmed to `period` the way yfinance serves them."""
+
+    def __call__(self, ticker, interval, period=None, start=None):
+        available = self.history.iloc[: self.visible]
+        if start is not None:
+            return available[available.index >= start]
+        return trim_to_period(available, period)
+
+
+def restart(period):
+    # A second process on the same day finds the history on disk and only tops it up
+    source = PeriodSource(nse_ohlcv(3_000, interval="15m"), 2_900)
+    now = source.history.index[2_905].timestamp()
+    disk = DiskCandleCache(tempfile.mkdtemp())
+    CandleStore(fetcher=source, disk=disk, clock=lambda: now).get("RELIANCE.NS", period, "15m")
+    source.visible += 1
+    store = CandleStore(fetcher=source, disk=disk, clock=lambda: now)
+    frame = store.get("RELIANCE.NS", period, "15m")
+    assert store.stats["full_fetches"] == 0 and store.stats["delta_fetches"] == 1, (period, store.stats)
+    assert frame.index.equals(trim_to_period(source.history.iloc[: source.visible], period).index)
+    return store.stats
+
+
+def run(source, store, refreshes):
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        source.visible += 1
+        store.get("RELIANCE.NS", "max", "15m")
+    return time.perf_counter() - start
+
+
+def main():
+    refreshes = 50
+    for bars in (1_000, 10_000, 50_000):
+        history = synthetic_ohlcv(bars + refreshes, interval="15m", seed=bars)
+
+        full_source = LocalSource(history, bars)
+        full_time = 0.0
+        for _ in range(refreshes):
+            full_source.visible += 1
+            t0 = time.perf_counter()
+            full_source("RELIANCE.NS", "15m", period="max")
+            full_time += time.perf_counter() - t0
+
+        delta_source = LocalSource(history, bars)
+        # The synthetic bars are from 2024; pin the clock to them so no gap looks too old to top up
+        now = history.index[-1].tz_localize("UTC").timestamp()
+        store = CandleStore(fetcher=delta_source, clock=lambda: now)
+        store.get("RELIANCE.NS", "max", "15m")
+        delta_source.bytes_sent = 0
+        delta_time = run(delta_source, store, refreshes)
+
+        merged = store.history("RELIANCE.NS", "15m")
+        assert len(merged) == bars + refreshes and merged.index.is_unique
+
+        print(
+            f"{bars:>6} bars, {refreshes} refreshes: "
+            f"full {full_source.bytes_sent / 1e6:8.2f} MB {full_time:6.3f}s | "
+            f"delta {delta_source.bytes_sent / 1e6:8.3f} MB {delta_time:6.3f}s"
+        )
+
+    for period in ("5d", "1mo"):
+        stats = restart(period)
+        print(f"restart with {period} on disk: {stats['full_fetches']} full, "
+              f"{stats['delta_fetches']} delta fetch, {stats['rows_fetched']} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from common import synthetic_ohlcv
+from data_client import CircuitBreaker, CircuitOpen, DataClient, HTTPProvider, UpstreamError
+
+CALLS = 200
+WORKERS = 4
+STALL_SECONDS = 2.0
+FRAME = synthetic_ohlcv(300, interval="5m").tz_localize("Asia/Kolkata")
+
+
+class FakeUpstream(ThreadingHTTPServer):
+    """Local stand-in for a flaky, throttling quote API."""
+
+    daemon_threads = True
+
+    def __init__(self, stall=0.05, errors=0.10, throttled=0.05, latency=0.01, seed=0):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.stall, self.errors, self.throttled, self.latency = stall, errors, throttled, latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.connections = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on stalled requests by design
+        pass
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive
+    # responses stall on Nagle + delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload=None, headers=()):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(time.perf_counter())
+            server.connections.add(self.client_address)
+            roll = server.random.random()
+        time.sleep(server.latency)
+        if roll < server.stall:
+            time.sleep(STALL_SECONDS)
+        elif roll < server.stall + server.errors:
+            return self._send(503, {"error": "unavailable"})
+        elif roll < server.stall + server.errors + server.throttled:
+            return self._send(429, {"error": "slow down"}, [("Retry-After", "0.05")])
+
+        url = urlsplit(self.path)
+        if url.path == "/info":
+            ticker = parse_qs(url.query)["ticker"][0]
+            return self._send(200, {"longName": ticker, "sector": "Energy"})
+        self._send(200, {
+            "index": FRAME.index.as_unit("ns").asi8.tolist(), "tz": "Asia/Kolkata",
+            "columns": list(FRAME.columns), "data": FRAME.to_numpy().tolist(),
+        })
+
+
+def percentiles(latencies):
+    return {p: np.percentile(latencies, p) * 1e3 for p in (50, 95, 99, 100)}
+
+
+def naive_calls(server):
+    # Blocking request with no timeout and no retry, like the bare yfinance calls
+    def call(i):
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(f"{server.url}/candles?ticker=T{i % 5}&interval=5m&period=5d").read()
+            ok = True
+        except urllib.error.HTTPError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        return list(pool.map(call, range(CALLS)))
+
+
+def client_calls(server, **options):
+    client = DataClient(HTTPProvider(server.url), seed=1, **options)
+
+    async def call(i):
+        start = time.perf_counter()
+        try:
+            frame = await client.candles(f"T{i % 5}", "5m", period="5d")
+            ok = frame is not None and len(frame) == len(FRAME)
+        except UpstreamError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    async def worker(w):
+        # Same shape as the blocking run: a few callers, one request after another
+        return [await call(i) for i in range(w, CALLS, WORKERS)]
+
+    async def run():
+        return [r for results in await asyncio.gather(*(worker(w) for w in range(WORKERS))) for r in results]
+
+    return asyncio.run(run()), client
+
+
+def report(name, results, server, elapsed):
+    latencies = [t for t, _ in results]
+    ok = sum(ok for _, ok in results)
+    p = percentiles(latencies)
+    print(f"{name:>12} {ok:>5}/{len(results)} {p[50]:>7.0f} {p[95]:>7.0f} {p[99]:>7.0f} {p[100]:>7.0f} "
+          f"{len(server.requests):>8} {len(server.connections):>6} {elapsed:>6.1f}s")
+
+
+def main():
+    print(f"{CALLS} candle calls; upstream: 5% stall {STALL_SECONDS:.0f}s, 10% 503, 5% 429")
+    print(f"{'client':>12} {'ok':>9} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+          f"{'requests':>8} {'conns':>6} {'total':>7}")
+
+    server = FakeUpstream().start()
+    start = time.perf_counter()
+    results = naive_calls(server)
+    report("blocking", results, server, time.perf_counter() - start)
+    server.shutdown()
+
+    server = FakeUpstream().start()
+    start = time.perf_counter()
+    results, client = client_calls(server, timeout=0.25, deadline=2.0, rate=1000, burst=20, backoff=0.05)
+    report("DataClient", results, server, time.perf_counter() - start)
+    server.shutdown()
+    # No call outlives its deadline, however long the upstream stalls
+    assert max(t for t, _ in results) < 2.0 + 0.1
+    print(f"{'':>12} retries {client.stats['retries']}, timeouts {client.stats['timeouts']}, "
+          f"failures {client.stats['failures']}")
+
+    # The token bucket holds the request rate to the configured limit
+    server = FakeUpstream(stall=0, errors=0, throttled=0, latency=0).start()
+    results, client = client_calls(server, rate=50, burst=5)
+    sent = np.array(server.requests)
+    per_second = max(((sent >= t) & (sent < t + 1)).sum() for t in sent)
+    print(f"rate limit 50/s (burst 5): busiest 1 s window saw {per_second} requests")
+    assert per_second <= 50 + 5
+    server.shutdown()
+
+    # With the upstream down the breaker opens and further calls fail immediately
+    server = FakeUpstream(stall=0, errors=1.0, throttled=0).start()
+    breaker = CircuitBreaker(threshold=5, reset_after=60)
+    client = DataClient(HTTPProvider(server.url), breaker=breaker, backoff=0.01, seed=1)
+
+    async def until_open():
+        for _ in range(3):
+            try:
+                await client.candles("T0", "5m", period="5d")
+            except UpstreamError:
+                pass
+        start = time.perf_counter()
+        try:
+            await client.candles("T0", "5m", period="5d")
+        except CircuitOpen:
+            return time.perf_counter() - start
+
+    fast_fail = asyncio.run(until_open())
+    print(f"upstream down: circuit {breaker.state} after {len(server.requests)} requests, "
+          f"next call failed in {fast_fail * 1e6:.0f} us")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+
+from common import best_of, synthetic_ohlcv
+from downsample import aggregate_ohlcv, bucket_size, lttb_series
+from indicators import add_indicators
+
+
+def price_figure(df, downsample):
+    candles = aggregate_ohlcv(df, bucket_size(len(df))) if downsample else df
+    fig = go.Figure(go.Candlestick(
+        x=candles.index, open=candles["Open"], high=candles["High"],
+        low=candles["Low"], close=candles["Close"],
+    ))
+    for col in ("EMA20", "EMA50", "BB_High", "BB_Low"):
+        # As in the app: overlays are sampled at each candle's last bar
+        line = df[col].reindex(candles.index)
+        fig.add_trace(go.Scatter(x=line.index, y=line, name=col))
+    return fig
+
+
+def main():
+    print(f"{'bars':>8} {'full KB':>9} {'full ms':>8} {'down KB':>9} {'down ms':>8}")
+    for n in (1_000, 10_000, 100_000):
+        df = add_indicators(synthetic_ohlcv(n, interval="1h", seed=n))
+
+        candles = aggregate_ohlcv(df, bucket_size(n))
+        assert np.isclose(candles["High"].max(), df["High"].max())
+        assert np.isclose(candles["Volume"].sum(), df["Volume"].sum())
+        assert candles.index.isin(df.index).all() and candles["Close"].equals(df["Close"].loc[candles.index])
+        ema = lttb_series(df["EMA20"])
+        assert df["EMA20"].loc[ema.index].equals(ema)
+
+        sizes = {}
+        for downsample in (False, True):
+            sizes[downsample] = len(json.dumps(price_figure(df, downsample).to_plotly_json(), default=str))
+        t_full = best_of(lambda: price_figure(df, False).to_json())
+        t_down = best_of(lambda: price_figure(df, True).to_json())
+        print(f"{n:>8} {sizes[False] / 1e3:>9.0f} {t_full * 1e3:>8.1f} {sizes[True] / 1e3:>9.0f} {t_down * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from common import best_of, synthetic_ohlcv
+from fix import fix_ohlc
+
+
+def legacy_fix_ohlc(df):
+    # Original implementation, kept for equivalence checks and timing
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
+
+    for col in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
+        if col in df.columns:
+            series = df[col]
+
+            if isinstance(series, pd.DataFrame):
+                series = series.iloc[:, 0]
+
+            series = series.apply(
+                lambda x: x[0] if isinstance(x, (list, tuple, np.ndarray)) else x
+            )
+
+            df[col] = pd.to_numeric(series, errors="coerce")
+
+    df = df.dropna()
+    return df
+
+
+def yfinance_frame(n, seed=0):
+    # yf.download returns (Price, Ticker) MultiIndex columns
+    df = synthetic_ohlcv(n, seed=seed)
+    df["Adj Close"] = df["Close"]
+    df.columns = pd.MultiIndex.from_product([df.columns, ["RELIANCE.NS"]], names=["Price", "Ticker"])
+    return df
+
+
+def wrapped_frame(n, seed=0):
+    df = synthetic_ohlcv(n, seed=seed).astype(object)
+    df["Close"] = [[v] for v in df["Close"]]
+    df.iloc[::97, df.columns.get_loc("Open")] = None
+    df["High"] = df["High"].astype(str)
+    df.iloc[5, df.columns.get_loc("High")] = "n/a"
+    return df
+
+
+def duplicate_frame(n, seed=0):
+    df = synthetic_ohlcv(n, seed=seed)
+    return pd.concat([df, df[["Close"]] * 2], axis=1)
+
+
+CASES = {
+    "yfinance float64": yfinance_frame,
+    "object + wrapped": wrapped_frame,
+    "duplicate column": duplicate_frame,
+}
+
+
+def main():
+    for name, make in CASES.items():
+        for n in (10, 1_000):
+            pd.testing.assert_frame_equal(fix_ohlc(make(n)), legacy_fix_ohlc(make(n)))
+
+    n = 100_000
+    print(f"{'case (100k rows)':<20} {'legacy (ms)':>12} {'fast (ms)':>10} {'speedup':>9}")
+    for name, make in CASES.items():
+        frame = make(n)
+        t_legacy = best_of(lambda: legacy_fix_ohlc(frame.copy()))
+        t_fast = best_of(lambda: fix_ohlc(frame.copy()))
+        print(f"{name:<20} {t_legacy * 1e3:>12.1f} {t_fast * 1e3:>10.1f} {t_legacy / t_fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+
+from common import best_of, synthetic_ohlcv
+from indicators import INDICATOR_COLUMNS, IndicatorState, add_indicators
+
+APPENDS = 5
+
+
+def main():
+    print(f"{'bars':>8} {'full (ms)':>10} {'+1 bar (ms)':>12} {'speedup':>9}")
+    for n in (1_000, 10_000, 100_000):
+        history = synthetic_ohlcv(n + APPENDS, seed=n)
+        before, after = history.iloc[:n], history.iloc[:n + 1]
+
+        state = IndicatorState(capacity=n + APPENDS)
+        state.update(before)
+        incremental = state.update(after)
+        reference = add_indicators(after.copy())
+        for col in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(
+                incremental[col].to_numpy(), reference[col].to_numpy(),
+                rtol=1e-9, atol=1e-9, err_msg=col,
+            )
+
+        # A window that moved forward (the period's first bar rolled over) matches a full recompute too
+        for shift in (1, n // 10):
+            window = history.iloc[shift:n + 1]
+            moved = state.update(window)
+            reference = add_indicators(window.copy())
+            assert moved.index.equals(reference.index)
+            for col in INDICATOR_COLUMNS:
+                np.testing.assert_allclose(
+                    moved[col].to_numpy(), reference[col].to_numpy(),
+                    rtol=1e-9, atol=1e-9, err_msg=f"{col} after sliding {shift}",
+                )
+        state.update(after)
+
+        # Every timed call sees exactly one appended bar
+        frames = iter([history.iloc[:n + k] for k in range(2, APPENDS + 1)])
+        t_full = best_of(lambda: add_indicators(after.copy()))
+        t_incremental = best_of(lambda: state.update(next(frames)), repeat=APPENDS - 1)
+        print(f"{n:>8} {t_full * 1e3:>10.2f} {t_incremental * 1e3:>12.2f} {t_full / t_incremental:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import numpy as np
+
+from common import best_of, synthetic_ohlcv, ta_indicators
+from indicators import INDICATOR_COLUMNS
+from kernels import indicator_arrays
+from scanner import stack_columns
+
+
+def main():
+    print(f"{'tickers':>8} {'bars':>6} {'ta ms':>9} {'2-D ms':>9} {'speedup':>8}")
+    for tickers, bars in ((50, 1_000), (200, 2_000), (500, 2_000)):
+        frames = [synthetic_ohlcv(bars - (j % 5) * 100, seed=j) for j in range(tickers)]
+        n_bars = max(len(df) for df in frames)
+        arrays = {col: stack_columns(frames, col, n_bars) for col in ("High", "Low", "Close", "Volume")}
+
+        def wide():
+            return indicator_arrays(arrays["High"], arrays["Low"], arrays["Close"], arrays["Volume"])
+
+        def per_series():
+            return [ta_indicators(df) for df in frames]
+
+        # Every indicator column must match the ta/pandas result for its ticker
+        out = wide()
+        for j, ref in enumerate(per_series()):
+            rows = slice(n_bars - len(ref), None)
+            for col in INDICATOR_COLUMNS:
+                np.testing.assert_allclose(out[col][rows, j], ref[col].to_numpy(), rtol=1e-9, atol=1e-9)
+
+        t_ta = best_of(per_series, repeat=2)
+        t_wide = best_of(wide, repeat=2)
+        print(f"{tickers:>8} {bars:>6} {t_ta * 1e3:>9.0f} {t_wide * 1e3:>9.0f} {t_ta / t_wide:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
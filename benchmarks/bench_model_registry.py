@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import time
+
+from common import SlowPredictor, synthetic_ohlcv
+from model_registry import ModelRegistry
+
+WARM_CALLS = 1_000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    root = tempfile.mkdtemp()
+    df = synthetic_ohlcv(2_000, interval="15m")
+    newer = synthetic_ohlcv(2_001, interval="15m")
+    try:
+        registry = ModelRegistry(root, factory=SlowPredictor)
+
+        # Before: every session called predict_all(train_models=True) in the request thread
+        _, blocking = timed(lambda: SlowPredictor().predict_all(df, days_ahead=20, train_models=True))
+        print(f"synchronous train + predict: {blocking * 1e3:.0f} ms blocked")
+
+        job, submit = timed(lambda: registry.train("SYNTH.NS", "15m", df, days_ahead=20))
+        again = registry.train("SYNTH.NS", "15m", df, days_ahead=20)
+        print(f"train() returned in {submit * 1e3:.2f} ms ({job.state}); a second request joins job {again.id}")
+        assert again is job
+        assert registry.predict("SYNTH.NS", "15m", df, 20) is None
+        while job.pending:
+            time.sleep(0.05)
+        status = job.status()
+        print(f"job {status['id']} {status['state']} after {status['seconds']:.2f} s, saved={status['saved']}")
+        assert status["state"] == "done" and status["saved"]
+
+        prediction, first = timed(lambda: registry.predict("SYNTH.NS", "15m", df, 20))
+        print(f"prediction from the training pass: {first * 1e6:.0f} us (stale={prediction.stale})")
+        assert not prediction.stale
+
+        _, load = timed(lambda: registry.predict("SYNTH.NS", "15m", df, 10))
+        _, warm = timed(lambda: registry.predict("SYNTH.NS", "15m", df, 15))
+        start = time.perf_counter()
+        for _ in range(WARM_CALLS):
+            registry.predict("SYNTH.NS", "15m", df, 15)
+        cached = (time.perf_counter() - start) / WARM_CALLS
+        print(f"new horizon: {load * 1e3:.1f} ms (unpickle + inference), {warm * 1e3:.1f} ms warm, "
+              f"{cached * 1e6:.0f} us cached")
+
+        stale = registry.predict("SYNTH.NS", "15m", newer, 20)
+        print(f"new bar arrives: served by model {stale.key.version} (stale={stale.stale}) without waiting")
+        assert stale.stale
+
+        # A restarted process finds the model on disk instead of retraining
+        restarted = ModelRegistry(root, factory=SlowPredictor)
+        assert restarted.train("SYNTH.NS", "15m", df, days_ahead=20) is None
+        _, cold = timed(lambda: restarted.predict("SYNTH.NS", "15m", df, 20))
+        print(f"after a restart: {cold * 1e3:.1f} ms to the first prediction, no retraining")
+        registry.close()
+        restarted.close()
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from common import synthetic_ohlcv
+from backtest import DEFAULT_PARAMS, sweep
+from optimizer import CHUNK_SIZE, ResultCache, optimize, random_params
+
+BARS = 20_000
+SAMPLES = 4_000
+
+
+def run(close, params, workers, cache=None, context=None):
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for part in optimize(close, params, context, cache, workers=workers):
+        first = first or time.perf_counter() - start
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True), first, time.perf_counter() - start
+
+
+def main():
+    df = synthetic_ohlcv(BARS, interval="5m", seed=11)
+    close = df["Close"].to_numpy()
+    params = random_params(SAMPLES, seed=3)
+    columns = list(DEFAULT_PARAMS)
+
+    reference = sweep(df, params).sort_values(columns).reset_index(drop=True)
+
+    task = pickle.dumps((params.head(CHUNK_SIZE), {}))
+    print(f"{len(params)} parameter sets x {BARS} bars, {os.cpu_count()} core(s) available")
+    print(f"per task: {len(task) / 1e3:.0f} KB pickled; the {close.nbytes / 1e3:.0f} KB close array "
+          f"is shared once instead of being sent with each of {-(-len(params) // CHUNK_SIZE)} tasks")
+    print(f"{'workers':>8} {'first s':>8} {'total s':>8} {'sets/s':>8} {'speedup':>8}")
+
+    cores = os.cpu_count() or 1
+    base = None
+    for workers in sorted({1, 2, *(w for w in (4, 8, 16) if w <= cores), cores}):
+        table, first, total = run(close, params, workers)
+        pd.testing.assert_frame_equal(table.sort_values(columns).reset_index(drop=True), reference)
+        base = base or total
+        print(f"{workers:>8} {first:>8.2f} {total:>8.2f} {len(params) / total:>8.0f} {base / total:>7.2f}x")
+
+    cache = ResultCache()
+    context = ("SYNTH.NS", "5m", BARS)
+    run(close, params, cores, cache, context)
+    hits = cache.hits
+    _, _, cached = run(close, params, cores, cache, context)
+    print(f"repeat with warm cache: {cached * 1e3:.0f} ms ({cache.hits - hits}/{len(params)} served from cache)")
+
+
+if __name__ == "__main__":
+    main()
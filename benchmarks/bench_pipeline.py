@@ -0,0 +1,71 @@
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import best_of, nse_ohlcv
+import pipeline
+from pipeline import Pipeline, analyze, compute, run, run_batch
+from shared_cache import SharedMarketData
+
+TICKERS = [f"SYN{i}.NS" for i in range(16)]
+BARS = 2_000
+HITS = 2_000
+
+
+def stub_fetcher(ticker, interval, period=None, start=None):
+    # Module level so worker processes can unpickle it
+    return nse_ohlcv(BARS, interval, seed=sum(map(ord, ticker)))
+
+
+class StubStore:
+    def get(self, ticker, period, interval):
+        return stub_fetcher(ticker, interval, period)
+
+
+def main():
+    # Importing the core must not pull in Streamlit
+    assert "streamlit" not in sys.modules
+
+    # One headless run matches the dashboard's shared, incremental path
+    result = run("SYN0.NS", "15m", fetcher=stub_fetcher)
+    shared = Pipeline(SharedMarketData(StubStore(), info_fetcher=lambda ticker: {}))
+    dashboard = shared.run("SYN0.NS", "15m")
+    for col in ("RSI", "MACD_Hist", "ATR", "BB_High", "Signal"):
+        np.testing.assert_allclose(result.frame[col].to_numpy(dtype=float), dashboard.frame[col].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-9, err_msg=col)
+    assert result.snapshot == dashboard.snapshot
+
+    # A raw yfinance-shaped download goes through normalize first
+    raw = stub_fetcher("SYN0.NS", "15m")
+    raw.columns = pd.MultiIndex.from_product([raw.columns, ["SYN0.NS"]])
+    np.testing.assert_allclose(analyze(raw)["RSI"].to_numpy(), compute(stub_fetcher("SYN0.NS", "15m"))["RSI"].to_numpy())
+
+    print(f"{len(TICKERS)} tickers x {BARS} bars, 15m")
+    t_one = best_of(lambda: run("SYN0.NS", "15m", fetcher=stub_fetcher))
+    print(f"run() one ticker with analytics: {t_one * 1e3:.1f} ms")
+    for workers in (1, 2):
+        start = time.perf_counter()
+        rows = run_batch(TICKERS, "15m", workers=workers, fetcher=stub_fetcher)
+        elapsed = time.perf_counter() - start
+        assert len(rows) == len(TICKERS) and not any("error" in row for row in rows)
+        print(f"run_batch workers={workers}: {elapsed * 1e3:.0f} ms ({len(TICKERS) / elapsed:.0f} tickers/s)")
+
+    # Analytics on a rerun: cache_data unpickles the summary on every hit, the pipeline returns it
+    frame = dashboard.frame
+    blob = pickle.dumps(pipeline.analytics_summary(frame))
+    start = time.perf_counter()
+    for _ in range(HITS):
+        pickle.loads(blob)
+    t_pickled = (time.perf_counter() - start) / HITS
+    start = time.perf_counter()
+    for _ in range(HITS):
+        shared.summary("SYN0.NS", "15m", frame)
+    t_shared = (time.perf_counter() - start) / HITS
+    print(f"analytics summary per rerun: cache_data hit {t_pickled * 1e6:.0f} us, pipeline hit {t_shared * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
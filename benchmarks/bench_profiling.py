@@ -0,0 +1,72 @@
+import time
+
+from common import synthetic_ohlcv
+from profiling import Profiler
+from shared_cache import SharedMarketData
+
+SPANS = 200_000
+RERUNS = 2_000
+
+
+class StaticStore:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def get(self, ticker, period, interval):
+        return self.frame
+
+
+def per_span(profiler):
+    start = time.perf_counter()
+    for _ in range(SPANS):
+        with profiler.span("stage") as s:
+            s.rows = 1
+    return (time.perf_counter() - start) / SPANS
+
+
+def empty_loop():
+    start = time.perf_counter()
+    for _ in range(SPANS):
+        pass
+    return (time.perf_counter() - start) / SPANS
+
+
+def rerun(data, profiler):
+    # The data path of a cached rerun: shared candles and a shared analysis frame
+    with profiler.span("fetch") as s:
+        raw = data.candles("SYNTH.NS", "5d", "5m")
+        s.rows = len(raw)
+    with profiler.span("analysis", rows=len(raw)):
+        return data.analysis("SYNTH.NS", "5m", raw)
+
+
+def reruns(data, profiler):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        rerun(data, profiler)
+    return (time.perf_counter() - start) / RERUNS
+
+
+def main():
+    profiler = Profiler()
+    base = empty_loop()
+    off = per_span(profiler) - base
+    with profiler.run("bench"):
+        on = per_span(profiler) - base
+    print(f"per span: off {off * 1e9:.0f} ns, on {on * 1e9:.0f} ns")
+
+    data = SharedMarketData(StaticStore(synthetic_ohlcv(2_000, interval="5m")))
+    rerun(data, profiler)
+    off = reruns(data, profiler)
+    profiler.reset()
+    with profiler.run("bench"):
+        on = reruns(data, profiler)
+    print(f"cached rerun data path: off {off * 1e6:.1f} us, on {on * 1e6:.1f} us "
+          f"({(on - off) / off:+.1%}); {profiler.totals()['analysis']['calls']} analysis spans recorded")
+
+    print(profiler.prometheus().splitlines()[5])
+    print(profiler.jsonl().splitlines()[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+import ta
+
+from common import best_of, synthetic_ohlcv
+import indicators
+import kernels
+
+BARS = 1_000_000
+
+# The NumPy EWM fallback loops over bars in Python; it is checked on this many
+FALLBACK_BARS = 20_000
+RECURSIVE_COLUMNS = ["EMA20", "EMA50", "RSI", "EMA12", "EMA26", "MACD", "MACD_Signal", "MACD_Hist", "ATR"]
+
+
+def ta_recursive(df):
+    # The indicator block as it was before the kernels
+    df["EMA20"] = ta.trend.ema_indicator(df["Close"], window=20)
+    df["EMA50"] = ta.trend.ema_indicator(df["Close"], window=50)
+    df["RSI"] = ta.momentum.rsi(df["Close"], window=14)
+    df["EMA12"] = df["Close"].ewm(span=12).mean()
+    df["EMA26"] = df["Close"].ewm(span=26).mean()
+    df["MACD"] = df["EMA12"] - df["EMA26"]
+    df["MACD_Signal"] = df["MACD"].ewm(span=9).mean()
+    df["MACD_Hist"] = df["MACD"] - df["MACD_Signal"]
+    df["ATR"] = ta.volatility.average_true_range(df["High"], df["Low"], df["Close"], window=14)
+    return df
+
+
+def with_backend(backend, func):
+    previous, kernels.BACKEND = kernels.BACKEND, backend
+    try:
+        return func()
+    finally:
+        kernels.BACKEND = previous
+
+
+def main():
+    df = synthetic_ohlcv(BARS, interval="1m")
+    high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+    backends = ["numpy"] + (["numba"] if kernels.numba is not None else [])
+
+    # Warm up the JIT (cached on disk after the first run)
+    for backend in backends:
+        with_backend(backend, lambda: kernels.atr(high[:100], low[:100], close[:100]))
+        with_backend(backend, lambda: kernels.ema(close[:100], 20))
+
+    def cases(df):
+        high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+        return {
+            "EMA20": (
+                lambda: ta.trend.ema_indicator(df["Close"], window=20).to_numpy(),
+                lambda: kernels.ema(close, 20),
+            ),
+            "RSI": (
+                lambda: ta.momentum.rsi(df["Close"], window=14).to_numpy(),
+                lambda: kernels.rsi(close, 14),
+            ),
+            "EMA12 (adjusted)": (
+                lambda: df["Close"].ewm(span=12).mean().to_numpy(),
+                lambda: kernels.ewm_span(close, 12),
+            ),
+            "ATR": (
+                lambda: ta.volatility.average_true_range(df["High"], df["Low"], df["Close"], window=14).to_numpy(),
+                lambda: kernels.atr(high, low, close, 14),
+            ),
+        }
+
+    print(f"{BARS:,} bars, compiled backend: {'numba ' + kernels.numba.__version__ if kernels.numba else 'not installed'}")
+    print(f"{'indicator':>17} {'ta/pandas ms':>13} " + " ".join(f"{b + ' ms':>10}" for b in backends))
+    for name, (reference, kernel) in cases(df).items():
+        expected = reference()
+        timings = [best_of(reference, repeat=1 if name == "ATR" else 3)]
+        for backend in backends:
+            # The NumPy EWM fallback is measured on a shorter series below
+            if backend == "numpy" and name != "ATR":
+                timings.append(np.nan)
+                continue
+            assert np.array_equal(with_backend(backend, kernel), expected, equal_nan=True)
+            timings.append(with_backend(backend, lambda: best_of(kernel)))
+        cells = [f"{'-':>10}" if np.isnan(t) else f"{t * 1e3:>10.1f}" for t in timings[1:]]
+        print(f"{name:>17} {timings[0] * 1e3:>13.1f} " + " ".join(cells))
+
+    print()
+    print(f"NumPy fallback on {FALLBACK_BARS:,} bars (one series)")
+    print(f"{'indicator':>17} {'ta/pandas ms':>13} {'numpy ms':>10}")
+    for name, (reference, kernel) in cases(df.iloc[:FALLBACK_BARS]).items():
+        expected = reference()
+        assert np.array_equal(with_backend("numpy", kernel), expected, equal_nan=True), name
+        print(f"{name:>17} {best_of(reference) * 1e3:>13.1f} {with_backend('numpy', lambda: best_of(kernel)) * 1e3:>10.1f}")
+
+    print()
+    print("add_recursive_indicators end to end")
+    expected = ta_recursive(df.copy())
+    total = best_of(lambda: ta_recursive(df.copy()), repeat=1)
+    print(f"{'ta/pandas':>17} {total * 1e3:>10.1f} ms")
+    for backend in backends:
+        result = with_backend(backend, lambda: indicators.add_recursive_indicators(df.copy()))
+        for col in RECURSIVE_COLUMNS:
+            assert np.array_equal(result[col].to_numpy(), expected[col].to_numpy(), equal_nan=True), col
+        seconds = with_backend(backend, lambda: best_of(lambda: indicators.add_recursive_indicators(df.copy())))
+        # Without numba the block keeps ta/pandas for the EWMs; only ATR uses the NumPy kernel
+        label = "numba" if backend == "numba" else "ta + numpy ATR"
+        print(f"{label:>17} {seconds * 1e3:>10.1f} ms  {total / seconds:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
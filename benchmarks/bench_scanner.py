@@ -0,0 +1,78 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import best_of, synthetic_ohlcv
+from indicators import add_indicators
+from scanner import SCAN_WINDOW, rank_scan, scan_universe
+from signals import SIGNAL_START, generate_signals
+
+TICKERS = 200
+BARS = 2_000
+
+
+def per_ticker_scan(frames):
+    # Reference: the single-ticker dashboard pipeline run once per symbol
+    rows = []
+    for ticker, df in frames.items():
+        if len(df) <= SIGNAL_START:
+            continue
+        df = generate_signals(add_indicators(df.copy()))
+        last, prev_close = df.iloc[-1], df["Close"].iloc[-2]
+        fired = np.flatnonzero(df["Signal"].to_numpy()[-SCAN_WINDOW:])
+        pos = len(df) - SCAN_WINDOW + fired[-1] if len(fired) else None
+        change_pct = (last["Close"] - prev_close) / prev_close * 100
+        rows.append({
+            "Symbol": ticker.replace(".NS", ""),
+            "Signal": "" if pos is None else ("BUY" if df["Signal"].iloc[pos] > 0 else "SELL"),
+            "Bars Ago": np.nan if pos is None else len(df) - 1 - pos,
+            "Reason": "" if pos is None else df["Signal_Type"].iloc[pos],
+            "Score": int(change_pct > 0) + int(30 < last["RSI"] < 70)
+            + int(last["MACD"] > last["MACD_Signal"]) + int(last["EMA20"] > last["EMA50"]),
+            "Last (₹)": last["Close"],
+            "Change %": change_pct,
+            "RSI": last["RSI"],
+            "MACD Hist": last["MACD_Hist"],
+            "Stoch %K": last["Stoch_K"],
+            "ATR %": last["ATR"] / last["Close"] * 100,
+            "Trend": "Up" if last["EMA20"] > last["EMA50"] else "Down",
+        })
+    return rank_scan(rows)
+
+
+def main():
+    # Uneven history lengths exercise the right-aligned 2-D layout
+    frames = {
+        f"SYM{i:03d}.NS": synthetic_ohlcv(BARS - (i % 7) * 150, interval="15m", seed=i)
+        for i in range(TICKERS)
+    }
+
+    serial = scan_universe(frames, workers=1)
+    assert len(serial) == TICKERS
+
+    reference = per_ticker_scan(frames)
+    pd.testing.assert_frame_equal(serial, reference, check_dtype=False, rtol=1e-9)
+    per_ticker = best_of(lambda: per_ticker_scan(frames), repeat=2)
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, *(w for w in (4, 8, 16, 32) if w <= cores), cores})
+    print(f"{TICKERS} tickers x up to {BARS} bars, {cores} core(s) available")
+    print(f"per-ticker pandas/ta loop: {per_ticker:.2f} s ({TICKERS / per_ticker:.0f} tickers/s)")
+    print(f"{'workers':>8} {'first s':>8} {'s':>8} {'tickers/s':>10} {'speedup':>8}")
+
+    # The first pooled call also starts the (persistent, spawned) workers
+    base = None
+    for workers in counts:
+        start = time.perf_counter()
+        pooled = scan_universe(frames, workers=workers)
+        first = time.perf_counter() - start
+        assert pooled.equals(serial)
+        seconds = best_of(lambda: scan_universe(frames, workers=workers), repeat=2)
+        base = base or seconds
+        print(f"{workers:>8} {first:>8.2f} {seconds:>8.2f} {TICKERS / seconds:>10.0f} {base / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import pickle
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from common import synthetic_ohlcv
+from indicators import IndicatorState
+from shared_cache import SharedMarketData
+from signals import generate_signals
+
+SESSIONS = 50
+BARS = 2_000
+
+
+class StaticStore:
+    """Stands in for the CandleStore: the same downloaded history every time."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.fetches = 0
+
+    def get(self, ticker, period, interval):
+        self.fetches += 1
+        return self.frame
+
+
+class PeriodStore(StaticStore):
+    """Serves the last `bars` of the history per period, like CandleStore trimming to it."""
+
+    BARS = {"5d": 375, "1mo": 1_500}
+
+    def get(self, ticker, period, interval):
+        self.fetches += 1
+        return self.frame.iloc[-self.BARS[period]:]
+
+
+def per_session(raw, sessions):
+    # Before: every session unpickled its own cache_data copy and kept its own indicator state
+    blob = pickle.dumps(raw)
+    frames = []
+    for _ in range(sessions):
+        state = IndicatorState()
+        frames.append(generate_signals(state.update(pickle.loads(blob))))
+    return frames
+
+
+def shared(raw, sessions):
+    data = SharedMarketData(StaticStore(raw))
+
+    def session(_):
+        candles = data.candles("SYNTH.NS", "5d", "5m")
+        return data.analysis("SYNTH.NS", "5m", candles)
+
+    with ThreadPoolExecutor(8) as pool:
+        return list(pool.map(session, range(sessions))), data
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    raw = synthetic_ohlcv(BARS, interval="5m").tz_localize("Asia/Kolkata")
+
+    before, t_before, m_before = measure(lambda: per_session(raw, SESSIONS))
+    (after, data), t_after, m_after = measure(lambda: shared(raw, SESSIONS))
+
+    for frame in after:
+        for col in ("Close", "RSI", "MACD_Hist", "ATR", "Signal"):
+            np.testing.assert_allclose(frame[col].to_numpy(dtype=float), before[0][col].to_numpy(dtype=float),
+                                       rtol=1e-9, atol=1e-9, err_msg=col)
+    # Every session reads the same memory
+    assert all(np.shares_memory(f["RSI"].to_numpy(), after[0]["RSI"].to_numpy()) for f in after)
+
+    stats = data.metrics()
+    print(f"{SESSIONS} sessions watching one ticker ({BARS} bars)")
+    print(f"{'':>12} {'total ms':>9} {'held MB':>8} {'computes':>9}")
+    print(f"{'per session':>12} {t_before * 1e3:>9.0f} {m_before / 1e6:>8.1f} {SESSIONS:>9}")
+    print(f"{'shared':>12} {t_after * 1e3:>9.0f} {m_after / 1e6:>8.1f} {stats['frame_misses']:>9}")
+    print(f"candle fetches {stats['candle_misses']}, frame hit rate {stats['frame_hit_rate']:.0%}")
+
+    # A revised open bar is recomputed once, and earlier frames stay as they were served
+    revised = raw.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.01
+    old_close = after[0]["Close"].iloc[-1]
+    fresh = data.analysis("SYNTH.NS", "5m", revised)
+    assert fresh["Close"].iloc[-1] == revised["Close"].iloc[-1] and after[0]["Close"].iloc[-1] == old_close
+    start = time.perf_counter()
+    for _ in range(1_000):
+        data.analysis("SYNTH.NS", "5m", revised)
+    print(f"shared hit: {(time.perf_counter() - start) * 1e3:.0f} us per session rerun")
+
+    # Two periods of one (ticker, interval) inside the TTL each get their own window
+    data = SharedMarketData(PeriodStore(raw))
+    for period in ("5d", "1mo", "5d", "1mo"):
+        candles = data.candles("SYNTH.NS", period, "5m")
+        assert len(candles) == PeriodStore.BARS[period], (period, len(candles))
+        frame = data.analysis("SYNTH.NS", "5m", candles)
+        assert frame.index.equals(candles.index)
+    print(f"5d and 1mo inside one TTL: {data.store.fetches} fetches, each period served its own window")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from common import best_of, synthetic_ohlcv
+from indicators import add_indicators
+from signals import generate_signals
+
+
+def legacy_generate_signals(df):
+    # Verbatim copy of the original per-row loop from app.py
+    df["Signal"] = 0
+    df["Signal_Type"] = ""
+
+    for i in range(50, len(df)):
+        signals = []
+
+        if df["EMA20"].iloc[i] > df["EMA50"].iloc[i] and df["EMA20"].iloc[i-1] <= df["EMA50"].iloc[i-1]:
+            signals.append("BUY")
+        elif df["EMA20"].iloc[i] < df["EMA50"].iloc[i] and df["EMA20"].iloc[i-1] >= df["EMA50"].iloc[i-1]:
+            signals.append("SELL")
+
+        if df["RSI"].iloc[i] < 30:
+            signals.append("BUY (Oversold)")
+        elif df["RSI"].iloc[i] > 70:
+            signals.append("SELL (Overbought)")
+
+        if df["MACD"].iloc[i] > df["MACD_Signal"].iloc[i] and df["MACD"].iloc[i-1] <= df["MACD_Signal"].iloc[i-1]:
+            signals.append("BUY (MACD)")
+        elif df["MACD"].iloc[i] < df["MACD_Signal"].iloc[i] and df["MACD"].iloc[i-1] >= df["MACD_Signal"].iloc[i-1]:
+            signals.append("SELL (MACD)")
+
+        if signals:
+            df.at[df.index[i], "Signal"] = 1 if "BUY" in str(signals) else -1
+            df.at[df.index[i], "Signal_Type"] = " | ".join(signals)
+
+    return df
+
+
+def main():
+    print(f"{'bars':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in (1_000, 10_000, 100_000):
+        base = add_indicators(synthetic_ohlcv(n, seed=n))
+
+        legacy = legacy_generate_signals(base.copy())
+        fast = generate_signals(base.copy())
+        pd.testing.assert_series_equal(legacy["Signal"], fast["Signal"], check_dtype=False)
+        assert legacy["Signal_Type"].tolist() == fast["Signal_Type"].tolist()
+
+        # The legacy loop is slow enough that one run is representative
+        t_legacy = best_of(lambda: legacy_generate_signals(base.copy()), repeat=1 if n > 10_000 else 3)
+        t_fast = best_of(lambda: generate_signals(base.copy()))
+        print(f"{n:>8} {t_legacy:>12.4f} {t_fast:>15.4f} {t_legacy / t_fast:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
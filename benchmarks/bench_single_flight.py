@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from common import synthetic_ohlcv
+from shared_cache import SharedMarketData
+
+SESSIONS = 100
+TICKERS = ["RELIANCE.NS", "TCS.NS", "INFY.NS"]
+UPSTREAM_LATENCY = 0.05
+TTL = 60
+STALE_TTL = 60
+
+
+class StubUpstream:
+    """Local stand-in for yfinance: fixed latency, counts calls per key."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self.frame = synthetic_ohlcv(500, interval="5m")
+
+    def get(self, ticker, period, interval):
+        with self._lock:
+            self.calls[(ticker, interval)] += 1
+        time.sleep(UPSTREAM_LATENCY)
+        return self.frame
+
+    def info(self, ticker):
+        with self._lock:
+            self.calls[ticker] += 1
+        time.sleep(UPSTREAM_LATENCY)
+        return {"longName": ticker}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class NaiveTTLCache:
+    """What each rerun did before: check, and fetch on a miss without looking for a fetch in flight."""
+
+    def __init__(self, loader, ttl, clock):
+        self.loader, self.ttl, self.clock = loader, ttl, clock
+        self._entries = {}
+
+    def get(self, key, *args):
+        entry = self._entries.get(key)
+        if entry is not None and self.clock() - entry[0] < self.ttl:
+            return entry[1]
+        value = self.loader(*args)
+        self._entries[key] = (self.clock(), value)
+        return value
+
+
+def run_sessions(fetch):
+    # Every session reruns at the same moment, e.g. right as the TTL runs out
+    barrier = threading.Barrier(SESSIONS)
+    latencies = []
+
+    def session(i):
+        ticker = TICKERS[i % len(TICKERS)]
+        barrier.wait()
+        start = time.perf_counter()
+        fetch(ticker)
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(SESSIONS) as pool:
+        list(pool.map(session, range(SESSIONS)))
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[-1]
+
+
+def main():
+    print(f"{SESSIONS} sessions over {len(TICKERS)} tickers, upstream latency {UPSTREAM_LATENCY * 1e3:.0f} ms")
+    print(f"{'window':>26} {'cache':>10} {'upstream calls':>15} {'per key':>8} {'p50 ms':>7} {'max ms':>7}")
+
+    for name in ("naive", "coalescing"):
+        upstream, clock = StubUpstream(), Clock()
+        if name == "naive":
+            candles = NaiveTTLCache(upstream.get, TTL, clock)
+            infos = NaiveTTLCache(upstream.info, TTL, clock)
+            fetch = lambda ticker: (candles.get((ticker, "5m"), ticker, "5d", "5m"), infos.get(ticker, ticker))
+        else:
+            data = SharedMarketData(upstream, ttl=TTL, stale_ttl=STALE_TTL, clock=clock,
+                                    info_fetcher=upstream.info, info_ttl=TTL, info_stale_ttl=STALE_TTL)
+            fetch = lambda ticker: (data.candles(ticker, "5d", "5m"), data.info(ticker))
+
+        windows = [
+            ("cold start", 0),
+            ("within TTL", TTL / 2),
+            ("stale (serve + refresh)", TTL + STALE_TTL / 2),
+            ("expired", 3 * TTL + 2 * STALE_TTL),
+        ]
+        for label, now in windows:
+            clock.now = now
+            before = sum(upstream.calls.values())
+            p50, worst = run_sessions(fetch)
+            if name == "coalescing":
+                # Let the background refreshes land before counting
+                time.sleep(2 * UPSTREAM_LATENCY)
+            calls = sum(upstream.calls.values()) - before
+            keys = 2 * len(TICKERS)
+            print(f"{label:>26} {name:>10} {calls:>15} {calls / keys:>8.1f} {p50 * 1e3:>7.1f} {worst * 1e3:>7.1f}")
+            if name == "coalescing":
+                expected = 0 if label == "within TTL" else keys
+                assert calls == expected, (label, calls)
+
+    print("coalescing: one upstream call per key per TTL window; stale windows answer without waiting")
+
+
+if __name__ == "__main__":
+    main()
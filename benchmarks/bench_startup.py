@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_data_client import FakeUpstream
+from common import ROOT
+
+RUNS = 3
+
+# Heavy modules whose import time we want off the first render
+WATCH = ["yfinance", "plotly.express", "ta", "numba", "ml_predictor", "tensorflow", "prophet"]
+
+# Run in a fresh interpreter: render the page once with Streamlit's headless test runner
+CHILD = r"""
+import json, socket, sys, time
+connect = socket.socket.connect
+def local_only(sock, address):
+    # Only the fake upstream is reachable, so a stray network call fails fast instead of timing
+    if sock.family in (socket.AF_INET, socket.AF_INET6) and address[0] not in ("127.0.0.1", "::1", "localhost"):
+        raise OSError(f"benchmark is offline: {address}")
+    return connect(sock, address)
+socket.socket.connect = local_only
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+before = set(sys.modules)
+ready = time.perf_counter()
+at.run()
+done = time.perf_counter()
+print("RESULT " + json.dumps({
+    "streamlit_import": ready - start,
+    "script_run": done - ready,
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded": sorted(set(sys.modules) - before),
+}))
+"""
+
+
+def parse_importtime(stderr, loaded):
+    """{module: cumulative seconds} for top-level imports done while the script ran."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        name = name.strip()
+        if name in loaded:
+            times[name] = int(cumulative) / 1e6
+    return times
+
+
+def first_render(app_path, url):
+    env = dict(os.environ, STOCKPULSE_DATA_URL=url, STOCKPULSE_CACHE_DIR=tempfile.mkdtemp())
+    env.pop("STOCKPULSE_TICK_FEED", None)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD, app_path], cwd=ROOT, env=env,
+                          capture_output=True, text=True, timeout=600)
+    wall = time.perf_counter() - start
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+    if not lines:
+        sys.exit(f"render failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(lines[-1][len("RESULT "):])
+    result["wall"] = wall
+    result["imports"] = parse_importtime(proc.stderr, set(result["loaded"]))
+    return result
+
+
+def measure(app_path, url, runs):
+    results = [first_render(app_path, url) for _ in range(runs)]
+    best = min(results, key=lambda r: r["wall"])
+    assert not best["exceptions"], best["exceptions"]
+    return best
+
+
+def report(label, result):
+    watched = [name for name in WATCH if name in result["loaded"]]
+    print(f"{label}: first render {result['wall'] * 1e3:.0f} ms wall "
+          f"(streamlit import {result['streamlit_import'] * 1e3:.0f} ms, script {result['script_run'] * 1e3:.0f} ms)")
+    print(f"  heavy modules loaded: {', '.join(watched) or 'none'}")
+    top = sorted(result["imports"].items(), key=lambda kv: -kv[1])[:8]
+    print("  slowest imports during the script: " + ", ".join(f"{name} {t * 1e3:.0f} ms" for name, t in top))
+
+
+def app_at(rev):
+    # The app script as of `rev`, next to the current modules so its imports resolve
+    source = subprocess.run(["git", "show", f"{rev}:app.py"], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    fd, path = tempfile.mkstemp(prefix=".app_", suffix=".py", dir=ROOT)
+    with os.fdopen(fd, "w") as f:
+        f.write(source)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time to first render of the dashboard, with an import-time breakdown.")
+    parser.add_argument("--runs", type=int, default=RUNS, help="fresh interpreters per app; the fastest is reported")
+    parser.add_argument("--compare", metavar="REV", help="also measure app.py as of this git revision")
+    parser.add_argument("--json", metavar="PATH", help="write the measurements here")
+    args = parser.parse_args(argv)
+
+    # A local upstream for the candles, company info and the watchlist's batch download
+    server = FakeUpstream(stall=0, errors=0, throttled=0, latency=0).start()
+    measured = {}
+    try:
+        if args.compare:
+            path = app_at(args.compare)
+            try:
+                measured[args.compare] = measure(path, server.url, args.runs)
+            finally:
+                os.remove(path)
+            report(args.compare, measured[args.compare])
+        measured["current"] = measure(os.path.join(ROOT, "app.py"), server.url, args.runs)
+        report("current", measured["current"])
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(measured, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
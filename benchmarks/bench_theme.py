@@ -0,0 +1,67 @@
+import json
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit  # noqa: F401  installs the "streamlit" default template, as in the app
+
+from common import best_of, synthetic_ohlcv
+from theme import LEGEND_TOP, TEMPLATE_NAME, candlestick_figure, oscillator_figure
+
+FIGURES = 20
+
+
+def legacy_figures(df):
+    figs = []
+    for _ in range(FIGURES):
+        fig = go.Figure(go.Scatter(x=df.index, y=df["Close"], name="Close"))
+        fig.add_hline(y=df["Close"].max(), line_dash="dash", line_color="#ef4444", annotation_text="High")
+        fig.update_layout(
+            height=300,
+            plot_bgcolor="#0a0e1a",
+            paper_bgcolor="#0a0e1a",
+            font=dict(color="#e4e7eb"),
+            xaxis=dict(gridcolor="#1e293b"),
+            yaxis=dict(gridcolor="#1e293b"),
+            legend=LEGEND_TOP,
+        )
+        figs.append(fig)
+    return figs
+
+
+def themed_figures(df):
+    figs = []
+    for _ in range(FIGURES):
+        fig = oscillator_figure(height=300, levels=[(df["Close"].max(), "#ef4444", "High")], legend=LEGEND_TOP)
+        fig.add_trace(go.Scatter(x=df.index, y=df["Close"], name="Close"))
+        figs.append(fig)
+    return figs
+
+
+def payload(figs):
+    return sum(len(json.dumps(fig.to_plotly_json(), default=str)) for fig in figs)
+
+
+def main():
+    df = synthetic_ohlcv(200, interval="1d")
+    legacy_default = pio.templates.default
+
+    legacy_bytes = payload(legacy_figures(df))
+    legacy_time = best_of(lambda: [fig.to_json() for fig in legacy_figures(df)])
+
+    pio.templates.default = TEMPLATE_NAME
+    try:
+        themed_bytes = payload(themed_figures(df))
+        themed_time = best_of(lambda: [fig.to_json() for fig in themed_figures(df)])
+        layout = candlestick_figure(df).to_plotly_json()["layout"]
+        assert layout["template"]["layout"]["plot_bgcolor"] == "#0a0e1a"
+    finally:
+        pio.templates.default = legacy_default
+
+    print(f"{FIGURES} figures, template {legacy_default!r} -> {TEMPLATE_NAME!r}")
+    print(f"{'':>8} {'KB':>8} {'ms':>8}")
+    print(f"{'legacy':>8} {legacy_bytes / 1e3:>8.0f} {legacy_time * 1e3:>8.1f}")
+    print(f"{'themed':>8} {themed_bytes / 1e3:>8.0f} {themed_time * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
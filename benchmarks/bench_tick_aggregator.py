@@ -0,0 +1,127 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import best_of, synthetic_ohlcv
+from candle_store import merge_candles
+from indicators import IndicatorState
+from tick_aggregator import (
+    BAR_COLUMNS, INTERVALS, NS, SESSION_ORIGIN_NS, ReplaySource, SocketSource, TickAggregator, TickFeed,
+    TickServer, read_ticks,
+)
+
+TICKS = 500_000
+LATE_FRACTION = 0.01
+
+
+def synthetic_ticks(n, seed=0, symbol="SYNTH.NS"):
+    """A day or so of trades at ~5 per second, with a few arriving out of order."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01 09:15", tz="Asia/Kolkata").value
+    ts = start + np.cumsum(rng.exponential(0.2 * NS, n)).astype(np.int64)
+    late = rng.random(n) < LATE_FRACTION
+    ts[late] = np.maximum(ts[late] - rng.integers(1, 90 * NS, late.sum()), start)
+    price = np.round(2500 * np.exp(np.cumsum(rng.normal(0, 1e-4, n))), 2)
+    size = rng.integers(1, 500, n).astype(float)
+    return pd.DataFrame({"symbol": symbol, "ts": ts, "price": price, "size": size})
+
+
+def resampled(ticks, interval):
+    # Reference bars from pandas, on the same session-aligned buckets
+    frame = ticks.set_index(pd.DatetimeIndex(pd.to_datetime(ticks["ts"], utc=True), name="Datetime"))
+    bars = frame.resample(
+        pd.Timedelta(INTERVALS[interval], "ns"), origin="epoch", offset=pd.Timedelta(SESSION_ORIGIN_NS, "ns")
+    ).agg({"price": ["first", "max", "min", "last"], "size": "sum"}).dropna()
+    bars.columns = BAR_COLUMNS
+    return bars
+
+
+def main():
+    ticks = synthetic_ticks(TICKS)
+    ts, price, size = (ticks[c].to_numpy() for c in ("ts", "price", "size"))
+
+    def scalar():
+        aggregator = TickAggregator(capacity=100_000)
+        for t, p, s in zip(ts.tolist(), price.tolist(), size.tolist()):
+            aggregator.add(t, p, s)
+        return aggregator
+
+    aggregator = scalar()
+    assert aggregator.dropped == 0
+    for interval in INTERVALS:
+        # Late ticks fill in the high, low and volume of their bar but never move its open or close
+        bars, expected = aggregator.frame(interval), resampled(ticks, interval)
+        pd.testing.assert_frame_equal(bars[["High", "Low", "Volume"]], expected[["High", "Low", "Volume"]],
+                                      check_freq=False)
+
+    # The bulk path must give the same bars from in-order ticks in any batch split
+    ordered = ticks.sort_values("ts", kind="stable")
+    o_ts, o_price, o_size = (ordered[c].to_numpy() for c in ("ts", "price", "size"))
+    reference = TickAggregator(capacity=100_000)
+    for t, p, s in zip(o_ts.tolist(), o_price.tolist(), o_size.tolist()):
+        reference.add(t, p, s)
+    for interval in INTERVALS:
+        pd.testing.assert_frame_equal(reference.frame(interval), resampled(ordered, interval), check_freq=False)
+
+    def bulk(batch=10_000):
+        aggregator = TickAggregator(capacity=100_000)
+        for i in range(0, len(o_ts), batch):
+            aggregator.add_many(o_ts[i:i + batch], o_price[i:i + batch], o_size[i:i + batch])
+        return aggregator
+
+    for batch in (997, 10_000):
+        result = bulk(batch)
+        for interval in INTERVALS:
+            pd.testing.assert_frame_equal(result.frame(interval), reference.frame(interval))
+
+    t_scalar = best_of(scalar, repeat=1)
+    t_bulk = best_of(bulk)
+    print(f"{TICKS:,} ticks ({LATE_FRACTION:.0%} out of order) into {', '.join(INTERVALS)} bars")
+    print(f"{'tick by tick':>16} {TICKS / t_scalar:>12,.0f} ticks/s  {t_scalar / TICKS * 1e6:>6.2f} us/tick")
+    print(f"{'bulk (10k)':>16} {TICKS / t_bulk:>12,.0f} ticks/s")
+
+    # Replay over a local socket, the way the dashboard consumes a live feed
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ticks.csv")
+        ticks.head(100_000).to_csv(path, index=False, header=False)
+        assert read_ticks(path)["ts"].is_monotonic_increasing
+
+        server = TickServer(ReplaySource(path, speed=0, rebase=False)).start()
+        feed = TickFeed(SocketSource(*server.address))
+        start = time.perf_counter()
+        feed.start()
+        feed._thread.join()
+        elapsed = time.perf_counter() - start
+        server.stop()
+        received = feed.aggregator("SYNTH.NS")
+        assert received.ticks == 100_000, received.ticks
+        print(f"{'socket replay':>16} {received.ticks / elapsed:>12,.0f} ticks/s end to end")
+
+    # What a live refresh does with the bars: merge onto the history and update indicators
+    history = synthetic_ohlcv(1_500, interval="1m")
+    history.index = history.index.tz_localize("Asia/Kolkata")
+    live = TickAggregator()
+    state = IndicatorState()
+    state.update(history)
+    clock = history.index[-1].value
+
+    def refresh():
+        nonlocal clock
+        clock += 2 * NS
+        live.add_many(np.arange(clock - NS, clock, NS // 10), np.full(10, 2500.0), np.ones(10))
+        bars = live.frame("1m", since=history.index[-1], tz="Asia/Kolkata")
+        return state.update(merge_candles(history, bars))
+
+    frame = refresh()
+    assert list(frame.columns[:5]) == BAR_COLUMNS
+    t_frame = best_of(lambda: live.frame("1m", tz="Asia/Kolkata"), repeat=50)
+    t_refresh = best_of(refresh, repeat=50)
+    print(f"{'frame()':>16} {t_frame * 1e3:>12.2f} ms")
+    print(f"{'live refresh':>16} {t_refresh * 1e3:>12.2f} ms  (ticks -> bars -> merged -> indicators)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import time
+
+from bench_data_client import FakeUpstream
+from data_client import DataClient, HTTPProvider
+from watchlist import fetch_infos, watchlist_summary
+
+SYMBOLS = [f"SYN{i}.NS" for i in range(20)]
+LATENCY = 0.1
+ROUNDS = 3
+
+
+def timed(func):
+    best, result = float("inf"), None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    # Every request takes LATENCY seconds, as a remote API would
+    server = FakeUpstream(stall=0, errors=0, throttled=0, latency=LATENCY).start()
+    try:
+        # A high rate limit so the one-by-one row measures round trips, not token waits
+        client = DataClient(HTTPProvider(server.url), rate=1000, burst=1000)
+        print(f"{len(SYMBOLS)} symbols, {LATENCY * 1e3:.0f} ms per upstream request, "
+              f"{client.concurrency} connections")
+
+        _, one = timed(lambda: client.fetch_candles(SYMBOLS[0], "5m", period="5d"))
+        frames, batch = timed(lambda: client.fetch_batch(SYMBOLS, "5m", period="5d"))
+        assert sorted(frames) == sorted(SYMBOLS)
+        _, serial = timed(lambda: [client.fetch_candles(s, "5m", period="5d") for s in SYMBOLS])
+        print(f"one symbol: {one * 1e3:.0f} ms")
+        print(f"batch of {len(SYMBOLS)}: {batch * 1e3:.0f} ms ({batch / one:.1f}x one symbol)")
+        print(f"one by one: {serial * 1e3:.0f} ms ({serial / one:.1f}x one symbol)")
+
+        infos, lookup = timed(lambda: fetch_infos(SYMBOLS, fetch_info=client.fetch_info))
+        assert len(watchlist_summary(frames, infos)) == len(SYMBOLS)
+        print(f".info for {len(SYMBOLS)} on the bounded pool: {lookup * 1e3:.0f} ms")
+
+        # Throttled like the dashboard's client: a batch is one call to the rate limiter
+        limited = DataClient(HTTPProvider(server.url))
+        _, batched = timed(lambda: limited.fetch_batch(SYMBOLS, "5m", period="5d"))
+        print(f"batch with the default rate limit ({limited.bucket.rate:.0f}/s): {batched * 1e3:.0f} ms")
+        print(f"client stats: {limited.stats}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
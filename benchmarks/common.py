@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the dashboard modules importable when running `python benchmarks/<script>.py`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+INTERVAL_FREQ = {
+    "1m": "1min", "5m": "5min", "15m": "15min",
+    "30m": "30min", "1h": "1h", "1d": "1D",
+}
+
+
+def synthetic_ohlcv(n, interval="5m", seed=0, start_price=2500.0):
+    """Random-walk OHLCV frame shaped like a fixed `yf.download` result."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01 09:15", periods=n, freq=INTERVAL_FREQ[interval])
+
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[start_price], close[:-1]]) * (1 + rng.normal(0, 0.0005, n))
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(10_000, 1_000_000, n).astype(float)
+
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+# Bars per NSE session (09:15-15:30 IST); daily bars are stamped at midnight IST like yfinance's
+SESSION_BARS = {"1m": 375, "5m": 75, "15m": 25, "30m": 13, "1h": 7, "1d": 1}
+SESSION_OPEN = np.timedelta64(9 * 3600 + 15 * 60, "s")
+IST_OFFSET = np.timedelta64(5 * 3600 + 30 * 60, "s")
+
+# Last timestamp a nanosecond index can hold; longer histories fall back to seconds
+_NS_LIMIT = np.datetime64("2262-01-01", "s")
+
+
+def nse_times(n, interval, start="2000-01-03"):
+    """`n` bar start times over consecutive NSE weekday sessions, tz-aware in Asia/Kolkata."""
+    per_day = SESSION_BARS[interval]
+    days_needed = -(-n // per_day)
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(start, "D") + days_needed * 7 // 5 + 7)
+    days = days[np.is_busday(days)][:days_needed]
+
+    step = np.timedelta64(int(pd.Timedelta(INTERVAL_FREQ[interval]).total_seconds()), "s")
+    offsets = np.zeros(1, dtype="timedelta64[s]") if interval == "1d" else SESSION_OPEN + step * np.arange(per_day)
+    local = (days.astype("datetime64[s]")[:, None] + offsets[None, :]).ravel()[:n]
+    utc = local - IST_OFFSET
+    if utc[-1] < _NS_LIMIT:
+        utc = utc.astype("datetime64[ns]")
+    return pd.DatetimeIndex(utc).tz_localize("UTC").tz_convert("Asia/Kolkata")
+
+
+def nse_ohlcv(n, interval="5m", seed=0, start_price=2500.0, annual_vol=0.25):
+    """Synthetic NSE-like bars: session hours only, overnight gaps, 0.05 tick
+    prices and a U-shaped intraday volume profile."""
+    rng = np.random.default_rng(seed)
+    per_day = SESSION_BARS[interval]
+    index = nse_times(n, interval)
+    slot = np.arange(n) % per_day
+
+    sigma = annual_vol / np.sqrt(252 * per_day)
+    moves = rng.normal(0, sigma, n)
+    moves[slot == 0] += rng.normal(0, 0.005, (slot == 0).sum())
+    # Reflected into [start / 4, start * 4] so million-bar walks stay in a sane price range
+    bound = np.log(4.0)
+    log_move = np.abs((np.cumsum(moves) + bound) % (4 * bound) - 2 * bound) - bound
+    close = start_price * np.exp(log_move)
+    open_ = np.concatenate([[start_price], close[:-1]])
+    gap = slot == 0
+    open_[gap] *= np.exp(rng.normal(0, 0.003, gap.sum()))
+    spread = np.abs(rng.normal(0, sigma, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+
+    tick = lambda x: np.round(x / 0.05) * 0.05
+    profile = 1 + 1.5 * ((slot + 0.5) / per_day * 2 - 1) ** 2 if per_day > 1 else np.ones(n)
+    volume = np.round(50_000 * profile * rng.lognormal(0, 0.5, n)).astype(float)
+
+    return pd.DataFrame(
+        {"Open": tick(open_), "High": tick(high), "Low": tick(low), "Close": tick(close), "Volume": volume},
+        index=index,
+    )
+
+
+def as_yfinance(df, ticker="RELIANCE.NS"):
+    """`df` laid out like a single-ticker `yf.download` result: (Price, Ticker) columns."""
+    df = df[["Close", "High", "Low", "Open", "Volume"]]
+    df.columns = pd.MultiIndex.from_product([df.columns, [ticker]], names=["Price", "Ticker"])
+    return df
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class SlowPredictor:
+    """Stands in for `EnsemblePredictor`: slow to fit, quick to run, picklable.
+
+    Lives here, not in a benchmark script, because pool workers import it by module.
+    """
+
+    TRAIN_SECONDS = 3.0
+    INFERENCE_SECONDS = 0.05
+
+    def __init__(self):
+        self.coef = None
+
+    def predict_all(self, df, days_ahead=20, train_models=False):
+        close = df["Close"].to_numpy()
+        if train_models:
+            time.sleep(self.TRAIN_SECONDS)
+            self.coef = np.polyfit(np.arange(len(close)), close, 1)
+        elif self.coef is None:
+            raise RuntimeError("not trained")
+        else:
+            time.sleep(self.INFERENCE_SECONDS)
+        steps = np.arange(len(close), len(close) + days_ahead)
+        return {"ensemble_predictions": {"predictions": np.polyval(self.coef, steps).tolist()}}
+
+
+def ta_indicators(df):
+    """The original ta/pandas indicator block, used as the reference for the kernels."""
+    import ta
+    from indicators import add_rolling_indicators
+
+    df = df.copy()
+    df["EMA20"] = ta.trend.ema_indicator(df["Close"], window=20)
+    df["EMA50"] = ta.trend.ema_indicator(df["Close"], window=50)
+    df["RSI"] = ta.momentum.rsi(df["Close"], window=14)
+    df["EMA12"] = df["Close"].ewm(span=12).mean()
+    df["EMA26"] = df["Close"].ewm(span=26).mean()
+    df["MACD"] = df["EMA12"] - df["EMA26"]
+    df["MACD_Signal"] = df["MACD"].ewm(span=9).mean()
+    df["MACD_Hist"] = df["MACD"] - df["MACD_Signal"]
+    df["ATR"] = ta.volatility.average_true_range(df["High"], df["Low"], df["Close"], window=14)
+    return add_rolling_indicators(df)
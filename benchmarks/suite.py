@@ -0,0 +1,280 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from common import ROOT, SESSION_BARS, as_yfinance, nse_ohlcv
+
+import pandas as pd
+import plotly
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import kernels
+from analytics import analytics_summary
+from candle_store import download_candles
+from downsample import aggregate_ohlcv, bucket_size, lttb_series
+from fix import fix_ohlc
+from indicators import add_indicators
+from signals import generate_signals
+from theme import candlestick_figure, use_theme
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+INTERVALS = list(SESSION_BARS)
+STAGES = ["fetch", "fix_ohlc", "indicators", "signals", "analytics", "figures", "serialize"]
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+RESULTS = os.path.join(ROOT, "benchmarks", "results.json")
+
+# A stage stops repeating once it has used this many seconds, so 1M-bar cases stay affordable
+STAGE_BUDGET = 2.0
+
+# Slower than the baseline by more than this fraction (and NOISE_FLOOR seconds) is a regression
+THRESHOLD = 0.25
+NOISE_FLOOR = 0.002
+
+TICKER = "SYNTH.NS"
+
+
+class StubDownload:
+    """Stands in for `yf.download`: the prepared yfinance-shaped frame for (ticker, interval)."""
+
+    def __init__(self):
+        self.frames = {}
+        self.calls = 0
+
+    def __call__(self, tickers, period=None, interval="1d", start=None, **kwargs):
+        self.calls += 1
+        return self.frames[(tickers, interval)].copy()
+
+
+@contextlib.contextmanager
+def offline(stub):
+    # Any attempt to reach the network fails loudly instead of skewing the numbers
+    import yfinance as yf
+
+    def refuse(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            raise RuntimeError(f"benchmark suite tried to connect to {address}")
+        return connect(sock, address)
+
+    connect, download = socket.socket.connect, yf.download
+    socket.socket.connect, yf.download = refuse, stub
+    try:
+        yield
+    finally:
+        socket.socket.connect, yf.download = connect, download
+
+
+def price_figures(frame):
+    """The Price Chart tab's candlestick (with overlays and signal markers) and volume figures."""
+    # Overlays are sampled at each candle's last bar, as the tab does
+    candles = aggregate_ohlcv(frame, bucket_size(len(frame)))
+    fig = candlestick_figure(candles, height=600)
+    for column, name, color in (("EMA20", "EMA 20", "#2dd4bf"), ("EMA50", "EMA 50", "#fbbf24"),
+                                ("BB_High", "BB Upper", "#8b5cf6"), ("BB_Low", "BB Lower", "#8b5cf6")):
+        line = frame[column].reindex(candles.index)
+        fig.add_trace(go.Scatter(x=line.index, y=line, name=name, line=dict(color=color, width=2)))
+    for code, column, factor, symbol in ((1, "Low", 0.998, "triangle-up"), (-1, "High", 1.002, "triangle-down")):
+        marks = frame[frame["Signal"] == code]
+        fig.add_trace(go.Scatter(x=marks.index, y=marks[column] * factor, mode="markers",
+                                 marker=dict(symbol=symbol, size=12), text=marks["Signal_Type"]))
+
+    volume_sma = frame["Volume_SMA"].reindex(candles.index)
+    fig_volume = go.Figure(go.Bar(x=candles.index, y=candles["Volume"], name="Volume"))
+    fig_volume.add_trace(go.Scatter(x=volume_sma.index, y=volume_sma, name="Volume SMA"))
+    return [fig, fig_volume]
+
+
+def analytics_figures(stats):
+    """The Analytics tab's distribution, returns, RSI zone and ATR trend figures."""
+    price_dist, volume_dist = stats["price_dist"], stats["volume_dist"]
+    atr_trend = lttb_series(stats["atr_trend"].dropna())
+    return [
+        px.bar(x=[f"₹{i.left:.0f}-{i.right:.0f}" for i in price_dist.index], y=price_dist.values,
+               color=price_dist.values, color_continuous_scale="teal"),
+        px.histogram(x=stats["returns_hist"], nbins=30),
+        px.pie(values=volume_dist.values, names=[str(i) for i in volume_dist.index], hole=0.4),
+        px.bar(x=stats["rsi_dist"].index.astype(str), y=stats["rsi_dist"].values),
+        px.bar(x=stats["strength_dist"].index.astype(str), y=stats["strength_dist"].values),
+        go.Figure(go.Scatter(x=atr_trend.index, y=atr_trend, mode="lines")),
+        px.imshow(stats["correlation"], text_auto=".2f"),
+    ]
+
+
+def measure(func, setup=None, repeat=3, budget=STAGE_BUDGET):
+    """Seconds per run of ``func(setup())``; `setup` is not timed. Returns (timings, last result)."""
+    timings, result = [], None
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        result = func(arg) if setup is not None else func()
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > budget:
+            break
+    return timings, result
+
+
+def run_case(interval, bars, stages, repeat, stub):
+    """Time every stage on `bars` bars of `interval`, each stage on the previous stage's output."""
+    raw = as_yfinance(nse_ohlcv(bars, interval, seed=bars + len(interval)), TICKER)
+    stub.frames[(TICKER, interval)] = raw
+    results = []
+
+    def record(stage, timings, extra=None):
+        if stage in stages:
+            results.append({"stage": stage, "interval": interval, "bars": bars,
+                            "seconds": min(timings), "median": statistics.median(timings),
+                            "runs": len(timings), **(extra or {})})
+
+    timings, fixed = measure(lambda: download_candles(TICKER, interval, period="max"), repeat=repeat)
+    record("fetch", timings)
+    timings, fixed = measure(fix_ohlc, lambda: raw.copy(), repeat)
+    record("fix_ohlc", timings)
+    timings, frame = measure(add_indicators, lambda: fixed.copy(), repeat)
+    record("indicators", timings)
+    timings, frame = measure(generate_signals, lambda: frame.copy(), repeat)
+    record("signals", timings)
+    timings, stats = measure(lambda: analytics_summary(frame), repeat=repeat)
+    record("analytics", timings)
+    timings, figures = measure(lambda: price_figures(frame) + analytics_figures(stats), repeat=repeat)
+    record("figures", timings, {"figures": len(figures)})
+    timings, payloads = measure(lambda: [pio.to_json(fig, validate=False) for fig in figures], repeat=repeat)
+    record("serialize", timings, {"bytes": sum(len(p) for p in payloads)})
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+        # Optional; without it the kernels run their NumPy fallback
+        "numba": kernels.numba.__version__ if kernels.numba is not None else "absent",
+        "backend": kernels.BACKEND,
+    }
+
+
+def result_key(row):
+    return row["stage"], row["interval"], row["bars"]
+
+
+def compare(results, baseline, threshold=THRESHOLD, noise_floor=NOISE_FLOOR):
+    """Per-case ratios against `baseline`; a case regresses when it is slower than the baseline
+    by more than `threshold` and by more than `noise_floor` seconds."""
+    before = {result_key(row): row for row in baseline["results"]}
+    rows = []
+    for row in results:
+        old = before.get(result_key(row))
+        if old is None:
+            continue
+        ratio = row["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        regressed = ratio > 1 + threshold and row["seconds"] - old["seconds"] > noise_floor
+        rows.append({**dict(zip(("stage", "interval", "bars"), result_key(row))),
+                     "baseline": old["seconds"], "seconds": row["seconds"], "ratio": ratio, "regressed": regressed})
+    return rows
+
+
+def print_results(results):
+    print(f"{'stage':<11} {'interval':>8} {'bars':>10} {'best ms':>10} {'median ms':>10} {'runs':>5} {'Mbars/s':>8}")
+    for row in results:
+        rate = row["bars"] / row["seconds"] / 1e6 if row["seconds"] else float("inf")
+        print(f"{row['stage']:<11} {row['interval']:>8} {row['bars']:>10,} {row['seconds'] * 1e3:>10.2f} "
+              f"{row['median'] * 1e3:>10.2f} {row['runs']:>5} {rate:>8.2f}")
+
+
+def print_comparison(rows):
+    print(f"{'stage':<11} {'interval':>8} {'bars':>10} {'baseline ms':>12} {'now ms':>10} {'ratio':>7}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['stage']:<11} {row['interval']:>8} {row['bars']:>10,} {row['baseline'] * 1e3:>12.2f} "
+              f"{row['seconds'] * 1e3:>10.2f} {row['ratio']:>6.2f}x{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time each dashboard stage on synthetic NSE bars, offline, and compare with a baseline.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated bar counts")
+    parser.add_argument("--intervals", default=",".join(INTERVALS), help="comma-separated intervals")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated stages to report")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (fewer once a stage uses its budget)")
+    parser.add_argument("--output", default=RESULTS, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=BASELINE, help="results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown before flagging")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    intervals = args.intervals.split(",")
+    stages = args.stages.split(",")
+    unknown = [i for i in intervals if i not in SESSION_BARS] + [s for s in stages if s not in STAGES]
+    if unknown:
+        sys.exit(f"unknown interval or stage: {', '.join(unknown)}")
+
+    # The dashboard's template, so figures serialize like they do in the app
+    use_theme()
+    stub = StubDownload()
+    results = []
+    with offline(stub):
+        # Compile the numba kernels before anything is timed
+        run_case(intervals[0], min(sizes), set(), 1, stub)
+        for interval in intervals:
+            for bars in sizes:
+                results.extend(run_case(interval, bars, stages, args.repeat, stub))
+
+    print_results(results)
+    report = {"environment": environment(), "config": {"sizes": sizes, "intervals": intervals, "stages": stages,
+                                                       "repeat": args.repeat, "budget": STAGE_BUDGET},
+              "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nwrote {len(results)} results to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"saved as baseline {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nagainst {args.baseline} (commit {baseline['environment'].get('commit')}):")
+    print_comparison(rows)
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"{len(regressions)} of {len(rows)} cases slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    print(f"no regressions in {len(rows)} cases")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import threading
+import time
+
+import pandas as pd
+
+from bar_store import BAR_COLUMNS
+from fix import fix_ohlc
+from profiling import span
+
+
+# How far back Yahoo serves each intraday interval; a delta fetch that would start
+# earlier is refused, so the store falls back to a full fetch
+DELTA_WINDOWS = {
+    "1m": pd.Timedelta(days=7), "2m": pd.Timedelta(days=60), "5m": pd.Timedelta(days=60),
+    "15m": pd.Timedelta(days=60), "30m": pd.Timedelta(days=60), "90m": pd.Timedelta(days=60),
+    "60m": pd.Timedelta(days=730), "1h": pd.Timedelta(days=730),
+}
+
+# Periods in increasing order of the history they cover ("ytd" varies, see `covers`)
+PERIOD_ORDER = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
+
+
+def download_candles(ticker, interval, period=None, start=None, timeout=10):
+    import yfinance as yf
+
+    if start is not None:
+        df = yf.download(ticker, start=start, interval=interval, progress=False, timeout=timeout)
+    else:
+        df = yf.download(ticker, period=period, interval=interval, progress=False, timeout=timeout)
+    if df is None or df.empty:
+        return None
+    with span("fix_ohlc", rows=len(df)):
+        return fix_ohlc(df)
+
+
+def period_start(index, period):
+    """First timestamp a fresh `period` download ending at the last bar of `index` would cover."""
+    last = index[-1]
+    if period == "ytd":
+        return last.normalize().replace(month=1, day=1)
+    if period.endswith("mo"):
+        return last.normalize() - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("y"):
+        return last.normalize() - pd.DateOffset(years=int(period[:-1]))
+    if period.endswith("d"):
+        # Trading days, like yfinance: the last n session dates in the index
+        days = index[-int(period[:-1]) * 400:].normalize().unique()
+        return days[-min(int(period[:-1]), len(days))]
+    return None
+
+
+def load_start(last, period):
+    """A timestamp early enough that bars from it on hold `period` back from `last`."""
+    if period == "max":
+        return None
+    if period.endswith("d"):
+        # Calendar days generous enough for n sessions across weekends and holidays
+        return last.normalize() - pd.Timedelta(days=2 * int(period[:-1]) + 7)
+    return period_start(pd.DatetimeIndex([last]), period)
+
+
+def trim_to_period(frame, period):
+    """The bars of `frame` inside `period` counted back from its last bar; "max" keeps everything."""
+    if frame is None or frame.empty or period is None or period == "max":
+        return frame
+    start = period_start(frame.index, period)
+    if start is None or start <= frame.index[0]:
+        return frame
+    return frame[frame.index >= start]
+
+
+def covers(period, wanted):
+    """Whether a download of `period` includes everything a download of `wanted` would."""
+    if period == wanted:
+        return True
+    if wanted == "ytd":
+        return period in PERIOD_ORDER and PERIOD_ORDER.index(period) >= PERIOD_ORDER.index("1y")
+    if period not in PERIOD_ORDER or wanted not in PERIOD_ORDER:
+        return False
+    return PERIOD_ORDER.index(period) >= PERIOD_ORDER.index(wanted)
+
+
+def merge_candles(history, fresh):
+    if fresh is None or fresh.empty:
+        return history
+    if history is None or history.empty:
+        return fresh.sort_index()
+
+    fresh = fresh.sort_index()
+    # Everything from the first fresh bar onward is replaced, which also drops
+    # the stale copy of the bar that was still open on the previous fetch
+    kept = history[history.index < fresh.index[0]]
+    merged = pd.concat([kept, fresh[history.columns.intersection(fresh.columns)]])
+    return merged[~merged.index.duplicated(keep="last")]
+
+
+class CandleStore:
+    """Per-(ticker, interval) candle history that is topped up with delta fetches.
+
+    The first request downloads the full `period`; later requests only ask the
+    source for bars from the last stored timestamp onward, so the still-open
+    last bar is re-fetched and everything older is reused. A request for a
+    longer period than the history covers, a delta fetch that comes back
+    empty, or a gap longer than the source serves intraday bars for falls
+    back to a full fetch. Every request gets only its own `period`; the
+    history kept is the longest period asked for. With a `disk` cache the
+    history also survives restarts and is shared by replicas on one host.
+    """
+
+    def __init__(self, fetcher=download_candles, max_bars=None, disk=None, clock=time.time):
+        self.fetcher = fetcher
+        self.max_bars = max_bars
+        self.disk = disk
+        self.clock = clock
+        self.stats = {"full_fetches": 0, "delta_fetches": 0, "rows_fetched": 0}
+        self._history = {}
+        self._periods = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def history(self, ticker, interval):
+        return self._history.get((ticker, interval))
+
+    def _needs_full(self, key, history, period, interval):
+        if history is None or history.empty:
+            return True
+        covered = self._periods.get(key)
+        if covered is None:
+            # Loaded from disk: good enough if it reaches back to the day `period` starts.
+            # Dates, not times (the first bar opens at 09:15, period_start is midnight),
+            # and a start on a weekend is met by the Monday session
+            start = period_start(history.index, period) if period != "max" else None
+            if start is None or history.index[0].normalize() > start.normalize() + pd.offsets.BDay(0):
+                return True
+            covered = self._periods[key] = period
+        if not covers(covered, period):
+            return True
+        window = DELTA_WINDOWS.get(interval)
+        last = history.index[-1]
+        last = last.tz_localize("UTC") if last.tzinfo is None else last
+        return window is not None and self.clock() - last.timestamp() > window.total_seconds()
+
+    def _full(self, ticker, interval, period):
+        self.stats["full_fetches"] += 1
+        return self.fetcher(ticker, interval, period=period)
+
+    def get(self, ticker, period, interval):
+        key = (ticker, interval)
+        with self._key_lock(key):
+            history = self._history.get(key)
+            if history is None and self.disk is not None:
+                # Only the bar columns, and only as far back as `period` reaches
+                last = self.disk.last_timestamp(ticker, interval)
+                if last is not None:
+                    history = self.disk.load(ticker, interval, columns=BAR_COLUMNS, start=load_start(last, period))
+
+            fresh = None
+            if not self._needs_full(key, history, period, interval):
+                fresh = self.fetcher(ticker, interval, start=history.index[-1])
+                self.stats["delta_fetches"] += 1
+            if fresh is None or fresh.empty:
+                # No history yet, or the delta was refused: start over from a full download
+                fresh = self._full(ticker, interval, period)
+                if fresh is None or fresh.empty:
+                    # Nothing new to offer; keep serving what there is
+                    if history is None or history.empty:
+                        return None
+                else:
+                    history = None
+                    self._periods[key] = period
+
+            if fresh is not None:
+                self.stats["rows_fetched"] += len(fresh)
+
+            merged = merge_candles(history, fresh)
+            if merged is None or merged.empty:
+                return None
+            if self.disk is not None and fresh is not None and not fresh.empty:
+                self.disk.write(ticker, interval, merged[merged.index >= fresh.index.min()])
+            # Keep only the longest period asked for, so deltas don't grow the history forever
+            merged = trim_to_period(merged, self._periods.get(key, period))
+            if self.max_bars is not None and len(merged) > self.max_bars:
+                merged = merged.iloc[-self.max_bars:]
+
+            self._history[key] = merged
+            return trim_to_period(merged, period)
+
+    def clear(self, ticker=None, interval=None):
+        with self._lock:
+            for key in list(self._history):
+                if (ticker is None or key[0] == ticker) and (interval is None or key[1] == interval):
+                    del self._history[key]
+                    self._periods.pop(key, None)
@@ -0,0 +1,422 @@
+import asyncio
+import contextvars
+import json
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import pandas as pd
+
+from candle_store import download_candles
+from profiling import span
+
+# Per-host limits: requests in flight, and a token bucket of `RATE` per second with bursts of `BURST`
+CONCURRENCY = 4
+RATE = 2.0
+BURST = 5
+
+# Seconds per attempt, and for the whole call including retries and backoff
+TIMEOUT = 10.0
+DEADLINE = 30.0
+
+RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+
+# Consecutive failures that open the circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 30.0
+
+
+class UpstreamError(Exception):
+    """A data request failed; `retryable` says whether trying again may help."""
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimited(UpstreamError):
+    pass
+
+
+class CircuitOpen(UpstreamError):
+    def __init__(self, message):
+        super().__init__(message, retryable=False)
+
+
+class TokenBucket:
+    """`rate` requests per second on average, at most `burst` back to back."""
+
+    def __init__(self, rate=RATE, burst=BURST, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def reserve(self):
+        """Take a token and return how long to wait before using it."""
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after `threshold` failures in a row.
+
+    After `reset_after` seconds one trial call is let through (half-open);
+    its success closes the circuit again and its failure re-opens it.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_after=BREAKER_RESET, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.clock() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            self.opened_at = self.clock()
+        self._trial = False
+
+
+class YFinanceProvider:
+    """yfinance on a bounded thread pool.
+
+    yfinance keeps one HTTP session for the process, so connections are
+    reused across calls; `timeout` is also passed down to its requests so a
+    stuck call frees its worker thread. `.info` takes no timeout, so every
+    call is also bounded here. yfinance's own errors are mapped to
+    UpstreamError: network failures are retryable, a missing ticker or a
+    response it could not parse is not.
+    """
+
+    host = "finance.yahoo.com"
+
+    def __init__(self, workers=CONCURRENCY, timeout=TIMEOUT):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yfinance")
+
+    async def _run(self, func, *args):
+        from yfinance.exceptions import YFException, YFRateLimitError
+
+        # Run in the caller's context so profiling spans inside land in its run
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(self._pool, context.run, func, *args)
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except TimeoutError:
+            raise UpstreamError(f"{self.host}: no answer within {self.timeout:.1f}s") from None
+        except YFRateLimitError as e:
+            raise RateLimited(f"{self.host}: {e}") from e
+        except OSError as e:
+            # Connection, TLS and HTTP errors from yfinance's HTTP session
+            raise UpstreamError(f"{self.host}: {e or type(e).__name__}") from e
+        except (YFException, ValueError, KeyError, TypeError, IndexError) as e:
+            raise UpstreamError(f"{self.host}: {type(e).__name__}: {e}", retryable=False) from e
+
+    def _download(self, ticker, period, interval, start):
+        return download_candles(ticker, interval, period=period, start=start, timeout=self.timeout)
+
+    def _info(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info
+
+    def _batch(self, tickers, interval, period):
+        # watchlist imports this module for UpstreamError
+        from watchlist import download_watchlist
+
+        return download_watchlist(tickers, period, interval, timeout=self.timeout)
+
+    async def candles(self, ticker, interval, period=None, start=None):
+        return await self._run(self._download, ticker, period, interval, start)
+
+    async def info(self, ticker):
+        return await self._run(self._info, ticker)
+
+    async def batch(self, tickers, interval, period=None):
+        # One grouped download; yfinance fans it out over its own threads
+        return await self._run(self._batch, list(tickers), interval, period)
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, reused across requests."""
+
+    def __init__(self, host, port, size):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.opened = 0
+        self._idle = []
+
+    async def request(self, path):
+        """(status, headers, body) for a GET of `path`."""
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nConnection: keep-alive\r\n\r\n".encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed by server")
+            status = int(status_line.split()[1])
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+        except BaseException:
+            # Cancelled by a timeout, or a broken connection: never reuse it
+            writer.close()
+            raise
+        if headers.get("connection", "").lower() == "close" or len(self._idle) >= self.size:
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, headers, body
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class HTTPProvider:
+    """JSON candle/info API over pooled HTTP, e.g. a local fake server in tests.
+
+    ``GET /candles?ticker=&interval=&period=|start=`` returns a frame in
+    pandas' "split" layout with epoch-nanosecond index and a "tz" field;
+    ``GET /info?ticker=`` returns the info dict. 404 means no data.
+    """
+
+    def __init__(self, base_url, pool_size=CONCURRENCY):
+        parts = urlsplit(base_url)
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self._pool_args = (parts.hostname, parts.port or 80, pool_size)
+        self._pools = weakref.WeakKeyDictionary()
+
+    @property
+    def pool(self):
+        # One per event loop, since streams belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = _ConnectionPool(*self._pool_args)
+        return pool
+
+    async def _get(self, endpoint, **params):
+        query = urlencode({k: v for k, v in params.items() if v is not None})
+        try:
+            status, headers, body = await self.pool.request(f"{self.prefix}/{endpoint}?{query}")
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise UpstreamError(f"{self.host}: {e or type(e).__name__}") from e
+        if status == 404:
+            return None
+        if status == 429:
+            retry_after = headers.get("retry-after")
+            raise RateLimited(f"{self.host}: rate limited", retry_after=float(retry_after) if retry_after else None)
+        if status >= 400:
+            raise UpstreamError(f"{self.host}: HTTP {status}", retryable=status >= 500)
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise UpstreamError(f"{self.host}: bad JSON: {e}", retryable=False) from e
+
+    async def candles(self, ticker, interval, period=None, start=None):
+        payload = await self._get("candles", ticker=ticker, interval=interval, period=period,
+                                  start=None if start is None else pd.Timestamp(start).isoformat())
+        try:
+            if not payload or not payload["data"]:
+                return None
+            index = pd.to_datetime(payload["index"], utc=True)
+            if payload.get("tz"):
+                index = index.tz_convert(payload["tz"])
+            else:
+                index = index.tz_localize(None)
+            return pd.DataFrame(payload["data"], index=index, columns=payload["columns"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise UpstreamError(f"{self.host}: malformed candles: {e}", retryable=False) from e
+
+    async def info(self, ticker):
+        return await self._get("info", ticker=ticker) or {}
+
+    async def batch(self, tickers, interval, period=None):
+        # Like a grouped yfinance download: symbols that fail are left out, unless all do
+        tickers = list(tickers)
+        # No more requests in flight than the pool keeps connections
+        slots = asyncio.Semaphore(self.pool.size)
+
+        async def candles(ticker):
+            async with slots:
+                return await self.candles(ticker, interval, period)
+
+        frames = await asyncio.gather(*map(candles, tickers), return_exceptions=True)
+        errors = [f for f in frames if isinstance(f, BaseException)]
+        if errors and len(errors) == len(tickers):
+            raise errors[0]
+        return {t: f for t, f in zip(tickers, frames) if isinstance(f, pd.DataFrame) and not f.empty}
+
+
+class DataClient:
+    """Async front for a data provider that keeps tail latency bounded.
+
+    Calls to the provider's host share a concurrency limit and a token
+    bucket, every attempt has a timeout and the whole call a deadline, and
+    retryable failures (timeouts, connection errors, 5xx, rate limits) are
+    retried with full-jitter exponential backoff, honouring Retry-After.
+    A circuit breaker fails calls fast while the upstream keeps failing.
+
+    The async methods run on any loop, with a concurrency limit per loop
+    (the rate limit and breaker are shared across loops); `fetch_candles`, `fetch_info` and `fetch_batch` are
+    blocking wrappers for the Streamlit script that run on a private loop
+    thread, and fit `CandleStore(fetcher=...)` and the shared info cache.
+    """
+
+    def __init__(self, provider, concurrency=CONCURRENCY, rate=RATE, burst=BURST, timeout=TIMEOUT,
+                 deadline=DEADLINE, retries=RETRIES, backoff=BACKOFF, max_backoff=MAX_BACKOFF,
+                 breaker=None, seed=None):
+        self.provider = provider
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.stats = {"calls": 0, "attempts": 0, "retries": 0, "timeouts": 0, "failures": 0, "rejected": 0}
+        self._random = random.Random(seed)
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def _delay(self, attempt, error):
+        if error.retry_after is not None:
+            return error.retry_after
+        return self._random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def _attempt(self, method, args, started):
+        # A semaphore belongs to the loop it is first awaited on
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        async with semaphore:
+            await self.bucket.acquire()
+            # Time spent queued for a slot or a token comes out of this attempt's budget
+            budget = min(self.timeout, self.deadline - (time.monotonic() - started))
+            self.stats["attempts"] += 1
+            try:
+                return await asyncio.wait_for(getattr(self.provider, method)(*args), budget)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise UpstreamError(f"{self.provider.host}: no answer within {budget:.1f}s") from None
+
+    async def call(self, method, *args):
+        """``provider.<method>(*args)`` with limits, timeouts, retries and circuit breaking."""
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        try:
+            with span(f"upstream.{method}") as s:
+                result = await asyncio.wait_for(self._call(method, args, started), self.deadline)
+                if isinstance(result, pd.DataFrame):
+                    s.rows = len(result)
+                return result
+        except asyncio.TimeoutError:
+            # Still queued for a slot or a token when the deadline ran out
+            self.stats["failures"] += 1
+            raise UpstreamError(f"{self.provider.host}: no answer within {self.deadline:.1f}s") from None
+
+    async def _call(self, method, args, started):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.stats["rejected"] += 1
+                raise CircuitOpen(f"{self.provider.host}: circuit open after repeated failures")
+            try:
+                result = await self._attempt(method, args, started)
+            except UpstreamError as e:
+                if e.retryable:
+                    self.breaker.failure()
+                else:
+                    self.breaker.success()
+                delay = self._delay(attempt, e)
+                remaining = self.deadline - (time.monotonic() - started)
+                if not e.retryable or attempt >= self.retries or delay >= remaining:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.success()
+                return result
+
+    async def candles(self, ticker, interval, period=None, start=None):
+        return await self.call("candles", ticker, interval, period, start)
+
+    async def info(self, ticker):
+        return await self.call("info", ticker)
+
+    async def batch(self, tickers, interval, period=None):
+        """{ticker: candles} for many symbols in one call, e.g. the watchlist or a scanner universe."""
+        return await self.call("batch", tuple(tickers), interval, period)
+
+    def _run(self, coro):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="data-client", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch_candles(self, ticker, interval, period=None, start=None):
+        return self._run(self.candles(ticker, interval, period=period, start=start))
+
+    def fetch_info(self, ticker):
+        return self._run(self.info(ticker))
+
+    def fetch_batch(self, tickers, interval, period=None):
+        return self._run(self.batch(tickers, interval, period=period))
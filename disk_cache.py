@@ -0,0 +1,210 @@
+import contextlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): safe for one process, not for replicas sharing the directory
+    fcntl = None
+
+INDEX_FILE = "index.i8"
+META_FILE = "meta.json"
+LOCK_FILE = "lock"
+
+# What a stored history's files are laid out by; a change means a rewrite
+LAYOUT_KEYS = ("tz", "columns", "dtypes")
+
+
+def _safe_name(value):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+class DiskCandleCache:
+    """Columnar on-disk OHLCV history, one raw binary file per column.
+
+    Timestamps are stored as int64 UTC nanoseconds and every column as a flat
+    array of its dtype, so reads memory-map just the columns and date range a
+    view needs. `meta.json` holds the committed row count and is replaced
+    atomically. Rows are only written past the committed count, and meta.json
+    last, so a torn append is ignored; replacing committed rows first commits
+    the shorter count, so a crash loses those bars rather than mixing old and
+    new ones. An flock on each history's directory (shared for reads,
+    exclusive for writes) lets replicas on one host share the cache.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _dir(self, ticker, interval):
+        return os.path.join(self.root, _safe_name(ticker), _safe_name(interval))
+
+    @contextlib.contextmanager
+    def _locked(self, path, exclusive=False):
+        if fcntl is None or not os.path.isdir(path):
+            yield
+            return
+        with open(os.path.join(path, LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_meta(self, path):
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path, meta):
+        tmp = os.path.join(path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, META_FILE))
+
+    def _column_file(self, path, column):
+        return os.path.join(path, _safe_name(column) + ".col")
+
+    def _map(self, filename, dtype, rows):
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode="r", shape=(rows,))
+
+    def _timestamps(self, path, meta):
+        return self._map(os.path.join(path, INDEX_FILE), np.int64, meta["rows"])
+
+    def last_timestamp(self, ticker, interval):
+        path = self._dir(ticker, interval)
+        with self._locked(path):
+            meta = self._read_meta(path)
+            if not meta or meta["rows"] == 0:
+                return None
+            return self._to_index(np.array(self._timestamps(path, meta)[-1:]), meta)[0]
+
+    def _to_index(self, values, meta):
+        index = pd.DatetimeIndex(np.asarray(values).astype("datetime64[ns]"), name=meta.get("index_name"))
+        if meta.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        return index.as_unit(meta.get("unit", "ns"))
+
+    def _to_int(self, timestamp, meta):
+        timestamp = pd.Timestamp(timestamp)
+        if meta.get("tz"):
+            timestamp = timestamp.tz_localize(meta["tz"]) if timestamp.tzinfo is None else timestamp
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        elif timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_localize(None)
+        return timestamp.as_unit("ns").value
+
+    def load(self, ticker, interval, columns=None, start=None, end=None):
+        path = self._dir(ticker, interval)
+        with self._locked(path):
+            return self._load(path, self._read_meta(path), columns, start, end)
+
+    def _load(self, path, meta, columns=None, start=None, end=None):
+        if not meta or meta["rows"] == 0:
+            return None
+
+        stamps = self._timestamps(path, meta)
+        lo = 0 if start is None else int(np.searchsorted(stamps, self._to_int(start, meta), side="left"))
+        hi = len(stamps) if end is None else int(np.searchsorted(stamps, self._to_int(end, meta), side="right"))
+
+        columns = meta["columns"] if columns is None else [c for c in columns if c in meta["dtypes"]]
+        data = {}
+        for column in columns:
+            values = self._map(self._column_file(path, column), meta["dtypes"][column], meta["rows"])
+            data[column] = np.array(values[lo:hi])
+
+        return pd.DataFrame(data, index=self._to_index(np.array(stamps[lo:hi]), meta), columns=columns)
+
+    @staticmethod
+    def _layout(df):
+        return {
+            "tz": str(df.index.tz) if df.index.tz is not None else None,
+            "index_name": df.index.name,
+            "unit": df.index.unit,
+            "columns": list(df.columns),
+            "dtypes": {c: np.dtype(df[c].dtype).str for c in df.columns},
+        }
+
+    def _relayout(self, path, meta, df):
+        # The stored bars before `df`, converted to its columns, dtypes and timezone, then `df`
+        old = self._load(path, meta)
+        index = old.index
+        if index.tz is None and df.index.tz is not None:
+            index = index.tz_localize("UTC")
+        if df.index.tz is None and index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        elif df.index.tz is not None:
+            index = index.tz_convert(df.index.tz)
+        old = old.set_axis(index.as_unit(df.index.unit)).reindex(columns=df.columns)
+        merged = pd.concat([old[old.index < df.index[0]], df])
+        for column in df.columns:
+            try:
+                merged[column] = merged[column].astype(df[column].dtype)
+            except (TypeError, ValueError):
+                # e.g. NaN for a column the old layout lacked in an integer column
+                pass
+        return merged
+
+    def write(self, ticker, interval, df):
+        """Append `df`, replacing any stored bars from its first timestamp on.
+
+        If `df` has different columns, dtypes or timezone than what is stored,
+        the stored history is converted and rewritten along with it.
+        """
+        if df is None or df.empty:
+            return
+
+        path = self._dir(ticker, interval)
+        os.makedirs(path, exist_ok=True)
+        df = df.sort_index()
+        with self._locked(path, exclusive=True):
+            self._write(path, df)
+
+    def _write(self, path, df):
+        layout = self._layout(df)
+        meta = self._read_meta(path)
+        if meta and any(meta.get(key) != layout[key] for key in LAYOUT_KEYS):
+            if meta["rows"]:
+                df = self._relayout(path, meta, df)
+                layout = self._layout(df)
+            meta = None
+
+        if meta:
+            stamps = self._timestamps(path, meta)
+            first_new = self._to_int(df.index[0], meta)
+            offset = int(np.searchsorted(stamps, first_new, side="left"))
+            del stamps
+            if offset < meta["rows"]:
+                # Commit the shorter history before its last rows are overwritten
+                meta["rows"] = offset
+                self._write_meta(path, meta)
+        else:
+            # Nothing from an old layout can be read against the new one from here on
+            meta = {"rows": 0, **layout}
+            self._write_meta(path, meta)
+            offset = 0
+
+        tz = meta["tz"]
+        index = df.index.tz_convert("UTC").tz_localize(None) if tz else df.index
+        files = [(os.path.join(path, INDEX_FILE), index.as_unit("ns").asi8.astype(np.int64))]
+        for column in df.columns:
+            values = df[column].to_numpy(dtype=meta["dtypes"][column])
+            files.append((self._column_file(path, column), values))
+
+        for filename, values in files:
+            mode = "r+b" if os.path.exists(filename) and offset > 0 else "wb"
+            with open(filename, mode) as f:
+                f.seek(offset * values.itemsize)
+                f.write(values.tobytes())
+                f.truncate()
+
+        meta["rows"] = offset + len(df)
+        self._write_meta(path, meta)
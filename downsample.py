@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Roughly what a browser can draw smoothly per trace
+DEFAULT_MAX_POINTS = 2000
+
+
+def bucket_size(n_bars, max_points=DEFAULT_MAX_POINTS):
+    """Bars per displayed candle so that `n_bars` fit in `max_points`."""
+    if max_points <= 0 or n_bars <= max_points:
+        return 1
+    return math.ceil(n_bars / max_points)
+
+
+def aggregate_ohlcv(df, bucket):
+    """Merge every `bucket` consecutive bars into one candle (first/max/min/last/sum).
+
+    Each candle is stamped with its last bar, the one whose close it shows,
+    so overlays sampled at the same timestamps line up with it.
+    """
+    if bucket <= 1 or df.empty:
+        return df
+
+    n = len(df)
+    starts = np.arange(0, n, bucket)
+    ends = np.minimum(starts + bucket, n) - 1
+
+    data = {
+        "Open": df["Open"].to_numpy()[starts],
+        "High": np.maximum.reduceat(df["High"].to_numpy(), starts),
+        "Low": np.minimum.reduceat(df["Low"].to_numpy(), starts),
+        "Close": df["Close"].to_numpy()[ends],
+    }
+    if "Volume" in df.columns:
+        data["Volume"] = np.add.reduceat(df["Volume"].to_numpy(), starts)
+
+    return pd.DataFrame(data, index=df.index[ends])
+
+
+def lttb_indices(y, threshold):
+    """Largest-Triangle-Three-Buckets style point selection.
+
+    Returns positions into `y`; the selected values are original samples, so
+    nothing is interpolated and NaN samples are never selected. The triangle's
+    left vertex is the previous bucket's mean instead of the previously chosen
+    point, which drops LTTB's sequential dependency and lets every bucket be
+    scored in one vectorized pass.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+
+    v = y[valid]
+    inner = v[1:-1]
+
+    # Equal-width buckets between the fixed first and last points, NaN padded
+    width = math.ceil(len(inner) / (threshold - 2))
+    n_buckets = math.ceil(len(inner) / width)
+    padded = np.full(n_buckets * width, np.nan)
+    padded[:len(inner)] = inner
+    buckets = padded.reshape(n_buckets, width)
+
+    x = (np.arange(n_buckets * width, dtype=float) + 1).reshape(n_buckets, width)
+    x[np.isnan(buckets)] = np.nan
+    mean_x, mean_y = np.nanmean(x, axis=1), np.nanmean(buckets, axis=1)
+
+    left_x = np.concatenate([[0.0], mean_x[:-1]])
+    left_y = np.concatenate([[v[0]], mean_y[:-1]])
+    right_x = np.concatenate([mean_x[1:], [n - 1.0]])
+    right_y = np.concatenate([mean_y[1:], [v[-1]]])
+
+    area = np.abs(
+        (left_x[:, None] - right_x[:, None]) * (buckets - left_y[:, None])
+        - (left_x[:, None] - x) * (right_y[:, None] - left_y[:, None])
+    )
+    area[np.isnan(area)] = -1.0
+    picks = np.argmax(area, axis=1) + np.arange(n_buckets) * width + 1
+
+    return valid[np.concatenate([[0], picks, [n - 1]])]
+
+
+def lttb_series(series, max_points=DEFAULT_MAX_POINTS):
+    if len(series) <= max_points:
+        return series
+    return series.iloc[lttb_indices(series.to_numpy(dtype=float), max_points)]
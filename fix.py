@@ -1,22 +1,49 @@
 import pandas as pd
 import numpy as np
 
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+# Object columns of these inferred kinds hold plain scalars, so pd.to_numeric
+# can take them directly without unwrapping element by element
+_SCALAR_KINDS = {"floating", "integer", "mixed-integer-float", "decimal", "boolean", "empty"}
+
+
+def _unwrap(series):
+    if pd.api.types.infer_dtype(series, skipna=True) in _SCALAR_KINDS:
+        return series
+
+    # `type` is a builtin, so mapping it is far cheaper than a Python lambda per
+    # cell; only the cells that really hold a container get unwrapped
+    types = series.map(type)
+    wrapped_types = [t for t in types.unique() if issubclass(t, (list, tuple, np.ndarray))]
+    if not wrapped_types:
+        return series
+
+    wrapped = types.isin(wrapped_types).to_numpy()
+    series = series.copy()
+    series[wrapped] = series[wrapped].str[0]
+    return series
+
+
 def fix_ohlc(df):
     if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
+        # Relabels in place; the column data is not copied
+        df.columns = df.columns.get_level_values(0).rename(None)
 
-    for col in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
+    for col in OHLCV_COLUMNS:
         if col in df.columns:
             series = df[col]
 
             if isinstance(series, pd.DataFrame):
                 series = series.iloc[:, 0]
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                # Common case: yfinance already returns float64/int64 columns
+                continue
 
-            series = series.apply(
-                lambda x: x[0] if isinstance(x, (list, tuple, np.ndarray)) else x
-            )
+            df[col] = pd.to_numeric(_unwrap(series), errors="coerce")
 
-            df[col] = pd.to_numeric(series, errors="coerce")
+    if not df.isna().to_numpy().any():
+        return df
 
     df = df.dropna()
     return df
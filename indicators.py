@@ -0,0 +1,267 @@
+import numpy as np
+
+import kernels
+from bar_store import BAR_COLUMNS, DEFAULT_CAPACITY, BarStore, index_ns
+from kernels import ATR_WINDOW, RSI_WINDOW
+
+# Longest rolling window used below (SMA200); new bars only need this much history
+ROLLING_LOOKBACK = 200
+
+
+def add_rolling_indicators(df):
+    import ta
+
+    df["SMA200"] = ta.trend.sma_indicator(df["Close"], window=200)
+
+    # Bollinger Bands
+    bollinger = ta.volatility.BollingerBands(df["Close"], window=20, window_dev=2)
+    df["BB_High"] = bollinger.bollinger_hband()
+    df["BB_Low"] = bollinger.bollinger_lband()
+    df["BB_Mid"] = bollinger.bollinger_mavg()
+
+    # Stochastic
+    stoch = ta.momentum.StochasticOscillator(df["High"], df["Low"], df["Close"])
+    df["Stoch_K"] = stoch.stoch()
+    df["Stoch_D"] = stoch.stoch_signal()
+
+    # Volume indicators
+    df["Volume_SMA"] = df["Volume"].rolling(window=20).mean()
+    return df
+
+
+def rolling_arrays(high, low, close, volume):
+    """The `add_rolling_indicators` columns computed on plain arrays by the kernels."""
+    bb_high, bb_low, bb_mid = kernels.bollinger(close, window=20, window_dev=2)
+    stoch_k, stoch_d = kernels.stochastic(high, low, close)
+    return {
+        "SMA200": kernels.sma(close, 200),
+        "BB_High": bb_high,
+        "BB_Low": bb_low,
+        "BB_Mid": bb_mid,
+        "Stoch_K": stoch_k,
+        "Stoch_D": stoch_d,
+        "Volume_SMA": kernels.sma(volume, 20),
+    }
+
+
+def add_recursive_indicators(df):
+    close = df["Close"].to_numpy(dtype=float)
+
+    # Compiled kernels when numba is available. Without it the fallback is
+    # ta/pandas, not the NumPy kernels: pandas' ewm loops in C, the kernels'
+    # NumPy loop runs once per bar in Python. Numbers are identical either way.
+    if kernels.BACKEND == "numba":
+        # Moving Averages
+        df["EMA20"] = kernels.ema(close, 20)
+        df["EMA50"] = kernels.ema(close, 50)
+
+        # RSI
+        df["RSI"] = kernels.rsi(close, RSI_WINDOW)
+
+        # MACD
+        df["EMA12"] = kernels.ewm_span(close, 12)
+        df["EMA26"] = kernels.ewm_span(close, 26)
+        df["MACD"] = df["EMA12"] - df["EMA26"]
+        df["MACD_Signal"] = kernels.ewm_span(df["MACD"].to_numpy(), 9)
+    else:
+        import ta
+
+        # Moving Averages
+        df["EMA20"] = ta.trend.ema_indicator(df["Close"], window=20)
+        df["EMA50"] = ta.trend.ema_indicator(df["Close"], window=50)
+
+        # RSI
+        df["RSI"] = ta.momentum.rsi(df["Close"], window=RSI_WINDOW)
+
+        # MACD
+        df["EMA12"] = df["Close"].ewm(span=12).mean()
+        df["EMA26"] = df["Close"].ewm(span=26).mean()
+        df["MACD"] = df["EMA12"] - df["EMA26"]
+        df["MACD_Signal"] = df["MACD"].ewm(span=9).mean()
+    df["MACD_Hist"] = df["MACD"] - df["MACD_Signal"]
+
+    # ATR (Average True Range); ta's version is a per-bar .iloc loop
+    df["ATR"] = kernels.atr(df["High"].to_numpy(dtype=float), df["Low"].to_numpy(dtype=float), close, ATR_WINDOW)
+    return df
+
+
+def add_indicators(df):
+    df = add_recursive_indicators(df)
+    df = add_rolling_indicators(df)
+    return df
+
+
+INDICATOR_COLUMNS = [
+    "EMA20", "EMA50", "SMA200", "BB_High", "BB_Low", "BB_Mid", "RSI",
+    "EMA12", "EMA26", "MACD", "MACD_Signal", "MACD_Hist",
+    "Stoch_K", "Stoch_D", "ATR", "Volume_SMA",
+]
+
+
+def _ewm_step(weighted, old_wt, cur, alpha, adjust):
+    # One step of pandas' ewm recurrence (ignore_na=False, no NaN input)
+    old_wt *= 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    if weighted != cur:
+        weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+    old_wt = old_wt + new_wt if adjust else 1.0
+    return weighted, old_wt
+
+
+def _adjusted_weight(alpha, position):
+    # Accumulated weight of an adjust=True ewm after `position + 1` observations
+    return (1.0 - (1.0 - alpha) ** (position + 1)) / alpha
+
+
+def _span_alpha(span):
+    return 2.0 / (span + 1.0)
+
+
+class IndicatorState:
+    """Keeps the running EMA/Wilder accumulators for one (ticker, interval).
+
+    `update` takes the latest OHLCV frame; when it only extends (or revises the
+    last bar of) the frame seen before, only the new bars are processed. Bars
+    and indicators are kept in a `BarStore`, and the returned frame is a
+    read-only view of it; `copy_on_write` keeps frames already handed out
+    unchanged when the open bar is revised. The result always covers the
+    whole input: a full recompute sizes the store to the frame (at least
+    `capacity` bars, with room to grow), and an input that would no longer
+    fit, or starts on a different bar than the stored ones, is recomputed in
+    full.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, copy_on_write=False):
+        self.min_capacity = capacity
+        self.store = BarStore(BAR_COLUMNS + INDICATOR_COLUMNS, capacity, copy_on_write=copy_on_write)
+        self._carry = None
+
+    @property
+    def frame(self):
+        # The bars of the last input, with their indicators
+        return self.store.frame() if len(self.store) else None
+
+    def update(self, df):
+        start = self._resume_position(df)
+        if start is None:
+            frame = add_indicators(df[BAR_COLUMNS].copy())
+            self._carry = self._carry_from_frame(frame)
+            self._fit(len(frame))
+            self.store.clear()
+            self.store.tz = frame.index.tz
+            self.store.replace_frame(frame)
+            return self.store.frame()
+        self._extend(df, start)
+        return self.store.frame()
+
+    def _fit(self, rows):
+        # Room for `rows` plus a quarter more to append into; shrink once it is mostly unused
+        capacity = max(rows + rows // 4, self.min_capacity)
+        if rows > self.store.capacity or self.store.capacity > 2 * capacity:
+            self.store = BarStore(self.store.columns, capacity, copy_on_write=self.store.copy_on_write)
+
+    def _resume_position(self, df):
+        store = self.store
+        if self._carry is None or len(store) < 2 or df.index.tz != store.tz or len(df) > store.capacity:
+            return None
+
+        # The last stored bar may still have been forming, so resume from it. The
+        # EWM and Wilder accumulators depend on every bar since the first, so
+        # the input must start on the first stored bar; a window that moved on
+        # is recomputed in full
+        times = store.times
+        anchor = len(store) - 2
+        if anchor < ROLLING_LOOKBACK or anchor >= len(df):
+            return None
+        if list(index_ns(df.index[[0, anchor]])) != [times[0], times[-2]]:
+            return None
+        if df["Close"].iloc[anchor] != store.column("Close")[-2]:
+            return None
+        return anchor + 1
+
+    def _carry_from_frame(self, frame):
+        anchor = len(frame) - 2
+        if anchor < ROLLING_LOOKBACK:
+            return None
+
+        close = frame["Close"]
+        diff = close.diff(1)
+        alpha = 1.0 / RSI_WINDOW
+        up = diff.where(diff > 0, 0.0).iloc[: anchor + 1]
+        down = -diff.where(diff < 0, 0.0).iloc[: anchor + 1]
+
+        return {
+            "close": close.iloc[anchor],
+            "ema20": frame["EMA20"].iloc[anchor],
+            "ema50": frame["EMA50"].iloc[anchor],
+            "rsi_up": up.ewm(alpha=alpha, adjust=False).mean().iloc[-1],
+            "rsi_down": down.ewm(alpha=alpha, adjust=False).mean().iloc[-1],
+            "ema12": (frame["EMA12"].iloc[anchor], _adjusted_weight(_span_alpha(12), anchor)),
+            "ema26": (frame["EMA26"].iloc[anchor], _adjusted_weight(_span_alpha(26), anchor)),
+            "macd_signal": (frame["MACD_Signal"].iloc[anchor], _adjusted_weight(_span_alpha(9), anchor)),
+            "atr": frame["ATR"].iloc[anchor],
+        }
+
+    def _extend(self, df, start):
+        # Works on plain arrays and writes rows straight into the store; no
+        # DataFrame columns are built for the new bars
+        bars = {name: df[name].to_numpy(dtype=float) for name in BAR_COLUMNS}
+        close, high, low = (bars[name][start:] for name in ("Close", "High", "Low"))
+        n = len(close)
+
+        carry = dict(self._carry)
+        cols = {name: np.empty(n) for name in (
+            "EMA20", "EMA50", "RSI", "EMA12", "EMA26", "MACD", "MACD_Signal", "ATR",
+        )}
+
+        for i in range(n):
+            prev_close = carry["close"]
+            cur = close[i]
+
+            carry["ema20"], _ = _ewm_step(carry["ema20"], 1.0, cur, _span_alpha(20), False)
+            carry["ema50"], _ = _ewm_step(carry["ema50"], 1.0, cur, _span_alpha(50), False)
+
+            # Wilder smoothing of gains/losses, as in ta.momentum.rsi
+            change = cur - prev_close
+            carry["rsi_up"], _ = _ewm_step(carry["rsi_up"], 1.0, max(change, 0.0), 1.0 / RSI_WINDOW, False)
+            carry["rsi_down"], _ = _ewm_step(carry["rsi_down"], 1.0, max(-change, 0.0), 1.0 / RSI_WINDOW, False)
+            if carry["rsi_down"] == 0:
+                rsi = 100.0
+            else:
+                rsi = 100 - 100 / (1 + carry["rsi_up"] / carry["rsi_down"])
+
+            carry["ema12"] = _ewm_step(*carry["ema12"], cur, _span_alpha(12), True)
+            carry["ema26"] = _ewm_step(*carry["ema26"], cur, _span_alpha(26), True)
+            macd = carry["ema12"][0] - carry["ema26"][0]
+            carry["macd_signal"] = _ewm_step(*carry["macd_signal"], macd, _span_alpha(9), True)
+
+            true_range = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+            carry["atr"] = (carry["atr"] * (ATR_WINDOW - 1) + true_range) / float(ATR_WINDOW)
+            carry["close"] = cur
+
+            cols["EMA20"][i] = carry["ema20"]
+            cols["EMA50"][i] = carry["ema50"]
+            cols["RSI"][i] = rsi
+            cols["EMA12"][i] = carry["ema12"][0]
+            cols["EMA26"][i] = carry["ema26"][0]
+            cols["MACD"][i] = macd
+            cols["MACD_Signal"][i] = carry["macd_signal"][0]
+            cols["ATR"][i] = carry["atr"]
+
+            # Remember the accumulators at the new last closed bar
+            if i == n - 2:
+                self._carry = dict(carry)
+
+        cols["MACD_Hist"] = cols["MACD"] - cols["MACD_Signal"]
+
+        # Rolling indicators only need the trailing window of history
+        tail = slice(max(0, start - ROLLING_LOOKBACK), None)
+        rolling = rolling_arrays(*(bars[name][tail] for name in ("High", "Low", "Close", "Volume")))
+        for name, values in rolling.items():
+            cols[name] = values[-n:]
+        for name in BAR_COLUMNS:
+            cols[name] = bars[name][start:]
+
+        # With a single (revised) bar the carry stays at the previous anchor
+        rows = np.column_stack([cols[name] for name in self.store.columns])
+        self.store.replace(index_ns(df.index[start:]), rows)
@@ -0,0 +1,311 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Kernels take (bars x tickers) float arrays and return arrays of the same
+# shape; 1-D input is treated as a single ticker and comes back 1-D. Each
+# column may start with NaN padding (a ticker with a shorter history) and
+# gives the same numbers as the matching `ta` / pandas call on that ticker
+# alone.
+
+RSI_WINDOW = 14
+ATR_WINDOW = 14
+
+# The EWM and ATR recursions run compiled when numba is installed, otherwise
+# as NumPy loops over bars (vectorized across tickers). Both backends do the
+# same float operations in the same order as pandas/ta, so results are
+# bit-identical either way. Set to "numpy" to force the fallback.
+#
+# The NumPy EWM loop pays Python overhead per bar, so it only suits many
+# tickers at once (the scanner). Without numba, the dashboard's single series
+# go through ta/pandas instead (see indicators.add_recursive_indicators);
+# only ATR, whose single-series loop is plain float arithmetic, always uses
+# these kernels.
+BACKEND = "numba" if numba is not None else "numpy"
+
+# Upper bound on temporary elements materialized by the windowed reductions
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=float)
+    return (x[:, None], True) if x.ndim == 1 else (x, False)
+
+
+def _result(out, squeeze):
+    return out[:, 0] if squeeze else out
+
+
+def _span_alpha(span):
+    # Same float path as pandas: span -> center of mass -> alpha
+    return 1.0 / (1.0 + (span - 1.0) / 2.0)
+
+
+def _wilder_alpha(window):
+    alpha = 1.0 / window
+    return 1.0 / (1.0 + (1.0 - alpha) / alpha)
+
+
+def _ewm_numpy(x, alpha, adjust, minp):
+    n, k = x.shape
+    out = np.empty_like(x)
+    decay = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    weighted = np.full(k, np.nan)
+    old_wt = np.ones(k)
+    nobs = np.zeros(k, dtype=np.int64)
+
+    with np.errstate(invalid="ignore"):
+        for i in range(n):
+            cur = x[i]
+            obs = cur == cur
+            nobs += obs
+            started = weighted == weighted
+
+            # Like pandas (ignore_na=False), weights keep decaying across missing bars
+            old_wt = np.where(started, old_wt * decay, old_wt)
+            update = started & obs
+            blended = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+            weighted = np.where(update & (weighted != cur), blended, weighted)
+            if adjust:
+                old_wt = np.where(update, old_wt + new_wt, old_wt)
+            else:
+                old_wt = np.where(update, 1.0, old_wt)
+            weighted = np.where(~started & obs, cur, weighted)
+
+            out[i] = np.where(nobs >= minp, weighted, np.nan)
+    return out
+
+
+def _wilder_numpy(tr, rows, seed, window, out):
+    if tr.shape[1] == 1:
+        # A single long series is faster as plain float arithmetic than as 1-element arrays
+        start, current = int(rows[0]), float(seed[0])
+        values = tr[:, 0].tolist()
+        smoothed = [current]
+        for i in range(start + 1, len(values)):
+            current = (current * (window - 1) + values[i]) / float(window)
+            smoothed.append(current)
+        out[start:, 0] = smoothed
+        return out
+
+    current = np.zeros(tr.shape[1])
+    for i in range(int(rows.min()), len(tr)):
+        smoothed = (current * (window - 1) + tr[i]) / float(window)
+        current = np.where(rows == i, seed, np.where(rows < i, smoothed, 0.0))
+        out[i] = current
+    return out
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _ewm_numba(x, alpha, adjust, minp):
+        n, k = x.shape
+        out = np.empty_like(x)
+        decay = 1.0 - alpha
+        new_wt = 1.0 if adjust else alpha
+        for j in range(k):
+            weighted = np.nan
+            old_wt = 1.0
+            nobs = 0
+            for i in range(n):
+                cur = x[i, j]
+                obs = cur == cur
+                nobs += obs
+                if weighted == weighted:
+                    old_wt *= decay
+                    if obs:
+                        if weighted != cur:
+                            weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                        if adjust:
+                            old_wt += new_wt
+                        else:
+                            old_wt = 1.0
+                elif obs:
+                    weighted = cur
+                out[i, j] = weighted if nobs >= minp else np.nan
+        return out
+
+    @numba.njit(cache=True)
+    def _wilder_numba(tr, rows, seed, window, out):
+        n, k = tr.shape
+        for j in range(k):
+            current = seed[j]
+            out[rows[j], j] = current
+            for i in range(rows[j] + 1, n):
+                current = (current * (window - 1) + tr[i, j]) / float(window)
+                out[i, j] = current
+        return out
+
+
+def ewm_mean(x, alpha, adjust=False, min_periods=0):
+    """Column-wise ``Series.ewm(alpha=..., adjust=..., min_periods=...).mean()``."""
+    x, squeeze = _as_2d(x)
+    recursion = _ewm_numba if BACKEND == "numba" else _ewm_numpy
+    return _result(recursion(x, alpha, adjust, max(min_periods, 1)), squeeze)
+
+
+def ema(x, window):
+    """``ta.trend.ema_indicator``"""
+    return ewm_mean(x, _span_alpha(window), adjust=False, min_periods=window)
+
+
+def ewm_span(x, span):
+    """``Series.ewm(span=span).mean()`` (adjusted, as used for MACD)."""
+    return ewm_mean(x, _span_alpha(span), adjust=True)
+
+
+def sma(x, window):
+    """``Series.rolling(window).mean()`` / ``ta.trend.sma_indicator``"""
+    x, squeeze = _as_2d(x)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        valid = ~np.isnan(x)
+        sums = np.cumsum(np.where(valid, x, 0.0), axis=0)
+        counts = np.cumsum(valid, axis=0)
+        sums = np.vstack([np.zeros((1, x.shape[1])), sums])
+        counts = np.vstack([np.zeros((1, x.shape[1]), dtype=counts.dtype), counts])
+
+        full = (counts[window:] - counts[:-window]) == window
+        out[window - 1:] = np.where(full, (sums[window:] - sums[:-window]) / window, np.nan)
+    return _result(out, squeeze)
+
+
+def _rolling_reduce(x, window, reduce):
+    x, squeeze = _as_2d(x)
+    out = np.full_like(x, np.nan)
+    n, k = x.shape
+    if n >= window:
+        windows = sliding_window_view(x, window, axis=0)
+        block = max(1, _BLOCK_ELEMENTS // (k * window))
+        for start in range(0, len(windows), block):
+            stop = start + block
+            # NaN anywhere in the window propagates, matching min_periods=window
+            out[window - 1 + start:window - 1 + stop] = reduce(windows[start:stop])
+    return _result(out, squeeze)
+
+
+def rolling_min(x, window):
+    return _rolling_reduce(x, window, lambda w: w.min(axis=-1))
+
+
+def rolling_max(x, window):
+    return _rolling_reduce(x, window, lambda w: w.max(axis=-1))
+
+
+def rolling_std(x, window, ddof=0):
+    """``Series.rolling(window).std(ddof=ddof)``, two-pass per window for accuracy."""
+    def reduce(w):
+        centered = w - w.mean(axis=-1, keepdims=True)
+        return np.sqrt((centered * centered).sum(axis=-1) / (window - ddof))
+    return _rolling_reduce(x, window, reduce)
+
+
+def bollinger(close, window=20, window_dev=2):
+    """``ta.volatility.BollingerBands`` -> (high band, low band, middle band)."""
+    mid = sma(close, window)
+    std = rolling_std(close, window, ddof=0)
+    return mid + window_dev * std, mid - window_dev * std, mid
+
+
+def rsi(close, window=14):
+    """``ta.momentum.rsi`` (Wilder smoothing)."""
+    close, squeeze = _as_2d(close)
+    diff = np.full_like(close, np.nan)
+    diff[1:] = close[1:] - close[:-1]
+
+    # ta turns the undefined first diff into a 0 move; padding before a
+    # ticker's first bar must stay missing instead
+    missing = np.isnan(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    up[missing] = np.nan
+    down[missing] = np.nan
+
+    alpha = _wilder_alpha(window)
+    ema_up = ewm_mean(up, alpha, adjust=False, min_periods=window)
+    ema_down = ewm_mean(down, alpha, adjust=False, min_periods=window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+    return _result(out, squeeze)
+
+
+def true_range(high, low, close):
+    high, squeeze = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    prev_close = np.full_like(close, np.nan)
+    prev_close[1:] = close[:-1]
+
+    # fmax skips NaN like DataFrame.max(axis=1): the first bar is just high - low
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return _result(tr, squeeze)
+
+
+def first_valid(x):
+    """Row of each column's first non-NaN value (``len(x)`` when there is none)."""
+    x, squeeze = _as_2d(x)
+    valid = ~np.isnan(x)
+    rows = np.where(valid.any(axis=0), valid.argmax(axis=0), len(x))
+    return rows[0] if squeeze else rows
+
+
+def atr(high, low, close, window=14):
+    """``ta.volatility.average_true_range``: zeros until the first full window, then Wilder smoothing."""
+    tr, squeeze = _as_2d(true_range(high, low, close))
+    n = len(tr)
+    out = np.zeros_like(tr)
+
+    seed_row = first_valid(tr) + window - 1
+    cols = np.flatnonzero(seed_row < n)
+    if len(cols):
+        tr, rows = np.ascontiguousarray(tr[:, cols]), seed_row[cols]
+        # Mean of each ticker's first `window` true ranges, summed like Series.mean
+        first = tr[rows[:, None] - np.arange(window - 1, -1, -1), np.arange(len(cols))[:, None]]
+        seed = first.mean(axis=1)
+
+        smooth = _wilder_numba if BACKEND == "numba" else _wilder_numpy
+        out[:, cols] = smooth(tr, rows, seed, window, np.zeros_like(tr))
+    return _result(out, squeeze)
+
+
+def stochastic(high, low, close, window=14, smooth_window=3):
+    """``ta.momentum.StochasticOscillator`` -> (%K, %D)."""
+    close, squeeze = _as_2d(close)
+    lowest = rolling_min(_as_2d(low)[0], window)
+    highest = rolling_max(_as_2d(high)[0], window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (close - lowest) / (highest - lowest)
+    return _result(k, squeeze), _result(sma(k, smooth_window), squeeze)
+
+
+def indicator_arrays(high, low, close, volume):
+    """Every column ``indicators.add_indicators`` produces, for all tickers at once."""
+    bb_high, bb_low, bb_mid = bollinger(close, window=20, window_dev=2)
+    stoch_k, stoch_d = stochastic(high, low, close)
+    ema12, ema26 = ewm_span(close, 12), ewm_span(close, 26)
+    macd = ema12 - ema26
+    macd_signal = ewm_span(macd, 9)
+
+    return {
+        "EMA20": ema(close, 20),
+        "EMA50": ema(close, 50),
+        "SMA200": sma(close, 200),
+        "BB_High": bb_high,
+        "BB_Low": bb_low,
+        "BB_Mid": bb_mid,
+        "RSI": rsi(close, RSI_WINDOW),
+        "EMA12": ema12,
+        "EMA26": ema26,
+        "MACD": macd,
+        "MACD_Signal": macd_signal,
+        "MACD_Hist": macd - macd_signal,
+        "Stoch_K": stoch_k,
+        "Stoch_D": stoch_d,
+        "ATR": atr(high, low, close, ATR_WINDOW),
+        "Volume_SMA": sma(volume, 20),
+    }
@@ -0,0 +1,299 @@
+import hashlib
+import itertools
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import CancelledError
+
+from pipeline import frame_version
+from pools import spawn_pool
+from profiling import span
+
+MODEL_SUFFIX = ".pkl"
+
+# Training saturates the CPU (TensorFlow, Prophet) on its own, so jobs run one at a time
+TRAIN_WORKERS = 1
+
+# Trained models kept unpickled in memory, and versions kept on disk per (ticker, interval)
+MAX_WARM = 4
+KEEP_VERSIONS = 3
+
+# Prediction results kept per (model, data version, horizon)
+MAX_RESULTS = 64
+
+# A model trained on one data version of (ticker, interval)
+ModelKey = namedtuple("ModelKey", "ticker interval version")
+
+# Served predictions; `stale` when newer bars arrived after the model was trained
+Prediction = namedtuple("Prediction", "results key trained_at stale")
+
+
+def _safe_name(value):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+def ensemble_predictor():
+    # Imported in the training worker, so the parent only loads the ML stack to run a model
+    from ml_predictor import EnsemblePredictor
+
+    return EnsemblePredictor()
+
+
+def data_version(frame):
+    """Short, stable id of the bars in `frame`; changes when a bar is appended or revised."""
+    return hashlib.sha1(repr(frame_version(frame)).encode()).hexdigest()[:12]
+
+
+def _train(factory, frame, days_ahead, path):
+    # Runs in a worker process: fit, then save the fitted predictor next to the others.
+    # The predictions from the training pass come back so they can be served right away
+    model = factory()
+    results = model.predict_all(frame, days_ahead=days_ahead, train_models=True)
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        saved = True
+    except (pickle.PicklingError, TypeError, AttributeError, OSError):
+        # Not picklable (or no disk): the results are still cached, the model just isn't reused
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        saved = False
+    return results, saved
+
+
+class Job:
+    """One background training run."""
+
+    def __init__(self, job_id, key, days_ahead, future):
+        self.id = job_id
+        self.key = key
+        self.days_ahead = days_ahead
+        self.future = future
+        self.submitted = time.time()
+        self.finished = None
+        self.saved = None
+        self.error = None
+
+    @property
+    def state(self):
+        # Finished only once the registry has stored the results, not just when the worker returns
+        if self.finished is None:
+            return "running" if self.future.running() or self.future.done() else "queued"
+        return "failed" if self.error is not None else "done"
+
+    @property
+    def pending(self):
+        return self.finished is None
+
+    def status(self):
+        end = self.finished if self.finished is not None else time.time()
+        return {"id": self.id, **self.key._asdict(), "days_ahead": self.days_ahead, "state": self.state,
+                "submitted": self.submitted, "finished": self.finished, "seconds": end - self.submitted,
+                "saved": self.saved, "error": self.error}
+
+
+class ModelRegistry:
+    """Trained predictors per (ticker, interval, data version), shared by every session.
+
+    Models are trained by `factory()` in a background process pool and
+    pickled under `root`, so they survive restarts and are trained once for
+    all users. Inference runs on a warm (already unpickled) model; results
+    are cached per (model, data version, horizon), so a rerun that asks for
+    the same forecast is a dictionary lookup. With no model for the current
+    bars the newest one for (ticker, interval) is served, marked stale.
+    """
+
+    def __init__(self, root, factory=ensemble_predictor, workers=TRAIN_WORKERS, max_warm=MAX_WARM,
+                 keep_versions=KEEP_VERSIONS, max_results=MAX_RESULTS):
+        self.root = root
+        self.factory = factory
+        self.workers = workers
+        self.max_warm = max_warm
+        self.keep_versions = keep_versions
+        self.max_results = max_results
+        self._pool = None
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._latest_job = {}
+        self._trained = {}
+        self._warm = OrderedDict()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        # Predictors aren't assumed to be thread-safe
+        self._predict_lock = threading.Lock()
+
+    def _dir(self, ticker, interval):
+        return os.path.join(self.root, _safe_name(ticker), _safe_name(interval))
+
+    def _path(self, key):
+        return os.path.join(self._dir(key.ticker, key.interval), key.version + MODEL_SUFFIX)
+
+    def key(self, ticker, interval, frame):
+        return ModelKey(ticker, interval, data_version(frame))
+
+    def _versions(self, ticker, interval):
+        """{version: trained_at} of the models for (ticker, interval), oldest first."""
+        pair = (ticker, interval)
+        versions = self._trained.get(pair)
+        if versions is None:
+            found = []
+            try:
+                with os.scandir(self._dir(ticker, interval)) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(MODEL_SUFFIX):
+                            found.append((entry.stat().st_mtime, entry.name[:-len(MODEL_SUFFIX)]))
+            except OSError:
+                pass
+            versions = self._trained[pair] = OrderedDict((v, t) for t, v in sorted(found))
+        return versions
+
+    def latest(self, ticker, interval):
+        """Key of the newest model for (ticker, interval), or None if none was trained."""
+        with self._lock:
+            versions = self._versions(ticker, interval)
+            return ModelKey(ticker, interval, next(reversed(versions))) if versions else None
+
+    def trained_at(self, key):
+        with self._lock:
+            return self._versions(key.ticker, key.interval).get(key.version)
+
+    def _pool_executor(self):
+        if self._pool is None:
+            # Spawned, not forked: a fork would copy the server's threads' locks and any loaded ML state
+            self._pool = spawn_pool(self.workers)
+        return self._pool
+
+    def train(self, ticker, interval, frame, days_ahead, force=False):
+        """Start training on `frame` in the background and return its Job.
+
+        Returns the running job if one is already training this data version,
+        and None when a model for it exists and `force` is false.
+        """
+        key = self.key(ticker, interval, frame)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.pending:
+                return job
+            if not force and key.version in self._versions(ticker, interval):
+                return None
+            future = self._pool_executor().submit(_train, self.factory, frame, days_ahead, self._path(key))
+            job = self._jobs[key] = self._latest_job[(ticker, interval)] = Job(next(self._ids), key, days_ahead, future)
+        future.add_done_callback(lambda f: self._finish(job))
+        return job
+
+    def _finish(self, job):
+        try:
+            results, saved = job.future.result()
+        except CancelledError:
+            # Dropped by close() before it ran
+            with self._lock:
+                job.error = "cancelled"
+                job.finished = time.time()
+            return
+        except Exception as e:
+            with self._lock:
+                job.error = f"{type(e).__name__}: {e}"
+                job.finished = time.time()
+            return
+        key = job.key
+        with self._lock:
+            # A retrained model replaces the old one and everything it predicted
+            self._warm.pop(key, None)
+            for cached in [k for k in self._results if k[0] == key]:
+                del self._results[cached]
+            self._store_result((key, key.version, job.days_ahead), results)
+            # Only a saved model counts as trained: an unsaved one can't be loaded to
+            # predict other horizons, so asking again has to be able to retrain it
+            if saved:
+                versions = self._versions(key.ticker, key.interval)
+                versions.pop(key.version, None)
+                versions[key.version] = time.time()
+                self._prune(key.ticker, key.interval, versions)
+            job.saved = saved
+            job.finished = time.time()
+
+    def _prune(self, ticker, interval, versions):
+        while len(versions) > self.keep_versions:
+            version, _ = versions.popitem(last=False)
+            old = ModelKey(ticker, interval, version)
+            self._warm.pop(old, None)
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def job(self, ticker, interval):
+        """The most recent training job for (ticker, interval), or None."""
+        with self._lock:
+            return self._latest_job.get((ticker, interval))
+
+    def jobs(self):
+        """Status of every job started in this process, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted((job.status() for job in jobs), key=lambda s: -s["id"])
+
+    def _store_result(self, key, results):
+        self._results[key] = results
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def model(self, key):
+        """The trained predictor for `key`, unpickled on first use; None if it isn't on disk."""
+        with self._lock:
+            model = self._warm.get(key)
+            if model is not None:
+                self._warm.move_to_end(key)
+                return model
+        try:
+            with span("ml.load"), open(self._path(key), "rb") as f:
+                model = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        with self._lock:
+            self._warm[key] = model
+            while len(self._warm) > self.max_warm:
+                self._warm.popitem(last=False)
+        return model
+
+    def predict(self, ticker, interval, frame, days_ahead):
+        """Forecast for `frame` from the model of its data version, else the newest one; None without a model."""
+        current = self.key(ticker, interval, frame)
+        with self._lock:
+            # What the training pass predicted, even if its model couldn't be saved
+            results = self._results.get((current, current.version, days_ahead))
+            job = self._jobs.get(current)
+            if results is not None:
+                self._results.move_to_end((current, current.version, days_ahead))
+                return Prediction(results, current, job.finished if job is not None else
+                                  self._versions(ticker, interval).get(current.version), False)
+            known = current.version in self._versions(ticker, interval)
+        key = current if known else self.latest(ticker, interval)
+        if key is None:
+            return None
+        cache_key = (key, current.version, days_ahead)
+        with self._lock:
+            results = self._results.get(cache_key)
+            if results is not None:
+                self._results.move_to_end(cache_key)
+        if results is None:
+            model = self.model(key)
+            if model is None:
+                return None
+            with span("ml.predict", rows=len(frame)), self._predict_lock:
+                results = model.predict_all(frame, days_ahead=days_ahead, train_models=False)
+            with self._lock:
+                self._store_result(cache_key, results)
+        return Prediction(results, key, self.trained_at(key), key != current)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
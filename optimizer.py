@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_PARAMS, evaluate, valid_params
+from pools import spawn_pool
+
+PARAM_COLUMNS = list(DEFAULT_PARAMS)
+
+# Settings per task sent to a worker; big enough to amortize the round trip,
+# small enough that results stream back steadily
+CHUNK_SIZE = 256
+
+# Ranges sampled by random search
+SEARCH_SPACE = {
+    "ema_fast": range(5, 41),
+    "ema_slow": range(30, 201, 5),
+    "rsi_window": range(5, 29),
+    "rsi_low": range(15, 41),
+    "rsi_high": range(60, 86),
+    "macd_fast": range(6, 19),
+    "macd_slow": range(20, 41),
+    "macd_signal": range(5, 13),
+}
+
+
+def random_params(n, space=SEARCH_SPACE, seed=None):
+    """Up to `n` distinct valid settings drawn uniformly from `space`."""
+    rng = np.random.default_rng(seed)
+    space = {**{k: (v,) for k, v in DEFAULT_PARAMS.items()}, **space}
+    draws = pd.DataFrame({k: rng.choice(np.asarray(v), size=n * 2) for k, v in space.items()})
+    return valid_params(draws.drop_duplicates()).head(n)
+
+
+class ResultCache:
+    """Sweep metrics keyed by (context, parameter set), least recently used evicted first.
+
+    The context is whatever identifies the input series and the cost model,
+    e.g. (ticker, interval, last bar, slippage, brokerage, shorts).
+    """
+
+    def __init__(self, max_entries=200_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def split(self, context, params):
+        """(cached rows with their metrics, params still to evaluate)"""
+        keys = [(context, row) for row in params[PARAM_COLUMNS].itertuples(index=False, name=None)]
+        with self._lock:
+            found = [self._entries.get(key) for key in keys]
+            for key, metrics in zip(keys, found):
+                if metrics is not None:
+                    self._entries.move_to_end(key)
+            hit = np.array([metrics is not None for metrics in found], dtype=bool)
+            self.hits += int(hit.sum())
+            self.misses += int((~hit).sum())
+
+        cached = params[hit].reset_index(drop=True)
+        if len(cached):
+            metrics = pd.DataFrame([m for m in found if m is not None])
+            cached = pd.concat([cached, metrics], axis=1)
+        return cached, params[~hit].reset_index(drop=True)
+
+    def store(self, context, table):
+        rows = table.drop(columns=PARAM_COLUMNS).to_dict("records")
+        keys = table[PARAM_COLUMNS].itertuples(index=False, name=None)
+        with self._lock:
+            for row, metrics in zip(keys, rows):
+                self._entries[(context, row)] = metrics
+                self._entries.move_to_end((context, row))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Worker-side state, set once per process by _attach
+_close = None
+_shm = None
+_indicator_cache = {}
+
+
+def _attach(name, length):
+    global _close, _shm, _indicator_cache
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not make them owners; the parent unlinks the block when the run ends
+    _shm = shared_memory.SharedMemory(name=name)
+    _close = np.ndarray((length,), dtype=np.float64, buffer=_shm.buf)
+    _indicator_cache = {}
+
+
+def _evaluate_chunk(params, costs):
+    return params, evaluate(_close, params, _indicator_cache, **costs)
+
+
+def _chunks(params, chunk_size):
+    # Neighbouring settings share EMA/RSI/MACD series, which each worker caches
+    params = params.sort_values(PARAM_COLUMNS).reset_index(drop=True)
+    return [params.iloc[i:i + chunk_size] for i in range(0, len(params), chunk_size)]
+
+
+def optimize(close, params, context=None, cache=None, workers=1, chunk_size=CHUNK_SIZE, **costs):
+    """Backtest every row of `params` on `close`, yielding ``params + metrics`` frames as they finish.
+
+    Rows already in `cache` for `context` come back first without being
+    recomputed. With `workers` > 1 the chunks run in a spawned process pool
+    that reads `close` from shared memory instead of receiving a pickled copy;
+    starting it costs a couple of seconds, so it only pays off on long sweeps
+    with spare cores.
+    `costs` are passed through to ``backtest.evaluate``.
+    """
+    params = valid_params(params)
+    if cache is not None:
+        cached, params = cache.split(context, params)
+        if len(cached):
+            yield cached
+    if params.empty:
+        return
+
+    def finished(chunk, metrics):
+        table = pd.concat([chunk.reset_index(drop=True), metrics], axis=1)
+        if cache is not None:
+            cache.store(context, table)
+        return table
+
+    chunks = _chunks(params, chunk_size)
+    workers = min(workers, len(chunks))
+    if workers <= 1:
+        indicator_cache = {}
+        for chunk in chunks:
+            yield finished(chunk, evaluate(close, chunk, indicator_cache, **costs))
+        return
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    pool = None
+    try:
+        np.ndarray(close.shape, dtype=np.float64, buffer=shm.buf)[:] = close
+        pool = spawn_pool(workers, initializer=_attach, initargs=(shm.name, len(close)))
+        futures = [pool.submit(_evaluate_chunk, chunk, costs) for chunk in chunks]
+        for future in as_completed(futures):
+            yield finished(*future.result())
+    finally:
+        if pool is not None:
+            # Also reached when the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+        shm.unlink()
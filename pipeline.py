@@ -0,0 +1,220 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+from analytics import analytics_summary
+from bar_store import BAR_COLUMNS
+from candle_store import download_candles
+from fix import fix_ohlc
+from indicators import add_indicators
+from pools import MIN_POOL_TICKERS, spawn_pool
+from profiling import span
+from shared_cache import SharedMarketData
+from signals import generate_signals
+
+# History requested on a full fetch, per bar interval
+PERIODS = {
+    "1m": "1d", "5m": "5d", "15m": "1mo",
+    "30m": "1mo", "1h": "3mo", "1d": "1y",
+}
+
+# Analytics summaries kept by a Pipeline across (ticker, interval, frame version) keys
+MAX_SUMMARIES = 32
+
+# One headless run: the analysed frame, company info and the numbers the dashboard shows
+Analysis = namedtuple("Analysis", "ticker interval frame info snapshot summary")
+
+
+def default_period(interval):
+    return PERIODS[interval]
+
+
+def normalize(raw):
+    """Clean OHLCV bars from a raw download: numeric columns, sorted unique timestamps."""
+    if raw is None or raw.empty:
+        return None
+    frame = fix_ohlc(raw)
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index()
+    if frame.index.has_duplicates:
+        frame = frame[~frame.index.duplicated(keep="last")]
+    return frame if not frame.empty else None
+
+
+def compute(frame):
+    """Indicators and signals for a normalized frame; `frame` itself is left untouched."""
+    with span("indicators", rows=len(frame)):
+        out = add_indicators(frame[BAR_COLUMNS].copy())
+    with span("signals", rows=len(out)):
+        return generate_signals(out)
+
+
+def frame_version(frame):
+    # Changes whenever a bar is appended or the open bar is revised
+    return (len(frame), frame.index[-1], float(frame["Close"].iloc[-1]))
+
+
+def last_change(frame):
+    """(last close, previous close, change, change %) of the last bar."""
+    last = float(frame["Close"].iloc[-1])
+    prev = float(frame["Close"].iloc[-2]) if len(frame) > 1 else last
+    change = last - prev
+    return last, prev, change, change / prev * 100 if prev else 0.0
+
+
+def rating_score(frame):
+    """0-4: up on the last bar, RSI in 30-70, MACD above its signal, EMA20 above EMA50."""
+    last = frame.iloc[-1]
+    return int(
+        (last_change(frame)[3] > 0)
+        + (30 < last["RSI"] < 70)
+        + (last["MACD"] > last["MACD_Signal"])
+        + (last["EMA20"] > last["EMA50"])
+    )
+
+
+def snapshot(frame):
+    """Latest values of an analysed frame as plain floats and strings, e.g. for JSON output."""
+    last_price, prev_close, change, change_pct = last_change(frame)
+    last = frame.iloc[-1]
+    fired = frame[frame["Signal"] != 0]
+    latest = fired.iloc[-1] if not fired.empty else None
+    return {
+        "time": frame.index[-1].isoformat(),
+        "bars": len(frame),
+        "close": last_price,
+        "prev_close": prev_close,
+        "change": change,
+        "change_pct": change_pct,
+        **{name: float(last[name]) for name in ("RSI", "MACD", "MACD_Signal", "EMA20", "EMA50", "ATR")},
+        "trend": "Up" if last["EMA20"] > last["EMA50"] else "Down",
+        "score": rating_score(frame),
+        "last_signal": None if latest is None else ("BUY" if latest["Signal"] > 0 else "SELL"),
+        "last_signal_type": None if latest is None else latest["Signal_Type"],
+        "last_signal_time": None if latest is None else fired.index[-1].isoformat(),
+    }
+
+
+def analyze(raw):
+    """normalize -> indicators -> signals on one downloaded frame, or None without data."""
+    frame = normalize(raw)
+    return compute(frame) if frame is not None else None
+
+
+def run(ticker, interval, period=None, fetcher=download_candles, info_fetcher=None, summary=True):
+    """Fetch and analyse one ticker from scratch, with no shared state; safe in any process.
+
+    `fetcher` has the CandleStore fetcher signature and returns normalized bars.
+    """
+    with span("fetch"):
+        bars = fetcher(ticker, interval, period=period or default_period(interval))
+    if bars is None or bars.empty:
+        return None
+    frame = compute(bars)
+    info = (info_fetcher(ticker) or {}) if info_fetcher is not None else {}
+    stats = analytics_summary(frame) if summary else None
+    return Analysis(ticker, interval, frame, info, snapshot(frame), stats)
+
+
+def _snapshot_row(args):
+    ticker, interval, period, fetcher = args
+    try:
+        result = run(ticker, interval, period, fetcher=fetcher, summary=False)
+    except Exception as e:
+        return {"ticker": ticker, "interval": interval, "error": str(e)}
+    if result is None:
+        return {"ticker": ticker, "interval": interval, "error": "no data"}
+    return {"ticker": ticker, "interval": interval, **result.snapshot}
+
+
+def run_batch(tickers, interval, period=None, workers=1, fetcher=download_candles):
+    """Snapshot rows for many tickers, in process unless `workers` > 1.
+
+    `fetcher` must be picklable (a module-level function) to reach the workers.
+    """
+    items = [(ticker, interval, period, fetcher) for ticker in tickers]
+    workers = min(workers, len(items))
+    if workers <= 1 or len(items) < MIN_POOL_TICKERS:
+        return [_snapshot_row(item) for item in items]
+    with spawn_pool(workers) as pool:
+        return list(pool.map(_snapshot_row, items))
+
+
+class Pipeline:
+    """The dashboard's data path, shared by every session in a process.
+
+    Candles and company info come from `data` (coalesced, TTL cached),
+    indicators and signals are computed once per (ticker, interval, last
+    bar), and analytics summaries once per frame version, so a rerun that
+    finds everything cached only does dictionary lookups.
+    """
+
+    def __init__(self, data=None, max_summaries=MAX_SUMMARIES):
+        self.data = data if data is not None else SharedMarketData()
+        self.max_summaries = max_summaries
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def candles(self, ticker, interval, period=None):
+        """OHLCV history for (ticker, interval); treat it as read-only."""
+        with span("fetch") as s:
+            frame = self.data.candles(ticker, period or default_period(interval), interval)
+            s.rows = 0 if frame is None else len(frame)
+        return frame if frame is not None and not frame.empty else None
+
+    def info(self, ticker):
+        with span("fetch.info"):
+            return self.data.info(ticker) or {}
+
+    def analysis(self, ticker, interval, raw):
+        """`raw` with indicators and signals; the result's columns are read-only views."""
+        with span("analysis", rows=len(raw)):
+            return self.data.analysis(ticker, interval, raw)
+
+    def summary(self, ticker, interval, frame):
+        """`analytics_summary(frame)`, computed once per frame version."""
+        key = (ticker, interval, frame_version(frame))
+        with self._lock:
+            stats = self._summaries.get(key)
+            if stats is not None:
+                self._summaries.move_to_end(key)
+                return stats
+        with span("analytics", rows=len(frame)):
+            stats = analytics_summary(frame)
+        with self._lock:
+            self._summaries[key] = stats
+            while len(self._summaries) > self.max_summaries:
+                self._summaries.popitem(last=False)
+        return stats
+
+    def run(self, ticker, interval, period=None, summary=True):
+        """Everything the dashboard shows for (ticker, interval), or None without data."""
+        raw = self.candles(ticker, interval, period)
+        if raw is None:
+            return None
+        frame = self.analysis(ticker, interval, raw)
+        stats = self.summary(ticker, interval, frame) if summary else None
+        return Analysis(ticker, interval, frame, self.info(ticker), snapshot(frame), stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the dashboard's analysis headless and print one JSON line per ticker.")
+    parser.add_argument("tickers", nargs="+", help="NSE symbols, e.g. RELIANCE.NS TCS.NS")
+    parser.add_argument("--interval", default="15m", choices=list(PERIODS))
+    parser.add_argument("--period", default=None, help="history to fetch (default depends on the interval)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.tickers, args.interval, args.period, args.workers or os.cpu_count() or 1)
+    for row in rows:
+        # NaN is not valid JSON
+        print(json.dumps({k: None if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()}))
+    return 1 if any("error" in row for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
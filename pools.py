@@ -0,0 +1,83 @@
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import context, spawn
+
+# Below this many symbols a pool costs more to start than it saves
+MIN_POOL_TICKERS = 16
+
+_pools = {}
+_lock = threading.Lock()
+_starting = threading.local()
+_preparation_data = spawn.get_preparation_data
+
+
+def _worker_preparation_data(name):
+    data = _preparation_data(name)
+    if getattr(_starting, "worker", False):
+        # Streamlit swaps in a __main__ whose __file__ is app.py; a worker that
+        # re-ran it as __mp_main__ would redraw the dashboard and start downloads.
+        # Pool tasks are module-level functions, so workers need no __main__.
+        data.pop("init_main_from_path", None)
+        data.pop("init_main_from_name", None)
+    return data
+
+
+spawn.get_preparation_data = _worker_preparation_data
+
+
+class _WorkerProcess(context.SpawnProcess):
+    @staticmethod
+    def _Popen(process_obj):
+        # The child's preparation data is built on this thread, inside this call
+        _starting.worker = True
+        try:
+            return context.SpawnProcess._Popen(process_obj)
+        finally:
+            _starting.worker = False
+
+
+class _WorkerContext(context.SpawnContext):
+    Process = _WorkerProcess
+
+
+def spawn_pool(workers, initializer=None, initargs=()):
+    """A process pool whose workers start as fresh interpreters.
+
+    Forking copies the parent mid-flight, including locks held by its other
+    threads (the Streamlit server, the data client's event loop), so pools
+    started from the dashboard never fork. Workers do not re-import the
+    parent's __main__, so tasks must live in importable modules.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_WorkerContext(),
+                               initializer=initializer, initargs=initargs)
+
+
+def shared_pool(workers):
+    """A spawn pool of `workers` processes kept for the life of the process.
+
+    Spawned workers import numpy, pandas and the kernels before their first
+    task, so the pool is started once and reused rather than per call.
+    """
+    with _lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = spawn_pool(workers)
+        return pool
+
+
+def discard_pool(workers):
+    # A worker died (BrokenProcessPool); the next call starts a new pool
+    with _lock:
+        pool = _pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _shutdown():
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
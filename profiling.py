@@ -0,0 +1,201 @@
+import contextlib
+import contextvars
+import json
+import threading
+import time
+from collections import deque
+
+# Finished runs kept for the JSONL export
+HISTORY = 50
+
+# The run being profiled in this context (a Streamlit rerun, a fragment rerun), if any.
+# Context variables follow the call into the data client's loop and worker threads
+_current_run = contextvars.ContextVar("profile_run", default=None)
+_current_path = contextvars.ContextVar("profile_path", default="")
+
+
+class _NullSpan:
+    """What `span` returns when nothing is being profiled: enter/exit and attribute sets do nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Wall time of a `with` block, plus rows processed and bytes serialized if the block sets them."""
+
+    __slots__ = ("run", "name", "rows", "bytes", "_start", "_token")
+
+    def __init__(self, run, name, rows=None):
+        self.run = run
+        self.name = name
+        self.rows = rows
+        self.bytes = None
+
+    def __enter__(self):
+        parent = _current_path.get()
+        self._token = _current_path.set(f"{parent}/{self.name}" if parent else self.name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        path = _current_path.get()
+        _current_path.reset(self._token)
+        self.run.record(path, self.name, self._start, end - self._start, self.rows, self.bytes)
+        return False
+
+
+class Run:
+    """Spans recorded during one rerun, in the order they finished."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.started_at = time.time()
+        self.seconds = None
+        self.spans = []
+        self._start = time.perf_counter()
+
+    def record(self, path, name, start, seconds, rows, nbytes):
+        # list.append is atomic, so spans from the data client's threads can land here too
+        self.spans.append({"span": path, "name": name, "start": start - self._start,
+                           "seconds": seconds, "rows": rows, "bytes": nbytes})
+        self.profiler.add(name, seconds, rows, nbytes)
+
+    def finish(self):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self._start
+        return self
+
+    def table(self):
+        """Spans in start order, each with its nesting depth."""
+        return [{**s, "depth": s["span"].count("/")} for s in sorted(self.spans, key=lambda s: s["start"])]
+
+
+class Profiler:
+    """Named spans around the hot paths of a rerun, aggregated per span name.
+
+    Nothing is recorded unless a run is active in the calling context (see
+    `begin_run`), so with profiling off a span costs a context variable
+    lookup and an empty ``with`` block. Totals are kept per span name (not
+    per path) so the Prometheus export has one series per stage.
+    """
+
+    def __init__(self, history=HISTORY):
+        self.runs = deque(maxlen=history)
+        self._totals = {}
+        self._run_count = 0
+        self._lock = threading.Lock()
+
+    def span(self, name, rows=None):
+        run = _current_run.get()
+        if run is None:
+            return _NULL_SPAN
+        return Span(run, name, rows)
+
+    @property
+    def active(self):
+        """Whether spans in this context are being recorded."""
+        return _current_run.get() is not None
+
+    @contextlib.contextmanager
+    def run(self, name):
+        """Profile the block as its own run, unless this context is already inside one."""
+        if self.active:
+            yield _current_run.get()
+            return
+        run = self.begin_run(name)
+        try:
+            yield run
+        finally:
+            self.end_run()
+
+    def begin_run(self, name):
+        """Start recording spans from this context; finishes any run it was still recording."""
+        self.end_run()
+        run = Run(self, name)
+        _current_run.set(run)
+        return run
+
+    def end_run(self):
+        run = _current_run.get()
+        if run is None:
+            return None
+        _current_run.set(None)
+        run.finish()
+        with self._lock:
+            self.runs.append(run)
+            self._run_count += 1
+        return run
+
+    def add(self, name, seconds, rows=None, nbytes=None):
+        with self._lock:
+            total = self._totals.get(name)
+            if total is None:
+                total = self._totals[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes": 0}
+            total["calls"] += 1
+            total["seconds"] += seconds
+            total["max_seconds"] = max(total["max_seconds"], seconds)
+            total["rows"] += rows or 0
+            total["bytes"] += nbytes or 0
+
+    def totals(self):
+        with self._lock:
+            return {name: dict(total) for name, total in self._totals.items()}
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self.runs.clear()
+            self._run_count = 0
+
+    def prometheus(self, prefix="stockpulse"):
+        """Totals in the Prometheus text exposition format."""
+        totals = self.totals()
+        metrics = [
+            ("span_calls_total", "counter", "Times each span ran.", "calls"),
+            ("span_seconds_total", "counter", "Wall time spent in each span.", "seconds"),
+            ("span_max_seconds", "gauge", "Longest single run of each span.", "max_seconds"),
+            ("span_rows_total", "counter", "Rows processed in each span.", "rows"),
+            ("span_bytes_total", "counter", "Bytes serialized in each span.", "bytes"),
+        ]
+        lines = [f"# HELP {prefix}_runs_total Profiled reruns.", f"# TYPE {prefix}_runs_total counter",
+                 f"{prefix}_runs_total {self._run_count}"]
+        for metric, kind, help_text, field in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name in sorted(totals):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{prefix}_{metric}{{span="{label}"}} {totals[name][field]:g}')
+        return "\n".join(lines) + "\n"
+
+    def jsonl(self):
+        """One JSON object per span of every kept run."""
+        with self._lock:
+            runs = list(self.runs)
+        lines = []
+        for run in runs:
+            for s in run.table():
+                lines.append(json.dumps({"run": run.name, "run_started": run.started_at,
+                                         "run_seconds": run.seconds, **s}))
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+profiler = Profiler()
+
+
+def span(name, rows=None):
+    """``with span("indicators", rows=len(df)) as s: ...``; set ``s.rows`` / ``s.bytes`` inside if known later."""
+    return profiler.span(name, rows)
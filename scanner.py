@@ -0,0 +1,164 @@
+import io
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from kernels import indicator_arrays
+from pools import MIN_POOL_TICKERS, discard_pool, shared_pool
+from signals import SIGNAL_START, signal_arrays
+
+# Only signals fired within this many bars count as "current"
+SCAN_WINDOW = 5
+
+# Tickers per 2-D indicator pass; bounds the (bars x tickers) working set
+SCAN_BATCH = 128
+
+NIFTY_50 = [
+    "ADANIENT", "ADANIPORTS", "APOLLOHOSP", "ASIANPAINT", "AXISBANK",
+    "BAJAJ-AUTO", "BAJFINANCE", "BAJAJFINSV", "BEL", "BHARTIARTL",
+    "CIPLA", "COALINDIA", "DRREDDY", "EICHERMOT", "ETERNAL",
+    "GRASIM", "HCLTECH", "HDFCBANK", "HDFCLIFE", "HEROMOTOCO",
+    "HINDALCO", "HINDUNILVR", "ICICIBANK", "INDUSINDBK", "INFY",
+    "ITC", "JIOFIN", "JSWSTEEL", "KOTAKBANK", "LT",
+    "M&M", "MARUTI", "NESTLEIND", "NTPC", "ONGC",
+    "POWERGRID", "RELIANCE", "SBILIFE", "SBIN", "SHRIRAMFIN",
+    "SUNPHARMA", "TATACONSUM", "TATAMOTORS", "TATASTEEL", "TCS",
+    "TECHM", "TITAN", "TRENT", "ULTRACEMCO", "WIPRO",
+]
+
+
+def nse_symbols(symbols):
+    return [s if s.endswith(".NS") else f"{s}.NS" for s in symbols]
+
+
+def parse_universe(text):
+    """Symbols from an NSE index constituents CSV (``Symbol`` column) or a plain comma/line separated list."""
+    lines = text.strip().splitlines()
+    if lines and "Symbol" in lines[0].split(","):
+        symbols = pd.read_csv(io.StringIO(text))["Symbol"].dropna().astype(str).tolist()
+    else:
+        symbols = text.replace(",", "\n").split()
+    symbols = [s.strip().upper() for s in symbols if s.strip()]
+    return nse_symbols(list(dict.fromkeys(symbols)))
+
+
+def load_universe(path):
+    with open(path) as f:
+        return parse_universe(f.read())
+
+
+def stack_columns(frames, column, n_bars):
+    """(bars x tickers) array of one column, each ticker right-aligned so the last bars line up."""
+    out = np.full((n_bars, len(frames)), np.nan)
+    for j, df in enumerate(frames):
+        out[n_bars - len(df):, j] = df[column].to_numpy(dtype=float)
+    return out
+
+
+def scan_batch(items):
+    """Scan rows for a batch of ``(ticker, ohlcv)`` pairs, computed as one 2-D pass per indicator."""
+    items = [(ticker, df) for ticker, df in items if len(df) > SIGNAL_START]
+    if not items:
+        return []
+    tickers = [ticker for ticker, _ in items]
+    frames = [df for _, df in items]
+    lengths = np.array([len(df) for df in frames])
+    n_bars = int(lengths.max())
+
+    close = stack_columns(frames, "Close", n_bars)
+    ind = indicator_arrays(
+        stack_columns(frames, "High", n_bars),
+        stack_columns(frames, "Low", n_bars),
+        close,
+        stack_columns(frames, "Volume", n_bars),
+    )
+
+    # One extra leading bar so crossovers on the first window bar see their previous bar
+    tail = slice(-SCAN_WINDOW - 1, None)
+    signal, signal_type = signal_arrays(
+        ind["EMA20"][tail], ind["EMA50"][tail], ind["RSI"][tail],
+        ind["MACD"][tail], ind["MACD_Signal"][tail], start=1,
+    )
+    signal, signal_type = signal[1:], signal_type[1:]
+    position = lengths - SCAN_WINDOW + np.arange(SCAN_WINDOW)[:, None]
+    signal[position < SIGNAL_START] = 0
+
+    # Most recent fired bar per ticker
+    fired = signal != 0
+    has_signal = fired.any(axis=0)
+    row = SCAN_WINDOW - 1 - fired[::-1].argmax(axis=0)
+    cols = np.arange(len(tickers))
+    latest = signal[row, cols]
+
+    last = {name: values[-1] for name, values in ind.items()}
+    last_close, prev_close = close[-1], close[-2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = np.where(prev_close != 0, (last_close - prev_close) / prev_close * 100, 0.0)
+
+    # Same four checks as the Signals tab rating
+    score = (
+        (change_pct > 0).astype(int)
+        + ((last["RSI"] > 30) & (last["RSI"] < 70))
+        + (last["MACD"] > last["MACD_Signal"])
+        + (last["EMA20"] > last["EMA50"])
+    )
+
+    table = pd.DataFrame({
+        "Symbol": [ticker.replace(".NS", "") for ticker in tickers],
+        "Signal": np.where(has_signal, np.where(latest > 0, "BUY", "SELL"), ""),
+        "Bars Ago": np.where(has_signal, SCAN_WINDOW - 1 - row, np.nan),
+        "Reason": np.where(has_signal, signal_type[row, cols], ""),
+        "Score": score,
+        "Last (₹)": last_close,
+        "Change %": change_pct,
+        "RSI": last["RSI"],
+        "MACD Hist": last["MACD_Hist"],
+        "Stoch %K": last["Stoch_K"],
+        "ATR %": last["ATR"] / last_close * 100,
+        "Trend": np.where(last["EMA20"] > last["EMA50"], "Up", "Down"),
+    })
+    return table.to_dict("records")
+
+
+def scan_chunk(items):
+    rows = []
+    for start in range(0, len(items), SCAN_BATCH):
+        rows.extend(scan_batch(items[start:start + SCAN_BATCH]))
+    return rows
+
+
+def rank_scan(rows):
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    # Fresh signals first, then the strongest setups
+    table = table.sort_values(["Bars Ago", "Score", "Change %"], ascending=[True, False, False], na_position="last")
+    table.insert(0, "Rank", np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+
+def chunked(items, n_chunks):
+    size = max(1, -(-len(items) // n_chunks))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def scan_universe(frames, workers=1):
+    """Run indicators and signal rules over every ``{ticker: ohlcv}`` frame and rank the results.
+
+    Runs in process by default: a batched 2-D pass over the NIFTY 50 takes
+    tens of milliseconds. With `workers` > 1 and a large universe the chunks
+    go to a persistent spawn pool (see ``pools``).
+    """
+    items = list(frames.items())
+    if workers <= 1 or len(items) < MIN_POOL_TICKERS:
+        return rank_scan(scan_chunk(items))
+
+    # One chunk per worker; each runs its share as batched 2-D passes
+    try:
+        chunks = shared_pool(workers).map(scan_chunk, chunked(items, workers))
+        rows = [row for chunk in chunks for row in chunk]
+    except BrokenProcessPool:
+        discard_pool(workers)
+        rows = scan_chunk(items)
+    return rank_scan(rows)
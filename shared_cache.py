@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from bar_store import BAR_COLUMNS
+from candle_store import CandleStore
+from indicators import IndicatorState
+from profiling import span
+from signals import generate_signals
+from watchlist import download_info
+
+# Seconds a downloaded history is served to every session before the next delta fetch
+CANDLE_TTL = 60
+INFO_TTL = 300
+
+# How long past its TTL a value may still be served while a background refresh runs
+CANDLE_STALE_TTL = 60
+INFO_STALE_TTL = 600
+
+# Background refreshes running at once across all keys
+REFRESH_WORKERS = 4
+
+# Analysis frames kept across all (ticker, interval, last bar) keys
+MAX_FRAMES = 64
+
+
+def bar_revision(raw):
+    """What makes two frames with the same last bar time different: length and the last bar's values."""
+    return (len(raw), *(float(raw[name].iat[-1]) for name in BAR_COLUMNS))
+
+
+class _Flight:
+    """One load in progress; everyone asking for the key waits on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CoalescingCache:
+    """TTL cache that lets only one load per key reach the upstream at a time.
+
+    A value younger than `ttl` is served as is. Up to `stale_ttl` past that it
+    is still served at once, and the first caller to notice starts a single
+    background refresh. Past both, or on a first request, the first caller
+    loads in its own thread and every concurrent caller for the key waits for
+    that result (or its error) instead of issuing its own request.
+    """
+
+    def __init__(self, loader, ttl, stale_ttl=0, clock=time.monotonic, executor=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "stale_hits": 0, "coalesced": 0, "loads": 0, "refreshes": 0, "errors": 0}
+        self._executor = executor
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _load(self, key, flight, args):
+        try:
+            flight.value = self.loader(*args)
+            with self._lock:
+                self._entries[key] = (self.clock(), flight.value)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _refresh(self, key, args):
+        # Called with the lock held; at most one refresh per key
+        if key in self._flights:
+            return
+        flight = self._flights[key] = _Flight()
+        self.stats["refreshes"] += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="refresh")
+        self._executor.submit(self._load, key, flight, args)
+
+    def get(self, key, *args):
+        """Value for `key`, loading it with ``loader(*args)`` when needed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self.clock() - entry[0]
+                if age < self.ttl:
+                    self.stats["hits"] += 1
+                    return entry[1]
+                if age < self.ttl + self.stale_ttl:
+                    self.stats["stale_hits"] += 1
+                    self._refresh(key, args)
+                    return entry[1]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["loads"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if leader:
+            self._load(key, flight, args)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class SharedMarketData:
+    """Process-wide market data and indicator frames, shared by every session.
+
+    Candles are fetched through `store` at most once per `ttl` seconds per
+    (ticker, interval), and company info through `info_fetcher` once per
+    `info_ttl` per ticker; both coalesce concurrent misses and serve slightly
+    stale values while a background refresh runs. Indicators and signals are computed once per
+    (ticker, interval, last bar timestamp) and every session gets the same
+    frame: a shallow copy whose columns are read-only views, so nothing is
+    pickled or duplicated per session and callers can still add columns of
+    their own. A revised last bar (same timestamp, new values) is recomputed.
+    Concurrent requests for one (ticker, interval) wait on a per-key lock and
+    reuse the result instead of computing it again.
+    """
+
+    def __init__(self, store=None, ttl=CANDLE_TTL, max_frames=MAX_FRAMES, clock=time.monotonic,
+                 stale_ttl=CANDLE_STALE_TTL, info_fetcher=download_info, info_ttl=INFO_TTL,
+                 info_stale_ttl=INFO_STALE_TTL):
+        self.store = store if store is not None else CandleStore()
+        self.max_frames = max_frames
+        self.stats = {"frame_hits": 0, "frame_misses": 0, "compute_seconds": 0.0}
+        self._candles = CoalescingCache(self.store.get, ttl, stale_ttl, clock)
+        self._infos = CoalescingCache(info_fetcher, info_ttl, info_stale_ttl, clock)
+        self._states = {}
+        self._frames = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def candles(self, ticker, period, interval):
+        """OHLCV history for (ticker, interval) over `period`; treat it as read-only."""
+        # The store shares one history per (ticker, interval); each period is its own window of it
+        return self._candles.get((ticker, interval, period), ticker, period, interval)
+
+    def info(self, ticker):
+        return self._infos.get(ticker, ticker)
+
+    def analysis(self, ticker, interval, raw):
+        """`raw` with indicators and signals, computed once for all sessions."""
+        if raw is None or raw.empty:
+            return raw
+        # Two periods of one series end on the same bar but are different frames
+        key = (ticker, interval, raw.index[0], raw.index[-1])
+        revision = bar_revision(raw)
+        with self._key_lock((ticker, interval)):
+            with self._lock:
+                entry = self._frames.get(key)
+                if entry is not None and entry[0] == revision:
+                    self._frames.move_to_end(key)
+                    self.stats["frame_hits"] += 1
+                    return entry[1].copy(deep=False)
+
+            started = time.perf_counter()
+            state = self._states.get((ticker, interval))
+            if state is None:
+                # Copy-on-write so frames already served never change under a reader
+                state = self._states[(ticker, interval)] = IndicatorState(copy_on_write=True)
+            with span("indicators", rows=len(raw)):
+                frame = state.update(raw)
+            with span("signals", rows=len(frame)):
+                frame = generate_signals(frame)
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self.stats["frame_misses"] += 1
+                self.stats["compute_seconds"] += elapsed
+                self._frames[key] = (revision, frame)
+                self._frames.move_to_end(key)
+                self._evict()
+            return frame.copy(deep=False)
+
+    def _evict(self):
+        while len(self._frames) > self.max_frames:
+            (ticker, interval, *_), _ = self._frames.popitem(last=False)
+            if not any(key[:2] == (ticker, interval) for key in self._frames):
+                self._states.pop((ticker, interval), None)
+
+    def metrics(self):
+        """Counters plus hit rates, entry counts and the bytes held by indicator stores.
+
+        A candle or info "miss" is a call that reached the upstream, in the
+        foreground or as a background refresh; stale and coalesced requests
+        are counted as hits.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["frames"] = len(self._frames)
+            stats["series"] = len(self._states)
+            stats["store_bytes"] = sum(state.store.nbytes for state in self._states.values())
+        for kind, cache in (("candle", self._candles), ("info", self._infos)):
+            counts = dict(cache.stats)
+            stats[f"{kind}_misses"] = counts["loads"] + counts["refreshes"]
+            stats[f"{kind}_hits"] = counts["hits"] + counts["stale_hits"] + counts["coalesced"]
+            for name in ("stale_hits", "coalesced", "errors"):
+                stats[f"{kind}_{name}"] = counts[name]
+        for kind in ("candle", "info", "frame"):
+            total = stats[f"{kind}_hits"] + stats[f"{kind}_misses"]
+            stats[f"{kind}_hit_rate"] = stats[f"{kind}_hits"] / total if total else 0.0
+        return stats
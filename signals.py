@@ -0,0 +1,91 @@
+import numpy as np
+
+# Signals are only evaluated once the slow EMA has had time to settle
+SIGNAL_START = 50
+
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+
+# Per-rule labels; code 1 = buy side, code 2 = sell side
+EMA_LABELS = ("", "BUY", "SELL")
+RSI_LABELS = ("", "BUY (Oversold)", "SELL (Overbought)")
+MACD_LABELS = ("", "BUY (MACD)", "SELL (MACD)")
+
+
+def _build_label_table():
+    labels = []
+    for ema in range(3):
+        for rsi in range(3):
+            for macd in range(3):
+                parts = [EMA_LABELS[ema], RSI_LABELS[rsi], MACD_LABELS[macd]]
+                labels.append(" | ".join(p for p in parts if p))
+    return np.array(labels, dtype=object)
+
+
+# 27 possible (ema, rsi, macd) combinations -> "Signal_Type" string
+LABEL_TABLE = _build_label_table()
+
+
+def crossover_codes(fast, slow):
+    fast = np.asarray(fast, dtype=float)
+    slow = np.asarray(slow, dtype=float)
+    # Works along the first axis, so (bars x tickers) arrays are fine too
+    codes = np.zeros(fast.shape, dtype=np.int8)
+    if len(fast) < 2:
+        return codes
+
+    cur_fast, cur_slow = fast[1:], slow[1:]
+    prev_fast, prev_slow = fast[:-1], slow[:-1]
+
+    # NaN comparisons are False, exactly like the scalar checks they replace
+    codes[1:][(cur_fast > cur_slow) & (prev_fast <= prev_slow)] = 1
+    codes[1:][(cur_fast < cur_slow) & (prev_fast >= prev_slow)] = 2
+    return codes
+
+
+def threshold_codes(values, low=RSI_OVERSOLD, high=RSI_OVERBOUGHT):
+    values = np.asarray(values, dtype=float)
+    codes = np.zeros(values.shape, dtype=np.int8)
+    codes[values < low] = 1
+    codes[values > high] = 2
+    return codes
+
+
+def combine_codes(ema_codes, rsi_codes, macd_codes, start=SIGNAL_START):
+    """Signal (1 buy, -1 sell, 0 none) and the combined rule code indexing LABEL_TABLE.
+
+    Per-rule code arrays may be (bars x n) and broadcast against each other,
+    which is how parameter sweeps evaluate many rule settings at once.
+    """
+    combined = ema_codes.astype(np.int16) * 9 + rsi_codes * 3 + macd_codes
+    combined[:start] = 0
+
+    any_buy = (ema_codes == 1) | (rsi_codes == 1) | (macd_codes == 1)
+    signal = np.where(combined == 0, 0, np.where(any_buy, 1, -1))
+    signal[:start] = 0
+
+    return signal.astype(np.int64), combined
+
+
+def signal_arrays(ema_fast, ema_slow, rsi, macd, macd_signal, start=SIGNAL_START):
+    signal, combined = combine_codes(
+        crossover_codes(ema_fast, ema_slow),
+        threshold_codes(rsi),
+        crossover_codes(macd, macd_signal),
+        start=start,
+    )
+    return signal, LABEL_TABLE[combined]
+
+
+def generate_signals(df, start=SIGNAL_START):
+    signal, signal_type = signal_arrays(
+        df["EMA20"].to_numpy(),
+        df["EMA50"].to_numpy(),
+        df["RSI"].to_numpy(),
+        df["MACD"].to_numpy(),
+        df["MACD_Signal"].to_numpy(),
+        start=start,
+    )
+    df["Signal"] = signal
+    df["Signal_Type"] = signal_type
+    return df
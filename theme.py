@@ -0,0 +1,75 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+BACKGROUND = "#0a0e1a"
+GRID = "#1e293b"
+TEXT = "#e4e7eb"
+UP = "#10b981"
+DOWN = "#ef4444"
+ACCENT = "#2dd4bf"
+AMBER = "#fbbf24"
+VIOLET = "#8b5cf6"
+MUTED = "#64748b"
+
+TEMPLATE_NAME = "stockpulse"
+
+# Legend above the plot area, right aligned; used by most multi-trace charts
+LEGEND_TOP = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+
+# Deliberately small: the template is embedded in every serialized figure
+pio.templates[TEMPLATE_NAME] = go.layout.Template(
+    layout=dict(
+        plot_bgcolor=BACKGROUND,
+        paper_bgcolor=BACKGROUND,
+        font=dict(color=TEXT, family="Inter"),
+        colorway=[ACCENT, AMBER, UP, VIOLET, DOWN, MUTED],
+        xaxis=dict(gridcolor=GRID, zerolinecolor=GRID),
+        yaxis=dict(gridcolor=GRID, zerolinecolor=GRID),
+        polar=dict(bgcolor=BACKGROUND, radialaxis=dict(gridcolor=GRID), angularaxis=dict(gridcolor=GRID)),
+    )
+)
+
+
+def use_theme():
+    # Streamlit installs its own default template on import, so call this after it
+    pio.templates.default = TEMPLATE_NAME
+
+
+def candlestick_figure(candles, height=600):
+    fig = go.Figure(go.Candlestick(
+        x=candles.index,
+        open=candles["Open"],
+        high=candles["High"],
+        low=candles["Low"],
+        close=candles["Close"],
+        name="OHLC",
+        increasing_line_color=UP,
+        decreasing_line_color=DOWN,
+    ))
+    fig.update_layout(height=height, legend=LEGEND_TOP, hovermode="x unified")
+    return fig
+
+
+def oscillator_figure(height=300, y_range=None, levels=(), showlegend=False, **layout):
+    """Empty indicator panel with optional fixed range and dashed (y, color, label) levels."""
+    fig = go.Figure()
+    for y, color, label in levels:
+        fig.add_hline(y=y, line_dash="dash", line_color=color, annotation_text=label)
+    if y_range is not None:
+        layout.setdefault("yaxis", {})["range"] = y_range
+    fig.update_layout(height=height, showlegend=showlegend, **layout)
+    return fig
+
+
+def bar_figure(x, y, colors, height=300, texttemplate=None, text=None, **layout):
+    """Single-trace bar chart with per-bar colors and values printed above the bars."""
+    fig = go.Figure(go.Bar(
+        x=x,
+        y=y,
+        marker_color=colors,
+        text=y if text is None and texttemplate else text,
+        texttemplate=texttemplate,
+        textposition="outside",
+    ))
+    fig.update_layout(height=height, showlegend=False, **layout)
+    return fig
@@ -0,0 +1,406 @@
+import argparse
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BAR_COLUMNS, BarStore
+
+NS = 1_000_000_000
+
+# Bar widths in nanoseconds, keyed like the dashboard's timeframes
+INTERVALS = {"1m": 60 * NS, "5m": 300 * NS, "15m": 900 * NS, "1h": 3600 * NS}
+
+# NSE opens at 09:15 IST (03:45 UTC); bars are aligned to the open so hourly
+# bars start at :15 like the ones yfinance returns
+SESSION_ORIGIN_NS = (3 * 3600 + 45 * 60) * NS
+
+# Bars kept per interval
+DEFAULT_CAPACITY = 2_000
+
+# A tick is one trade (or quote mid) at `ts` in UTC epoch nanoseconds
+Tick = namedtuple("Tick", ["symbol", "ts", "price", "size"])
+
+
+def to_ns(value):
+    """Epoch nanoseconds from epoch seconds, epoch nanoseconds or an ISO timestamp (UTC if naive)."""
+    try:
+        number = float(value)
+    except ValueError:
+        stamp = pd.Timestamp(value)
+        return (stamp.tz_localize("UTC") if stamp.tz is None else stamp).value
+    # Anything this large is already nanoseconds
+    return int(value) if number > 1e15 else int(number * NS)
+
+
+def parse_tick(line):
+    """Tick from a ``symbol,timestamp,price,size`` line."""
+    symbol, ts, price, size = line.strip().split(",")[:4]
+    return Tick(symbol, to_ns(ts), float(price), float(size or 0))
+
+
+def format_tick(tick):
+    return f"{tick.symbol},{tick.ts},{tick.price!r},{tick.size!r}\n"
+
+
+def read_ticks(path):
+    """Ticks file as a frame with symbol/ts/price/size columns, in time order.
+
+    Lines that don't parse (missing fields, a bad timestamp or price) are left out.
+    """
+    ticks = pd.read_csv(path, names=["symbol", "ts", "price", "size"], usecols=range(4), header=None,
+                        comment="#", dtype=str, on_bad_lines="skip")
+    if len(ticks) and ticks["symbol"].iloc[0] == "symbol":
+        ticks = ticks.iloc[1:]
+    if pd.to_numeric(ticks["ts"], errors="coerce").notna().any():
+        parsed = pd.to_numeric(ticks["ts"], errors="coerce").notna()
+        # Parsed again without the bad rows, so nanosecond stamps stay int64
+        ts = pd.to_numeric(ticks["ts"][parsed])
+        ts = ts.astype("int64") if ts.max() > 1e15 else (ts * NS).round().astype("int64")
+    else:
+        stamps = pd.to_datetime(ticks["ts"], utc=True, errors="coerce")
+        parsed = stamps.notna()
+        ts = stamps[parsed].dt.as_unit("ns").astype("int64")
+    price = pd.to_numeric(ticks["price"], errors="coerce")
+    valid = parsed & ticks["symbol"].notna() & np.isfinite(price)
+    return pd.DataFrame({
+        "symbol": ticks["symbol"][valid].to_numpy(),
+        "ts": ts[valid[parsed]].to_numpy(),
+        "price": price[valid].to_numpy(dtype=float),
+        "size": pd.to_numeric(ticks["size"][valid], errors="coerce").fillna(0).to_numpy(dtype=float),
+    }).sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+class ReplaySource:
+    """Replays a ticks CSV (``symbol,timestamp,price,size``) as a live feed.
+
+    `speed` scales the recorded gaps between ticks (0 replays as fast as
+    possible). With `rebase` the first tick is stamped with the current time so
+    replayed bars line up after the downloaded history.
+    """
+
+    def __init__(self, path, speed=1.0, rebase=True):
+        self.path = path
+        self.speed = speed
+        self.rebase = rebase
+
+    def __iter__(self):
+        ticks = read_ticks(self.path)
+        if ticks.empty:
+            return
+        ts = ticks["ts"].to_numpy()
+        if self.rebase:
+            ts = ts - ts[0] + time.time_ns()
+        started = time.perf_counter()
+        for symbol, stamp, offset, price, size in zip(
+            ticks["symbol"], ts.tolist(), (ts - ts[0]).tolist(), ticks["price"].tolist(), ticks["size"].tolist()
+        ):
+            if self.speed:
+                delay = offset / NS / self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield Tick(symbol, stamp, price, size)
+
+
+class SocketSource:
+    """Line-delimited ticks read from a TCP feed, e.g. a local `TickServer`."""
+
+    def __init__(self, host="127.0.0.1", port=9009, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.skipped = 0
+
+    def __iter__(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            # Only the connect is bounded; a quiet market is not an error
+            conn.settimeout(None)
+            with conn.makefile("r", encoding="utf-8", errors="replace") as lines:
+                for line in lines:
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    try:
+                        tick = parse_tick(line)
+                    except (ValueError, TypeError, OverflowError):
+                        # One garbled line shouldn't drop the connection
+                        self.skipped += 1
+                        continue
+                    yield tick
+
+
+def open_source(spec, speed=1.0):
+    """Tick source for a ``tcp://host:port`` URL or a path to a ticks CSV."""
+    if spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].rpartition(":")
+        return SocketSource(host or "127.0.0.1", int(port))
+    return ReplaySource(spec, speed=speed)
+
+
+class TickServer:
+    """Local stand-in for a broker feed: streams a tick source to every TCP client.
+
+    Each client gets its own pass over `source`, so a `ReplaySource` replays
+    from the start for every connection.
+    """
+
+    def __init__(self, source, host="127.0.0.1", port=0):
+        self.source = source
+        self._sock = socket.create_server((host, port))
+        self.address = self._sock.getsockname()[:2]
+        self._stop = threading.Event()
+
+    def _stream(self, conn):
+        try:
+            with conn:
+                for tick in self.source:
+                    if self._stop.is_set():
+                        break
+                    conn.sendall(format_tick(tick).encode())
+        except OSError:
+            pass  # client went away
+
+    def serve_forever(self):
+        self._sock.settimeout(0.5)
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._stream, args=(conn,), daemon=True).start()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sock.close()
+
+
+class _Bars:
+    """Bars of one interval: the open bar as plain floats, closed bars in a `BarStore`.
+
+    Ticks only touch the Python list; the open bar is written into the store
+    when a bar closes or somebody reads the bars.
+    """
+
+    def __init__(self, width, capacity):
+        self.width = width
+        self.store = BarStore(BAR_COLUMNS, capacity)
+        self.bucket = None  # open bar start, ns
+        self.bar = None  # open bar [open, high, low, close, volume]
+        self.dirty = False
+
+    def flush(self):
+        if self.dirty:
+            self.store.put(self.bucket, self.bar)
+            self.dirty = False
+
+    def add(self, ts, price, size):
+        """Fold one tick in; returns False for a tick too late to place."""
+        bucket = ts - (ts - SESSION_ORIGIN_NS) % self.width
+        bar = self.bar
+        if bucket == self.bucket:
+            if price > bar[1]:
+                bar[1] = price
+            elif price < bar[2]:
+                bar[2] = price
+            bar[3] = price
+            bar[4] += size
+        elif self.bucket is None or bucket > self.bucket:
+            self.flush()
+            self.bucket = bucket
+            self.bar = [price, price, price, price, size]
+        else:
+            # Late tick for a bar that has already closed
+            position = self.store.find(bucket)
+            if position is None:
+                return False
+            row = self.store.row(position)
+            row[1] = max(row[1], price)
+            row[2] = min(row[2], price)
+            row[4] += size
+            self.store.set_row(position, row)
+        self.dirty = True
+        return True
+
+    def add_many(self, ts, price, size):
+        """Fold in time-ordered tick arrays with one reduction per bar."""
+        buckets = ts - (ts - SESSION_ORIGIN_NS) % self.width
+        if self.bucket is not None and buckets[0] < self.bucket:
+            return sum(self.add(t, p, s) for t, p, s in zip(ts.tolist(), price.tolist(), size.tolist()))
+
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        ends = np.append(starts[1:], len(ts)) - 1
+        bars = np.column_stack([
+            price[starts],
+            np.maximum.reduceat(price, starts),
+            np.minimum.reduceat(price, starts),
+            price[ends],
+            np.add.reduceat(size, starts),
+        ])
+        times = buckets[starts]
+
+        first = 0
+        if times[0] == self.bucket:
+            bar = self.bar
+            bar[1] = max(bar[1], bars[0, 1])
+            bar[2] = min(bar[2], bars[0, 2])
+            bar[3] = bars[0, 3]
+            bar[4] += bars[0, 4]
+            first = 1
+        if first < len(times):
+            self.flush()
+            self.store.append(times[first:-1], bars[first:-1])
+            self.bucket = int(times[-1])
+            self.bar = bars[-1].tolist()
+        self.dirty = True
+        return len(ts)
+
+
+class TickAggregator:
+    """Rolling OHLCV bars for one symbol at several intervals, built tick by tick.
+
+    Every tick updates the open bar of each interval in place; a tick past the
+    bar's end closes it into a ring buffer of the last `capacity` bars. Ticks
+    that arrive late still count towards the closed bar they belong to while
+    it is in the buffer.
+    """
+
+    def __init__(self, intervals=tuple(INTERVALS), capacity=DEFAULT_CAPACITY):
+        self._bars = {name: _Bars(INTERVALS[name], capacity) for name in intervals}
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.dropped = 0
+        self.last_tick = None
+
+    @property
+    def intervals(self):
+        return tuple(self._bars)
+
+    def add(self, ts, price, size=0.0):
+        with self._lock:
+            for bars in self._bars.values():
+                if not bars.add(ts, price, size):
+                    self.dropped += 1
+            self.ticks += 1
+            self.last_tick = max(ts, self.last_tick or ts)
+
+    def add_many(self, ts, price, size):
+        """Bulk path for backfills and replays; `ts` must be in time order."""
+        ts = np.asarray(ts, dtype=np.int64)
+        if not len(ts):
+            return
+        price = np.asarray(price, dtype=np.float64)
+        size = np.asarray(size, dtype=np.float64)
+        with self._lock:
+            for bars in self._bars.values():
+                self.dropped += len(ts) - bars.add_many(ts, price, size)
+            self.ticks += len(ts)
+            self.last_tick = max(int(ts[-1]), self.last_tick or int(ts[-1]))
+
+    def frame(self, interval, since=None, tz="UTC"):
+        """Bars as an Open/High/Low/Close/Volume frame like the one `yf.download` returns.
+
+        `since` (a timestamp) keeps only bars starting at or after it; `tz`
+        converts the index, and None gives a naive UTC index.
+        """
+        with self._lock:
+            bars = self._bars[interval]
+            bars.flush()
+            store = bars.store
+            store.tz = tz
+            return store.frame(since)
+
+
+class TickFeed:
+    """Runs a tick source on a background thread, aggregating bars per symbol.
+
+    With `retry_delay` a source that ends or fails (a dropped socket) is
+    reopened after that many seconds; otherwise the feed stops with it.
+    """
+
+    def __init__(self, source, intervals=tuple(INTERVALS), capacity=DEFAULT_CAPACITY, retry_delay=None):
+        self.source = source
+        self.intervals = tuple(intervals)
+        self.capacity = capacity
+        self.retry_delay = retry_delay
+        self.error = None
+        self.skipped = 0
+        self._aggregators = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def aggregator(self, symbol):
+        with self._lock:
+            if symbol not in self._aggregators:
+                self._aggregators[symbol] = TickAggregator(self.intervals, self.capacity)
+            return self._aggregators[symbol]
+
+    @property
+    def symbols(self):
+        return sorted(self._aggregators)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                for tick in self.source:
+                    if self._stop.is_set():
+                        return
+                    try:
+                        self.aggregator(tick.symbol).add(int(tick.ts), float(tick.price), float(tick.size))
+                    except (TypeError, ValueError, OverflowError, AttributeError):
+                        # A malformed record is skipped, not allowed to end the feed
+                        self.skipped += 1
+                self.error = None
+            except (OSError, ValueError) as e:
+                self.error = e
+            if self.retry_delay is None:
+                return
+            self._stop.wait(self.retry_delay)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tick-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def frame(self, symbol, interval, since=None, tz="UTC"):
+        """Bars for `symbol`, or None when the feed has no ticks or bars of that interval for it."""
+        if interval not in self.intervals:
+            return None
+        with self._lock:
+            aggregator = self._aggregators.get(symbol)
+        if aggregator is None:
+            return None
+        bars = aggregator.frame(interval, since=since, tz=tz)
+        return bars if not bars.empty else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a ticks CSV over TCP as a stand-in live feed")
+    parser.add_argument("path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9009)
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = TickServer(ReplaySource(args.path, speed=args.speed), args.host, args.port)
+    print(f"Serving {args.path} on tcp://{args.host}:{server.address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
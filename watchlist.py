@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from data_client import UpstreamError
+from fix import fix_ohlc
+
+# Upper bound on concurrent `.info` requests, to stay polite to the upstream
+INFO_WORKERS = 8
+
+
+def split_batch(raw, tickers):
+    """Split a grouped multi-ticker download into normalized per-ticker frames."""
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+
+    grouped = isinstance(raw.columns, pd.MultiIndex)
+    available = set(raw.columns.get_level_values(0)) if grouped else set()
+
+    for ticker in tickers:
+        if grouped:
+            if ticker not in available:
+                continue
+            df = raw[ticker].copy()
+        elif len(tickers) == 1:
+            df = raw.copy()
+        else:
+            continue
+
+        # Bars that only exist for other symbols come back as all-NaN rows
+        df = fix_ohlc(df.dropna(how="all"))
+        if not df.empty:
+            frames[ticker] = df
+    return frames
+
+
+def download_watchlist(tickers, period, interval, timeout=10):
+    import yfinance as yf
+
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    raw = yf.download(
+        tickers, period=period, interval=interval,
+        group_by="ticker", threads=True, progress=False, timeout=timeout,
+    )
+    return split_batch(raw, tickers)
+
+
+def download_info(ticker):
+    import yfinance as yf
+    from yfinance.exceptions import YFException
+
+    try:
+        return yf.Ticker(ticker).info
+    except (OSError, YFException, ValueError, KeyError, TypeError, IndexError):
+        # Network failures, and tickers yfinance doesn't know or can't parse
+        return {}
+
+
+def fetch_infos(tickers, fetch_info=download_info, max_workers=INFO_WORKERS):
+    """{ticker: info} looked up on a bounded pool; a failed lookup gives an empty dict."""
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+
+    def lookup(ticker):
+        try:
+            return fetch_info(ticker)
+        except UpstreamError:
+            return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as pool:
+        return dict(zip(tickers, pool.map(lookup, tickers)))
+
+
+def watchlist_summary(frames, infos):
+    rows = []
+    for ticker, df in frames.items():
+        info = infos.get(ticker) or {}
+        last = df["Close"].iloc[-1]
+        prev = df["Close"].iloc[-2] if len(df) > 1 else last
+        rows.append({
+            "Symbol": ticker.replace(".NS", ""),
+            "Name": info.get("shortName", ticker),
+            "Last (₹)": last,
+            "Change %": (last - prev) / prev * 100 if prev else 0.0,
+            "High (₹)": df["High"].max(),
+            "Low (₹)": df["Low"].min(),
+            "Volume": df["Volume"].iloc[-1],
+        })
+    return pd.DataFrame(rows)